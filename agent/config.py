@@ -60,6 +60,7 @@ class Settings(BaseSettings):
     ollama_host: str = "http://localhost:11434"
     ollama_model: str = "llama3.2"
     ollama_timeout: int = 30
+    ollama_keep_alive: str = "30m"  # How long Ollama keeps the model, and its prompt prefix cache, loaded
     # Celery
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/0"
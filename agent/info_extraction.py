@@ -8,29 +8,73 @@ import asyncio
 import time
 from typing import Dict, List, Optional, Any, Tuple
 import spacy
-from spacy.matcher import Matcher, PhraseMatcher
+from spacy.matcher import Matcher
+from extraction_engine import ExtractionEngine
 import json
-import os
-# Add these imports
-from eligibility_checker import EligibilityCheckerAgent
-from vector_db import VectorDBAgent
-from web_scraper import WebScraperAgent
-from ollama import OllamaAgent
 # Ollama integration imports
 try:
-    import ollama
-    from ollama import Client, ChatResponse
+    from ollama import Client
     OLLAMA_AVAILABLE = True
 except ImportError:
     OLLAMA_AVAILABLE = False
 
-from app.config import get_settings
-from app.models import ExtractedInfo, FarmerInfo, LanguageCode
-from app.utils.logger import get_logger
+from config import get_settings
+from models import ExtractedInfo, FarmerInfo, LanguageCode
+from utils.logger import get_logger
 
 settings = get_settings()
 logger = get_logger(__name__)
 
+# Identical for every request and sent first, so Ollama reuses its KV cache;
+# the text to analyze follows in the user message
+EXTRACTION_SYSTEM_PROMPT = """You are an expert information extraction system specialized in extracting farmer information from text. 
+Extract the following information from the user's text and return it in JSON format.
+
+Extract these fields if present:
+- name: Farmer's name
+- age: Age in years (number only)
+- gender: male/female
+- phone_number: Phone number
+- state: State name
+- district: District name
+- village: Village name
+- land_size_acres: Land size in acres (convert if needed)
+- land_ownership: owned/leased/shared
+- annual_income: Annual income in rupees (convert lakhs/crores to numbers)
+- crops: List of crops grown
+- irrigation_type: Type of irrigation used
+- family_size: Number of family members
+- farming_equipment: Equipment owned
+- fertilizers_used: Fertilizers mentioned
+
+Rules:
+1. Return ONLY valid JSON format
+2. Use null for missing information
+3. Convert all measurements to standard units
+4. For crops, return as array even if single crop
+5. Be precise and don't make assumptions
+6. Handle both English and Hindi text
+
+Example output format:
+{
+    "name": "Ram Kumar",
+    "age": 45,
+    "gender": "male",
+    "phone_number": "9876543210",
+    "state": "Uttar Pradesh",
+    "district": "Aligarh",
+    "village": "Rampur",
+    "land_size_acres": 5.0,
+    "land_ownership": "owned",
+    "annual_income": 200000,
+    "crops": ["wheat", "rice"],
+    "irrigation_type": "borewell",
+    "family_size": 6,
+    "farming_equipment": ["tractor"],
+    "fertilizers_used": ["urea", "dap"]
+}
+"""
+
 
 class EnhancedInfoExtractionAgent:
     """Enhanced Agent for extracting farmer information with Ollama LLM integration"""
@@ -39,9 +83,7 @@ class EnhancedInfoExtractionAgent:
         self.nlp_models = {}
         self.ollama_client = None
         self.matchers = {}
-        self.agricultural_patterns = {}
-        self.location_patterns = {}
-        self.numeric_patterns = {}
+        self.engine: Optional[ExtractionEngine] = None
         self.ollama_enabled = OLLAMA_AVAILABLE
         self.ollama_model = "llama3.2"  # Default model
         
@@ -128,77 +170,8 @@ class EnhancedInfoExtractionAgent:
     async def _initialize_patterns(self):
         """Initialize extraction patterns for different entity types"""
         
-        # Enhanced agricultural patterns with more comprehensive coverage
-        self.agricultural_patterns = {
-            'crops': [
-                # Hindi crops
-                'धान', 'चावल', 'गेहूं', 'मक्का', 'ज्वार', 'बाजरा', 'रागी', 'दाल', 'अरहर', 'चना',
-                'मटर', 'मसूर', 'उड़द', 'मूंग', 'सरसों', 'सूरजमुखी', 'तिल', 'अलसी', 'कपास',
-                'गन्ना', 'आलू', 'प्याज', 'टमाटर', 'बैंगन', 'भिंडी', 'खीरा', 'लौकी', 'करेला',
-                'पत्तागोभी', 'फूलगोभी', 'गाजर', 'मूली', 'पालक', 'मेथी', 'धनिया',
-                # English crops
-                'rice', 'wheat', 'maize', 'corn', 'jowar', 'bajra', 'ragi', 'dal', 'arhar',
-                'chickpea', 'pea', 'lentil', 'urad', 'moong', 'mustard', 'sunflower', 'sesame',
-                'cotton', 'sugarcane', 'potato', 'onion', 'tomato', 'brinjal', 'okra', 'cucumber',
-                'bitter gourd', 'cabbage', 'cauliflower', 'carrot', 'radish', 'spinach', 'fenugreek'
-            ],
-            'farming_equipment': [
-                'ट्रैक्टर', 'हल', 'बीज ड्रिल', 'थ्रेशर', 'कंबाइन हार्वेस्टर', 'कल्टिवेटर',
-                'tractor', 'plough', 'seed drill', 'thresher', 'combine harvester',
-                'cultivator', 'harrow', 'rotavator', 'sprayer', 'weeder', 'transplanter'
-            ],
-            'irrigation_types': [
-                'बारिश', 'नहर', 'बोरवेल', 'कुआं', 'ड्रिप सिंचाई', 'फव्वारा सिंचाई', 'नलकूप',
-                'rain fed', 'canal', 'borewell', 'well', 'drip irrigation', 'sprinkler irrigation',
-                'tube well', 'surface irrigation', 'flood irrigation'
-            ],
-            'fertilizers': [
-                'खाद', 'यूरिया', 'डीएपी', 'पोटाश', 'जैविक खाद', 'कंपोस्ट', 'गोबर की खाद',
-                'fertilizer', 'urea', 'dap', 'potash', 'organic manure', 'compost', 'vermicompost',
-                'npk', 'phosphorus', 'nitrogen', 'potassium'
-            ]
-        }
-        
-        # Enhanced location patterns
-        self.location_patterns = {
-            'states': [
-                'उत्तर प्रदेश', 'महाराष्ट्र', 'बिहार', 'पश्चिम बंगाल', 'मध्य प्रदेश',
-                'तमिलनाडु', 'राजस्थान', 'कर्नाटक', 'गुजरात', 'आंध्र प्रदेश',
-                'uttar pradesh', 'up', 'maharashtra', 'bihar', 'west bengal', 'wb',
-                'madhya pradesh', 'mp', 'tamil nadu', 'tn', 'rajasthan', 'karnataka',
-                'gujarat', 'andhra pradesh', 'ap', 'punjab', 'haryana', 'kerala',
-                'odisha', 'jharkhand', 'chhattisgarh', 'assam', 'telangana'
-            ],
-            'districts': [
-                'अलीगढ़', 'मेरठ', 'मुजफ्फरनगर', 'सहारनपुर', 'गाज़ियाबाद', 'आगरा', 'कानपुर',
-                'aligarh', 'meerut', 'muzaffarnagar', 'saharanpur', 'ghaziabad', 'agra', 'kanpur',
-                'pune', 'nashik', 'ahmednagar', 'solapur', 'sangli', 'kolhapur', 'satara'
-            ]
-        }
-        
-        # Enhanced numeric patterns
-        self.numeric_patterns = {
-            'land_size': [
-                r'(\d+(?:\.\d+)?)\s*(?:एकड़|acre|acres|hectare|hectares|हेक्टेयर)',
-                r'(\d+(?:\.\d+)?)\s*(?:बीघा|bigha)',
-                r'(\d+(?:\.\d+)?)\s*(?:कट्ठा|katha)',
-                r'(\d+(?:\.\d+)?)\s*(?:गुंठा|guntha)'
-            ],
-            'income': [
-                r'(?:रुपये|रु|rs|₹|rupees?)\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-                r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:रुपये|रु|rs|₹|rupees?)',
-                r'(\d+(?:,\d+)*)\s*(?:लाख|lakh|lakhs)',
-                r'(\d+(?:,\d+)*)\s*(?:करोड़|crore|crores)'
-            ],
-            'age': [
-                r'(\d+)\s*(?:साल|वर्ष|years?|year old)',
-                r'(?:उम्र|age|आयु)\s*(\d+)'
-            ],
-            'family_size': [
-                r'(\d+)\s*(?:सदस्य|members?|लोग|people)',
-                r'(?:परिवार में|family of)\s*(\d+)'
-            ]
-        }
+        # Pattern tables come from the shared, versioned extraction engine artifact
+        self.engine = ExtractionEngine()
         
         # Initialize matchers for each language
         for lang_code, nlp in self.nlp_models.items():
@@ -209,21 +182,7 @@ class EnhancedInfoExtractionAgent:
         """Add extraction patterns to spaCy matcher"""
         matcher = self.matchers[lang_code]
         
-        # Crop patterns
-        crop_patterns = []
-        for crop in self.agricultural_patterns['crops']:
-            crop_patterns.append([{"LOWER": crop.lower()}])
-        
-        if crop_patterns:
-            matcher.add("CROPS", crop_patterns)
-        
-        # Location patterns
-        location_patterns = []
-        for location in self.location_patterns['states'] + self.location_patterns['districts']:
-            location_patterns.append([{"LOWER": location.lower()}])
-        
-        if location_patterns:
-            matcher.add("LOCATIONS", location_patterns)
+        self.engine.add_patterns_to_matcher(matcher)
         
         logger.info(f"Added patterns to matcher for {lang_code}")
     
@@ -248,7 +207,7 @@ class EnhancedInfoExtractionAgent:
             logger.info(f"Extracting information from text (lang: {language.value})")
             
             # Clean and preprocess text
-            cleaned_text = self._preprocess_text(text)
+            cleaned_text = self.engine.preprocess(text)
             
             # Get appropriate NLP model
             nlp = self.nlp_models.get(language.value, self.nlp_models['en'])
@@ -260,19 +219,10 @@ class EnhancedInfoExtractionAgent:
             entities = {}
             confidence_scores = {}
             
-            # Method 1: Pattern-based extraction
-            pattern_entities, pattern_confidence = await self._extract_with_patterns(
-                cleaned_text, language.value
-            )
-            entities.update(pattern_entities)
-            confidence_scores.update(pattern_confidence)
-            
-            # Method 2: Rule-based extraction
-            rule_entities, rule_confidence = await self._extract_with_rules(
-                cleaned_text, doc
-            )
-            entities.update(rule_entities)
-            confidence_scores.update(rule_confidence)
+            # Methods 1 and 2: Pattern and rule-based extraction
+            engine_entities, engine_confidence = self.engine.extract(cleaned_text)
+            entities.update(engine_entities)
+            confidence_scores.update(engine_confidence)
             
             # Method 3: Named Entity Recognition (for English)
             if language == LanguageCode.ENGLISH:
@@ -333,8 +283,8 @@ class EnhancedInfoExtractionAgent:
             return entities, confidence_scores
         
         try:
-            # Create structured prompt for farmer information extraction
-            extraction_prompt = self._create_extraction_prompt(text, language)
+            # Shared system prompt first, then this text
+            messages = self._create_extraction_messages(text, language)
             
             # Get response from Ollama
             loop = asyncio.get_event_loop()
@@ -342,10 +292,8 @@ class EnhancedInfoExtractionAgent:
                 None, 
                 lambda: self.ollama_client.chat(
                     model=self.ollama_model,
-                    messages=[{
-                        'role': 'user',
-                        'content': extraction_prompt
-                    }],
+                    messages=messages,
+                    keep_alive=settings.ollama_keep_alive,
                     options={
                         'temperature': 0.1,  # Low temperature for consistent extraction
                         'top_p': 0.9,
@@ -371,63 +319,12 @@ class EnhancedInfoExtractionAgent:
         
         return entities, confidence_scores
     
-    def _create_extraction_prompt(self, text: str, language: LanguageCode) -> str:
-        """Create a structured prompt for Ollama to extract farmer information"""
-        
-        prompt = f"""
-You are an expert information extraction system specialized in extracting farmer information from text. 
-Extract the following information from the given text and return it in JSON format.
-
-Text to analyze: "{text}"
-
-Extract these fields if present:
-- name: Farmer's name
-- age: Age in years (number only)
-- gender: male/female
-- phone_number: Phone number
-- state: State name
-- district: District name
-- village: Village name
-- land_size_acres: Land size in acres (convert if needed)
-- land_ownership: owned/leased/shared
-- annual_income: Annual income in rupees (convert lakhs/crores to numbers)
-- crops: List of crops grown
-- irrigation_type: Type of irrigation used
-- family_size: Number of family members
-- farming_equipment: Equipment owned
-- fertilizers_used: Fertilizers mentioned
-
-Rules:
-1. Return ONLY valid JSON format
-2. Use null for missing information
-3. Convert all measurements to standard units
-4. For crops, return as array even if single crop
-5. Be precise and don't make assumptions
-6. Handle both English and Hindi text
-
-Example output format:
-{{
-    "name": "Ram Kumar",
-    "age": 45,
-    "gender": "male",
-    "phone_number": "9876543210",
-    "state": "Uttar Pradesh",
-    "district": "Aligarh",
-    "village": "Rampur",
-    "land_size_acres": 5.0,
-    "land_ownership": "owned",
-    "annual_income": 200000,
-    "crops": ["wheat", "rice"],
-    "irrigation_type": "borewell",
-    "family_size": 6,
-    "farming_equipment": ["tractor"],
-    "fertilizers_used": ["urea", "dap"]
-}}
-
-JSON Response:
-"""
-        
-        return prompt
+    def _create_extraction_messages(self, text: str, language: LanguageCode) -> List[Dict[str, str]]:
+        """Chat messages for Ollama: the shared system prompt, then the text to analyze"""
+        return [
+            {'role': 'system', 'content': EXTRACTION_SYSTEM_PROMPT},
+            {'role': 'user', 'content': f'Text to analyze: "{text}"'}
+        ]
     
     def _parse_ollama_response(self, response: str) -> Dict[str, Any]:
         """Parse Ollama's JSON response into structured entities"""
@@ -493,156 +390,6 @@ JSON Response:
         
         return entities
     
-    def _preprocess_text(self, text: str) -> str:
-        """Clean and preprocess input text"""
-        if not text:
-            return ""
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # Remove special characters but keep important punctuation
-        text = re.sub(r'[^\w\s.,।?!₹]', ' ', text)
-        
-        # Normalize common variations
-        text = text.replace('रु.', 'रुपये')
-        text = text.replace('Rs.', 'rupees')
-        text = text.replace('₹', 'rupees')
-        
-        return text
-    
-    async def _extract_with_patterns(
-        self, text: str, language: str
-    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
-        """Extract entities using pattern matching"""
-        entities = {}
-        confidence_scores = {}
-        
-        try:
-            # Extract crops
-            crops = []
-            for crop in self.agricultural_patterns['crops']:
-                if crop.lower() in text.lower():
-                    crops.append(crop)
-            
-            if crops:
-                entities['crops'] = crops
-                confidence_scores['crops'] = 0.8
-            
-            # Extract land size
-            land_size = self._extract_numeric_value(text, 'land_size')
-            if land_size:
-                entities['land_size_acres'] = float(land_size)
-                confidence_scores['land_size_acres'] = 0.9
-            
-            # Extract income
-            income = self._extract_numeric_value(text, 'income')
-            if income:
-                entities['annual_income'] = self._normalize_income(income, text)
-                confidence_scores['annual_income'] = 0.8
-            
-            # Extract age
-            age = self._extract_numeric_value(text, 'age')
-            if age:
-                entities['age'] = int(age)
-                confidence_scores['age'] = 0.9
-            
-            # Extract family size
-            family_size = self._extract_numeric_value(text, 'family_size')
-            if family_size:
-                entities['family_size'] = int(family_size)
-                confidence_scores['family_size'] = 0.8
-            
-        except Exception as e:
-            logger.warning(f"Pattern extraction failed: {str(e)}")
-        
-        return entities, confidence_scores
-    
-    def _normalize_income(self, income_str: str, full_text: str) -> int:
-        """Normalize income to rupees"""
-        try:
-            income_num = float(income_str.replace(',', ''))
-            
-            # Check for lakh/crore indicators
-            if any(word in full_text.lower() for word in ['lakh', 'लाख']):
-                income_num *= 100000
-            elif any(word in full_text.lower() for word in ['crore', 'करोड़']):
-                income_num *= 10000000
-            
-            return int(income_num)
-        except:
-            return income_str
-    
-    async def _extract_with_rules(
-        self, text: str, doc
-    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
-        """Extract entities using rule-based approach"""
-        entities = {}
-        confidence_scores = {}
-
-        try:
-            # Rule 1: Extract phone numbers
-            phone_pattern = r'(?:\+91|91)?[-.\s]?[6-9]\d{9}'
-            phone_matches = re.findall(phone_pattern, text)
-            if phone_matches:
-                entities['phone_number'] = phone_matches[0]
-                confidence_scores['phone_number'] = 0.95
-
-            # Rule 2: Extract irrigation type
-            irrigation_keywords = {
-                'rain fed': ['rain', 'बारिश', 'rainfall'],
-                'canal': ['canal', 'नहर'],
-                'borewell': ['borewell', 'bore well', 'tube well', 'बोरवेल', 'नलकूप'],
-                'drip': ['drip', 'ड्रिप'],
-                'sprinkler': ['sprinkler', 'फव्वारा']
-            }
-
-            for irrigation_type, keywords in irrigation_keywords.items():
-                if any(keyword.lower() in text.lower() for keyword in keywords):
-                    entities['irrigation_type'] = irrigation_type
-                    confidence_scores['irrigation_type'] = 0.7
-                    break
-
-            # Rule 3: Extract known location mentions
-            locations = []
-            for location in self.location_patterns['states'] + self.location_patterns['districts']:
-                if location.lower() in text.lower():
-                    locations.append(location)
-            
-            if locations:
-                entities['locations'] = locations
-                confidence_scores['locations'] = 0.85
-
-            # Rule 4: Extract gender information
-            gender_keywords = {
-                'male': ['sir', 'mr', 'साहब', 'भाई', 'जी'],
-                'female': ['madam', 'mrs', 'ms', 'मैडम', 'बहन', 'जी']
-            }
-            
-            for gender, keywords in gender_keywords.items():
-                if any(keyword.lower() in text.lower() for keyword in keywords):
-                    entities['gender'] = gender
-                    confidence_scores['gender'] = 0.6
-                    break
-
-            # Rule 5: Extract land ownership type
-            ownership_keywords = {
-                'owned': ['own', 'owned', 'अपना', 'स्वामित्व'],
-                'leased': ['lease', 'leased', 'rent', 'किराया', 'लीज'],
-                'shared': ['share', 'shared', 'साझा', 'बंटाई']
-            }
-            
-            for ownership_type, keywords in ownership_keywords.items():
-                if any(keyword.lower() in text.lower() for keyword in keywords):
-                    entities['land_ownership'] = ownership_type
-                    confidence_scores['land_ownership'] = 0.7
-                    break
-
-        except Exception as e:
-            logger.warning(f"Rule-based extraction failed: {str(e)}")
-
-        return entities, confidence_scores
-
     async def _extract_with_ner(self, doc) -> Tuple[Dict[str, Any], Dict[str, float]]:
         """Extract entities using spaCy's NER (only for English)"""
         entities = {}
@@ -669,44 +416,9 @@ JSON Response:
 
         return entities, confidence_scores
 
-    def _extract_numeric_value(self, text: str, category: str) -> Optional[str]:
-        """Extract numeric value from text using regex for a given category"""
-        patterns = self.numeric_patterns.get(category, [])
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).replace(",", "")
-        return None
-
     def _build_farmer_info(self, entities: Dict[str, Any]) -> FarmerInfo:
         """Build FarmerInfo dataclass object from extracted entities"""
-        # Handle locations - separate state and district
-        locations = entities.get('locations', [])
-        state = None
-        district = None
-        
-        if locations:
-            for location in locations:
-                if location.lower() in [s.lower() for s in self.location_patterns['states']]:
-                    state = location
-                elif location.lower() in [d.lower() for d in self.location_patterns['districts']]:
-                    district = location
-        
-        return FarmerInfo(
-            name=entities.get("name"),
-            phone_number=entities.get("phone_number"),
-            age=entities.get("age"),
-            gender=entities.get("gender"),
-            family_size=entities.get("family_size"),
-            state=entities.get("state") or state,
-            district=entities.get("district") or district,
-            village=entities.get("village"),
-            land_size_acres=entities.get("land_size_acres"),
-            land_ownership=entities.get("land_ownership"),
-            annual_income=entities.get("annual_income"),
-            crops=entities.get("crops", []),
-            irrigation_type=entities.get("irrigation_type")
-        )
+        return FarmerInfo(**self.engine.farmer_fields(entities))
     
     async def is_ready(self) -> bool:
         """Check if the agent is ready"""
@@ -754,9 +466,7 @@ JSON Response:
         """Get statistics about extraction performance"""
         return {
             "supported_languages": list(self.nlp_models.keys()),
-            "total_crop_patterns": len(self.agricultural_patterns.get('crops', [])),
-            "total_location_patterns": len(self.location_patterns.get('states', []) + self.location_patterns.get('districts', [])),
-            "numeric_pattern_categories": list(self.numeric_patterns.keys()),
+            "patterns": self.engine.get_stats() if self.engine else None,
             "ollama_enabled": self.ollama_enabled,
             "ollama_model": self.ollama_model if self.ollama_enabled else None
         }
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""
+Extraction engine shared by the AI agent service and the standalone agent
+
+Pattern and rule extraction driven by the versioned ``patterns.json``
+artifact; spaCy NER and LLM extraction stay in the agents that use it.
+"""
+
+from .engine import ExtractionEngine
+from .gazetteer import Gazetteer, GazetteerEntry, GazetteerMatch
+from .patterns import CompiledPatterns, load_patterns, PATTERNS_PATH
+from .regex_bank import RegexBank
+
+__all__ = [
+    'ExtractionEngine',
+    'CompiledPatterns',
+    'load_patterns',
+    'PATTERNS_PATH',
+    'Gazetteer',
+    'GazetteerEntry',
+    'GazetteerMatch',
+    'RegexBank'
+]
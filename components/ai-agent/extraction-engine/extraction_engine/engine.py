@@ -0,0 +1,231 @@
+"""
+Extraction Engine
+Pattern and rule based farmer information extraction, independent of spaCy,
+the LLM and any service's models, so every entry point produces the same
+fields from the same text
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+
+from .gazetteer import Gazetteer, GazetteerMatch
+from .patterns import CompiledPatterns, load_patterns
+from .regex_bank import NOISE_RE, PHONE_RE, WHITESPACE_RE
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionEngine:
+    """
+    Cheap, deterministic extraction shared by the extraction agents
+
+    Agents layer NER and LLM extraction on top of ``extract`` and turn the
+    merged entities into their own ``FarmerInfo`` with ``farmer_fields``.
+    """
+
+    def __init__(self, patterns: Optional[CompiledPatterns] = None):
+        self.patterns = patterns or load_patterns()
+
+    @property
+    def version(self) -> str:
+        return self.patterns.version
+
+    def preprocess(self, text: str) -> str:
+        """Clean and preprocess input text"""
+        if not text:
+            return ""
+
+        # Remove extra whitespace
+        text = WHITESPACE_RE.sub(' ', text.strip())
+
+        # Remove special characters but keep important punctuation
+        text = NOISE_RE.sub(' ', text)
+
+        # Normalize common variations
+        text = text.replace('रु.', 'रुपये')
+        text = text.replace('Rs.', 'rupees')
+        text = text.replace('₹', 'rupees')
+
+        return text
+
+    def extract(self, text: str) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Run pattern and rule extraction on preprocessed text
+
+        Args:
+            text: Output of ``preprocess``
+
+        Returns:
+            Tuple of (entities, confidence_scores)
+        """
+        # Find every gazetteer term in a single pass
+        matches = self.patterns.gazetteer.find_all(text)
+
+        entities, confidence_scores = self.extract_patterns(text, matches)
+
+        rule_entities, rule_confidence = self.extract_rules(text, matches)
+        entities.update(rule_entities)
+        confidence_scores.update(rule_confidence)
+
+        return entities, confidence_scores
+
+    def extract_patterns(
+        self, text: str, matches: Optional[List[GazetteerMatch]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Extract crops and numeric facts using pattern matching"""
+        entities = {}
+        confidence_scores = {}
+
+        try:
+            if matches is None:
+                matches = self.patterns.gazetteer.find_all(text)
+
+            # Extract crops
+            crops = Gazetteer.values(matches, 'crop')
+            if crops:
+                entities['crops'] = crops
+                confidence_scores['crops'] = 0.8
+
+            numeric_values = self.extract_numeric_values(text)
+
+            # Extract land size
+            land_size = numeric_values.get('land_size')
+            if land_size:
+                entities['land_size_acres'] = float(land_size)
+                confidence_scores['land_size_acres'] = 0.9
+
+            # Extract income
+            income = numeric_values.get('income')
+            if income:
+                entities['annual_income'] = self.normalize_income(income, text)
+                confidence_scores['annual_income'] = 0.8
+
+            # Extract age
+            age = numeric_values.get('age')
+            if age:
+                entities['age'] = int(age)
+                confidence_scores['age'] = 0.9
+
+            # Extract family size
+            family_size = numeric_values.get('family_size')
+            if family_size:
+                entities['family_size'] = int(family_size)
+                confidence_scores['family_size'] = 0.8
+
+        except Exception as e:
+            logger.warning(f"Pattern extraction failed: {str(e)}")
+
+        return entities, confidence_scores
+
+    def extract_rules(
+        self, text: str, matches: Optional[List[GazetteerMatch]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Extract entities using rule-based approach"""
+        entities = {}
+        confidence_scores = {}
+
+        try:
+            if matches is None:
+                matches = self.patterns.gazetteer.find_all(text)
+
+            # Rule 1: Extract phone numbers
+            phone_matches = PHONE_RE.findall(text)
+            if phone_matches:
+                entities['phone_number'] = phone_matches[0]
+                confidence_scores['phone_number'] = 0.95
+
+            # Rule 2: Extract irrigation type
+            irrigation_type = Gazetteer.first_value(matches, 'irrigation')
+            if irrigation_type:
+                entities['irrigation_type'] = irrigation_type
+                confidence_scores['irrigation_type'] = 0.7
+
+            # Rule 3: Extract known location mentions
+            locations = Gazetteer.values(matches, 'location')
+            if locations:
+                entities['locations'] = locations
+                confidence_scores['locations'] = 0.85
+
+            # Rule 4: Extract gender information
+            gender = Gazetteer.first_value(matches, 'gender')
+            if gender:
+                entities['gender'] = gender
+                confidence_scores['gender'] = 0.6
+
+            # Rule 5: Extract land ownership type
+            ownership_type = Gazetteer.first_value(matches, 'land_ownership')
+            if ownership_type:
+                entities['land_ownership'] = ownership_type
+                confidence_scores['land_ownership'] = 0.7
+
+        except Exception as e:
+            logger.warning(f"Rule-based extraction failed: {str(e)}")
+
+        return entities, confidence_scores
+
+    def extract_numeric_values(self, text: str) -> Dict[str, str]:
+        """Extract every numeric category"""
+        values = self.patterns.numeric_bank.search_all(text)
+        return {category: value.replace(",", "") for category, value in values.items()}
+
+    @staticmethod
+    def normalize_income(income_str: str, full_text: str) -> int:
+        """Normalize income to rupees"""
+        try:
+            income_num = float(income_str.replace(',', ''))
+
+            # Check for lakh/crore indicators
+            if any(word in full_text.lower() for word in ['lakh', 'लाख']):
+                income_num *= 100000
+            elif any(word in full_text.lower() for word in ['crore', 'करोड़']):
+                income_num *= 10000000
+
+            return int(income_num)
+        except:
+            return income_str
+
+    def farmer_fields(self, entities: Dict[str, Any]) -> Dict[str, Any]:
+        """FarmerInfo keyword arguments for merged entities"""
+        # Handle locations - separate state and district
+        state = None
+        district = None
+        for location in entities.get('locations', []):
+            kind = self.patterns.location_kinds.get(location.lower())
+            if kind == 'state':
+                state = location
+            elif kind == 'district':
+                district = location
+
+        return {
+            "name": entities.get("name"),
+            "phone_number": entities.get("phone_number"),
+            "age": entities.get("age"),
+            "gender": entities.get("gender"),
+            "family_size": entities.get("family_size"),
+            "state": entities.get("state") or state,
+            "district": entities.get("district") or district,
+            "village": entities.get("village"),
+            "land_size_acres": entities.get("land_size_acres"),
+            "land_ownership": entities.get("land_ownership"),
+            "annual_income": entities.get("annual_income"),
+            "crops": entities.get("crops", []),
+            "irrigation_type": entities.get("irrigation_type")
+        }
+
+    def add_patterns_to_matcher(self, matcher):
+        """Add crop and location patterns to a spaCy Matcher"""
+        crop_patterns = [[{"LOWER": crop.lower()}] for crop in self.patterns.crops]
+        if crop_patterns:
+            matcher.add("CROPS", crop_patterns)
+
+        location_patterns = [[{"LOWER": location.lower()}] for location in self.patterns.locations]
+        if location_patterns:
+            matcher.add("LOCATIONS", location_patterns)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get engine statistics"""
+        return self.patterns.get_stats()
+
+
+__all__ = ["ExtractionEngine"]
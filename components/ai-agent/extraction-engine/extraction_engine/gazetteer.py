@@ -0,0 +1,171 @@
+"""
+Gazetteer matcher for the extraction engine
+Aho-Corasick automaton over every keyword list the extractor knows about, so
+all crops, locations and keywords in a text are found in one linear pass
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GazetteerEntry:
+    """One term of a gazetteer and what it stands for"""
+    term: str
+    entity_type: str
+    value: Any
+    order: int  # Position within its entity type, used to keep list order in results
+
+
+@dataclass(frozen=True)
+class GazetteerMatch:
+    """A gazetteer term found in the text, with character offsets into the lowercased text"""
+    start: int
+    end: int
+    entry: GazetteerEntry
+
+    @property
+    def entity_type(self) -> str:
+        return self.entry.entity_type
+
+    @property
+    def value(self) -> Any:
+        return self.entry.value
+
+
+class Gazetteer:
+    """
+    Case-insensitive multi-pattern matcher
+
+    Terms are matched as substrings, like the ``term in text.lower()`` checks
+    they replace. A term may belong to several entity types; every one of
+    them is reported. Matching costs O(len(text) + matches) regardless of how
+    many terms are loaded.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._entries: List[List[GazetteerEntry]] = [[]]  # Terms ending exactly at each state
+        self._output: List[List[GazetteerEntry]] = [[]]  # Plus those ending at its suffix states
+        self._counts: Dict[str, int] = {}
+        self._built = False
+
+    def add(self, term: str, entity_type: str, value: Any = None):
+        """
+        Add a term to the automaton
+
+        Args:
+            term: Text to look for
+            entity_type: Type reported for matches, e.g. ``crop``
+            value: Canonical value reported for matches, defaults to the term itself
+        """
+        key = term.lower()
+        if not key:
+            return
+
+        order = self._counts.get(entity_type, 0)
+        self._counts[entity_type] = order + 1
+
+        node = 0
+        for char in key:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._entries.append([])
+            node = next_node
+
+        self._entries[node].append(
+            GazetteerEntry(term=term, entity_type=entity_type, value=term if value is None else value, order=order)
+        )
+        self._built = False
+
+    def add_terms(self, terms: Iterable[str], entity_type: str):
+        """Add a plain list of terms, each its own value"""
+        for term in terms:
+            self.add(term, entity_type)
+
+    def add_keywords(self, keywords: Dict[str, List[str]], entity_type: str):
+        """Add a ``{value: [keywords]}`` mapping; every keyword reports its value"""
+        for value, terms in keywords.items():
+            for term in terms:
+                self.add(term, entity_type, value)
+
+    def build(self):
+        """Compute failure links; called automatically on first use"""
+        self._output = [list(entries) for entries in self._entries]
+        queue = deque()
+        for node in self._goto[0].values():
+            self._fail[node] = 0
+            queue.append(node)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                # Inherit the outputs of the longest proper suffix
+                self._output[child] = self._entries[child] + self._output[self._fail[child]]
+
+        self._built = True
+        logger.info(f"Gazetteer built: {sum(self._counts.values())} terms, {len(self._goto)} states")
+
+    def find_all(self, text: str) -> List[GazetteerMatch]:
+        """
+        Find every occurrence of every term in one pass
+
+        Args:
+            text: Text to search
+
+        Returns:
+            Matches ordered by end offset
+        """
+        if not self._built:
+            self.build()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        node = 0
+        for index, char in enumerate(text.lower()):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for entry in output[node]:
+                end = index + 1
+                matches.append(GazetteerMatch(start=end - len(entry.term.lower()), end=end, entry=entry))
+        return matches
+
+    @staticmethod
+    def values(matches: List[GazetteerMatch], entity_type: str) -> List[Any]:
+        """Distinct matched values of one type, in gazetteer order"""
+        found: Dict[Any, int] = {}
+        for match in matches:
+            if match.entity_type == entity_type:
+                found[match.value] = min(match.entry.order, found.get(match.value, match.entry.order))
+        return [value for value, _ in sorted(found.items(), key=lambda item: item[1])]
+
+    @staticmethod
+    def first_value(matches: List[GazetteerMatch], entity_type: str) -> Any:
+        """The matched value of a type that comes first in the gazetteer, or None"""
+        best: Optional[Tuple[int, Any]] = None
+        for match in matches:
+            if match.entity_type == entity_type and (best is None or match.entry.order < best[0]):
+                best = (match.entry.order, match.value)
+        return best[1] if best else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get automaton size per entity type"""
+        return {"terms": dict(self._counts), "states": len(self._goto)}
+
+
+__all__ = ["Gazetteer", "GazetteerEntry", "GazetteerMatch"]
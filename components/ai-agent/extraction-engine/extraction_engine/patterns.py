@@ -0,0 +1,104 @@
+"""
+Pattern artifact for the extraction engine
+
+Every keyword list and regex the extractor uses lives in ``patterns.json``.
+It is loaded and compiled once per process and shared by every engine, so
+services that extract farmer information use the same patterns and pay the
+compilation cost once.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+from .gazetteer import Gazetteer
+from .regex_bank import RegexBank
+
+logger = logging.getLogger(__name__)
+
+PATTERNS_PATH = Path(__file__).resolve().parent / "patterns.json"
+
+# Artifact format versions this code can read
+SUPPORTED_VERSIONS = {1}
+
+
+class CompiledPatterns:
+    """
+    A loaded pattern artifact with its gazetteer and regexes built
+
+    ``version`` combines the artifact's format version with a digest of its
+    content, so anything cached from one set of patterns is never reused
+    with another.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        if data.get("version") not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Unsupported pattern artifact version: {data.get('version')}")
+
+        self.data = data
+        self.crops: List[str] = data["crops"]
+        self.states: List[str] = data["states"]
+        self.districts: List[str] = data["districts"]
+        self.keywords: Dict[str, Dict[str, List[str]]] = data["keywords"]
+        self.numeric: Dict[str, List[str]] = data["numeric"]
+
+        digest = hashlib.sha256(
+            json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        self.version = f"{data['version']}-{digest[:12]}"
+
+        # One automaton over every gazetteer, matched once per text
+        self.gazetteer = Gazetteer()
+        self.gazetteer.add_terms(self.crops, 'crop')
+        self.gazetteer.add_terms(self.states + self.districts, 'location')
+        for entity_type, keywords in self.keywords.items():
+            self.gazetteer.add_keywords(keywords, entity_type)
+        self.gazetteer.build()
+
+        self.numeric_bank = RegexBank(self.numeric, re.IGNORECASE)
+
+        # Lowercase name -> kind, for splitting matched locations into state/district
+        self.location_kinds = {
+            **{district.lower(): 'district' for district in self.districts},
+            **{state.lower(): 'state' for state in self.states}
+        }
+
+    @property
+    def locations(self) -> List[str]:
+        return self.states + self.districts
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get artifact statistics"""
+        return {
+            "version": self.version,
+            "total_crop_patterns": len(self.crops),
+            "total_location_patterns": len(self.locations),
+            "numeric_pattern_categories": list(self.numeric.keys()),
+            "keyword_categories": list(self.keywords.keys()),
+            "gazetteer": self.gazetteer.get_stats()
+        }
+
+
+@lru_cache(maxsize=None)
+def load_patterns(path: str = str(PATTERNS_PATH)) -> CompiledPatterns:
+    """
+    Load and compile a pattern artifact, once per path per process
+
+    Args:
+        path: JSON artifact to load, defaults to the bundled ``patterns.json``
+
+    Returns:
+        Shared CompiledPatterns instance
+    """
+    with open(path, encoding="utf-8") as f:
+        patterns = CompiledPatterns(json.load(f))
+    logger.info(f"Loaded extraction patterns {patterns.version} from {path}")
+    return patterns
+
+
+__all__ = ["CompiledPatterns", "load_patterns", "PATTERNS_PATH", "SUPPORTED_VERSIONS"]
@@ -0,0 +1,64 @@
+"""
+Regex bank for the extraction engine
+
+Compiles the extraction patterns once instead of passing raw pattern strings
+to ``re`` on every request
+"""
+
+import re
+from typing import Dict, List, Optional, Pattern
+
+PHONE_RE = re.compile(r'(?:\+91|91)?[-.\s]?[6-9]\d{9}')
+
+# Text normalisation
+WHITESPACE_RE = re.compile(r'\s+')
+NOISE_RE = re.compile(r'[^\w\s.,।?!₹]')
+
+
+class RegexBank:
+    """
+    Compiled patterns grouped by category
+
+    Each pattern must have exactly one capturing group holding the value.
+    ``search`` keeps the per-category priority order (first pattern that
+    matches anywhere wins). Categories are searched independently: their
+    patterns overlap (a phone number also looks like an income), so one
+    combined alternation would let one category hide another.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]], flags: int = 0):
+        self.patterns = patterns
+        self.compiled: Dict[str, List[Pattern]] = {
+            category: [re.compile(pattern, flags) for pattern in category_patterns]
+            for category, category_patterns in patterns.items()
+        }
+
+        for category, compiled in self.compiled.items():
+            for pattern in compiled:
+                if pattern.groups != 1:
+                    raise ValueError(f"Pattern for '{category}' must have exactly one group: {pattern.pattern}")
+
+    def search(self, category: str, text: str) -> Optional[str]:
+        """First value for a category, trying its patterns in priority order"""
+        for pattern in self.compiled.get(category, []):
+            match = pattern.search(text)
+            if match:
+                return match.group(1)
+        return None
+
+    def search_all(self, text: str) -> Dict[str, str]:
+        """``search`` for every category"""
+        found = {}
+        for category in self.compiled:
+            value = self.search(category, text)
+            if value is not None:
+                found[category] = value
+        return found
+
+
+__all__ = [
+    'RegexBank',
+    'PHONE_RE',
+    'WHITESPACE_RE',
+    'NOISE_RE'
+]
@@ -0,0 +1,62 @@
+"""Tests for the compiled regex bank"""
+
+import random
+import re
+
+import pytest
+
+from extraction_engine import RegexBank, load_patterns
+
+NUMBERS = ["5", "45", "3.5", "12", "2,00,000", "150000", "9876543210", "6"]
+WORDS = [
+    "एकड़", "acres", "bigha", "बीघा", "साल", "years", "year old", "age", "उम्र",
+    "rs", "रुपये", "₹", "lakh", "लाख", "crore", "members", "सदस्य", "लोग",
+    "family of", "परिवार में", "phone", "income", "मेरा", "wheat", "and", "है",
+]
+
+
+def _raw_search_all(patterns, text):
+    """Reference behaviour: raw patterns, first match per category in priority order"""
+    found = {}
+    for category, category_patterns in patterns.items():
+        for pattern in category_patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                found[category] = match.group(1)
+                break
+    return found
+
+
+def _random_texts(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        tokens = [rng.choice(NUMBERS + WORDS) for _ in range(rng.randint(1, 12))]
+        yield rng.choice([" ", "  ", ""]).join(tokens)
+
+
+@pytest.fixture(scope="module")
+def patterns():
+    return load_patterns()
+
+
+def test_search_all_matches_raw_patterns(patterns):
+    for text in _random_texts(3000):
+        assert patterns.numeric_bank.search_all(text) == _raw_search_all(patterns.numeric, text), text
+
+
+def test_phone_number_is_not_income(patterns):
+    found = patterns.numeric_bank.search_all("phone 9876543210, age 45")
+    assert "income" not in found
+    assert found["age"] == "45"
+
+
+def test_search_keeps_pattern_priority():
+    bank = RegexBank({"size": [r"(\d+) acres", r"(\d+)"]})
+    assert bank.search("size", "plot 7, 3 acres") == "3"
+    assert bank.search("size", "plot 7") == "7"
+    assert bank.search("missing", "plot 7") is None
+
+
+def test_patterns_need_one_group():
+    with pytest.raises(ValueError):
+        RegexBank({"size": [r"\d+ acres"]})
@@ -6,37 +6,81 @@ Handles communication with Ollama for local LLM processing
 import asyncio
 import json
 import time
-from typing import Dict, List, Optional, Any, AsyncGenerator
-import aiohttp
+from typing import Dict, List, Optional, Any, AsyncGenerator, Tuple
 import logging
 
-try:
-    from ollama import AsyncClient, Client
-    OLLAMA_AVAILABLE = True
-except ImportError:
-    OLLAMA_AVAILABLE = False
-
 from config import get_settings
+from llm_gateway import OLLAMA_AVAILABLE, LLMGateway, get_llm_gateway
+from llm_router import ModelRouter
+from llm_scheduler import LLMPriority, LLMQueueFullError
+from models import FarmerInfo
+from utils.cache import ResultCache, create_disk_backend
 from utils.error_handeller import raise_ollama_error, OllamaError
+from utils.json_stream import IncrementalJSONParser, iter_json_fields
 from utils.logger import get_logger, log_async_execution_time
 
 settings = get_settings()
 logger = get_logger(__name__)
 
+# FarmerInfo fields extracted by the LLM and what they mean; the output shape
+# itself is enforced through Ollama's format parameter
+EXTRACTION_FIELDS = {
+    'name': "Farmer's full name",
+    'age': "Age in years",
+    'gender': "male or female",
+    'phone_number': "10-digit phone number",
+    'state': "Full state name in English",
+    'district': "District name in English",
+    'village': "Village name",
+    'land_size_acres': "Land size in acres, converted from other units",
+    'land_ownership': "owned, leased or shared",
+    'annual_income': "Annual income in rupees, lakhs/crores converted to numbers",
+    'crops': "Crop names in English",
+    'irrigation_type': "rain_fed, canal, borewell, drip or sprinkler",
+    'family_size': "Number of family members"
+}
+
+# Identical for every extraction request and sent first, so Ollama reuses its
+# KV cache; everything that varies goes in the user message after it
+EXTRACTION_SYSTEM_PROMPT = (
+    "Extract information about an Indian farmer from the user's text as JSON.\n"
+    "Use null for anything not mentioned; don't guess. Translate Hindi crop names to English.\n\n"
+    "Fields:\n" + "\n".join(f"- {field}: {description}" for field, description in EXTRACTION_FIELDS.items())
+)
+
+LANGUAGE_HINTS = {
+    'hi': "The text is in Hindi/Hinglish.",
+    'en': "The text is in English.",
+}
+
 class OllamaAgent:
     """
     Agent for interacting with Ollama LLM models
-    Provides both synchronous and asynchronous interfaces
+    Sends every request through the shared, pooled LLM gateway
     """
     
-    def __init__(self, host: Optional[str] = None, timeout: int = 60):
+    def __init__(self, host: Optional[str] = None, timeout: Optional[int] = None):
         self.host = host or settings.ollama_host
-        self.timeout = timeout
-        self.async_client: Optional[AsyncClient] = None
-        self.sync_client: Optional[Client] = None
+        self.timeout = timeout or settings.ollama_timeout
+        self.gateway: Optional[LLMGateway] = None
+        self._owns_gateway = False
+        self.response_cache: Optional[ResultCache] = None
+        self.cache_stats = {"uncacheable": 0}
         self.available_models: List[str] = []
         self.current_model: str = settings.ollama_model
         self.fallback_model: str = settings.ollama_fallback_model
+        self.router: Optional[ModelRouter] = None
+        if settings.llm_routing_enabled:
+            self.router = ModelRouter(
+                primary=self.current_model,
+                fallback=None,  # Set once the fallback is known to be pulled
+                latency_slo=settings.llm_latency_slo_seconds,
+                window_seconds=settings.llm_latency_window_seconds,
+                min_samples=settings.llm_routing_min_samples,
+                max_queue_depth=settings.llm_routing_max_queue_depth,
+                recovery_ratio=settings.llm_routing_recovery_ratio,
+                queue_depth_fn=self._queue_depth
+            )
         self.is_available = OLLAMA_AVAILABLE
         
         logger.info(f"Initializing Ollama agent with host: {self.host}")
@@ -48,14 +92,20 @@ class OllamaAgent:
             return
         
         try:
-            # Initialize async client
-            self.async_client = AsyncClient(
-                host=self.host,
-                timeout=aiohttp.ClientTimeout(total=self.timeout)
-            )
-            
-            # Initialize sync client for non-async operations
-            self.sync_client = Client(host=self.host)
+            if self.host == settings.ollama_host and self.timeout == settings.ollama_timeout:
+                # Share connections and in-flight generations with the rest of the service
+                self.gateway = get_llm_gateway()
+            else:
+                self.gateway = LLMGateway(host=self.host, timeout=self.timeout)
+                self._owns_gateway = True
+            
+            if settings.llm_cache_enabled:
+                self.response_cache = ResultCache(
+                    "llm",
+                    max_entries=settings.llm_cache_max_entries,
+                    ttl_seconds=settings.llm_cache_ttl_seconds,
+                    backend=create_disk_backend(settings.llm_cache_path, settings.llm_cache_disk_max_entries)
+                )
             
             # Check connectivity and get available models
             await self._check_connectivity()
@@ -72,7 +122,7 @@ class OllamaAgent:
         """Check if Ollama server is reachable"""
         try:
             # Simple health check
-            response = await self.async_client.list()
+            response = await self.gateway.list()
             logger.info("Ollama server connectivity confirmed")
         except Exception as e:
             logger.error(f"Cannot connect to Ollama server: {str(e)}")
@@ -81,7 +131,7 @@ class OllamaAgent:
     async def _load_available_models(self):
         """Load list of available models from Ollama"""
         try:
-            response = await self.async_client.list()
+            response = await self.gateway.list()
             self.available_models = [model['name'] for model in response['models']]
             
             if not self.available_models:
@@ -100,6 +150,10 @@ class OllamaAgent:
                     self.current_model = self.available_models[0]
                     logger.info(f"Using first available model: {self.current_model}")
             
+            if self.router:
+                fallback_ready = self.fallback_model in self.available_models and self.fallback_model != self.current_model
+                self.router.set_models(self.current_model, self.fallback_model if fallback_ready else None)
+            
             logger.info(f"Available models: {self.available_models}")
             
         except Exception as e:
@@ -112,6 +166,8 @@ class OllamaAgent:
         messages: List[Dict[str, str]], 
         model: Optional[str] = None,
         stream: bool = False,
+        format: Any = '',
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -121,15 +177,17 @@ class OllamaAgent:
             messages: List of message objects with 'role' and 'content'
             model: Model to use (optional, uses default if not specified)
             stream: Whether to stream the response
-            **kwargs: Additional parameters for Ollama
+            format: '' for free text, 'json', or a JSON schema to constrain the output to
+            priority: Scheduling priority, BACKGROUND for work nobody is waiting on
+            **kwargs: Additional parameters for Ollama, ``num_predict=None`` for no length limit
             
         Returns:
             Response from Ollama
         """
-        if not self.is_available or not self.async_client:
+        if not self.is_available or not self.gateway:
             raise_ollama_error("Ollama client not available")
         
-        model = model or self.current_model
+        model, fallback = self._route(model, priority)
         
         if model not in self.available_models:
             raise_ollama_error(f"Model '{model}' not available. Available models: {self.available_models}")
@@ -145,17 +203,34 @@ class OllamaAgent:
                 'num_predict': kwargs.get('num_predict', 512),
                 **{k: v for k, v in kwargs.items() if k not in ['temperature', 'top_p', 'top_k', 'num_predict']}
             }
+            options = {k: v for k, v in options.items() if v is not None}
             
-            response = await self.async_client.chat(
+            if stream:
+                return self.gateway.chat_stream(
+                    priority=priority, model=model, messages=messages, format=format, options=options
+                )
+            
+            cache_key, cached = await self._cached_response("chat", model, messages, format, options)
+            if cached is not None:
+                logger.info(f"Chat response for model '{model}' served from cache")
+                return {**cached, "routing": self._routing_metadata(model, fallback, cached=True)}
+            
+            start_time = time.time()
+            response = await self.gateway.chat(
+                priority=priority,
                 model=model,
                 messages=messages,
-                stream=stream,
+                format=format,
                 options=options
             )
+            self._record_latency(model, time.time() - start_time)
+            await self._cache_response(cache_key, response)
             
             logger.info(f"Chat request completed for model '{model}'")
-            return response
+            return {**response, "routing": self._routing_metadata(model, fallback)}
             
+        except LLMQueueFullError:
+            raise
         except Exception as e:
             logger.error(f"Chat request failed: {str(e)}")
             raise_ollama_error(f"Chat request failed: {str(e)}")
@@ -164,41 +239,68 @@ class OllamaAgent:
         self, 
         messages: List[Dict[str, str]], 
         model: Optional[str] = None,
+        format: Any = '',
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
+        metadata: Optional[Dict[str, Any]] = None,
         **kwargs
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """
         Stream chat completion from Ollama
         
+        Closing the generator early closes the HTTP stream, which makes
+        Ollama stop generating.
+        
         Args:
             messages: List of message objects
-            model: Model to use
-            **kwargs: Additional parameters
+            model: Model to use, routed between primary and fallback when omitted
+            format: '' for free text, 'json', or a JSON schema to constrain the output to
+            priority: Scheduling priority, BACKGROUND for work nobody is waiting on
+            metadata: Filled in with which model served the request
+            **kwargs: Additional parameters, ``num_predict=None`` for no length limit
             
         Yields:
             Streaming response chunks
         """
-        if not self.is_available or not self.async_client:
+        if not self.is_available or not self.gateway:
             raise_ollama_error("Ollama client not available")
         
-        model = model or self.current_model
+        model, fallback = self._route(model, priority)
+        
+        options = self._generation_options(kwargs)
         
         try:
-            logger.info(f"Starting stream chat with model '{model}'")
-            
-            options = {
-                'temperature': kwargs.get('temperature', 0.7),
-                'top_p': kwargs.get('top_p', 0.9),
-                'num_predict': kwargs.get('num_predict', 512),
-            }
+            cache_key, cached = await self._cached_response("chat", model, messages, format, options)
+            if metadata is not None:
+                metadata.update(self._routing_metadata(model, fallback, cached=cached is not None))
+            if cached is not None:
+                logger.info(f"Stream chat for model '{model}' served from cache")
+                yield cached
+                return
             
-            async for chunk in await self.async_client.chat(
+            logger.info(f"Starting stream chat with model '{model}'")
+            start_time = time.time()
+            stream = self.gateway.chat_stream(
+                priority=priority,
                 model=model,
                 messages=messages,
-                stream=True,
+                format=format,
                 options=options
-            ):
-                yield chunk
+            )
+            pieces = []
+            try:
+                async for chunk in stream:
+                    pieces.append(chunk.get('message', {}).get('content', ''))
+                    yield chunk
+                    if chunk.get('done'):
+                        # Only complete generations are reused
+                        await self._cache_response(cache_key, self._chat_response(model, ''.join(pieces)))
+            finally:
+                await stream.aclose()
+                if pieces:
+                    self._record_latency(model, time.time() - start_time)
                 
+        except LLMQueueFullError:
+            raise
         except Exception as e:
             logger.error(f"Stream chat failed: {str(e)}")
             raise_ollama_error(f"Stream chat failed: {str(e)}")
@@ -208,6 +310,8 @@ class OllamaAgent:
         self, 
         prompt: str, 
         model: Optional[str] = None,
+        format: Any = '',
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -215,44 +319,191 @@ class OllamaAgent:
         
         Args:
             prompt: Input prompt
-            model: Model to use
-            **kwargs: Additional parameters
+            model: Model to use, routed between primary and fallback when omitted
+            format: '' for free text, 'json', or a JSON schema to constrain the output to
+            priority: Scheduling priority, BACKGROUND for work nobody is waiting on
+            **kwargs: Additional parameters, ``num_predict=None`` for no length limit
             
         Returns:
             Generated response
         """
-        if not self.is_available or not self.async_client:
+        if not self.is_available or not self.gateway:
             raise_ollama_error("Ollama client not available")
         
-        model = model or self.current_model
+        model, fallback = self._route(model, priority)
         
         try:
             logger.info(f"Generating text with model '{model}'")
             
-            options = {
-                'temperature': kwargs.get('temperature', 0.7),
-                'top_p': kwargs.get('top_p', 0.9),
-                'num_predict': kwargs.get('num_predict', 512),
-            }
+            options = self._generation_options(kwargs)
             
-            response = await self.async_client.generate(
+            cache_key, cached = await self._cached_response("generate", model, prompt, format, options)
+            if cached is not None:
+                logger.info(f"Generation for model '{model}' served from cache")
+                return {**cached, "routing": self._routing_metadata(model, fallback, cached=True)}
+            
+            start_time = time.time()
+            response = await self.gateway.generate(
+                priority=priority,
                 model=model,
                 prompt=prompt,
+                format=format,
                 options=options
             )
+            self._record_latency(model, time.time() - start_time)
+            await self._cache_response(cache_key, response)
             
             logger.info(f"Text generation completed for model '{model}'")
-            return response
+            return {**response, "routing": self._routing_metadata(model, fallback)}
             
+        except LLMQueueFullError:
+            raise
         except Exception as e:
             logger.error(f"Text generation failed: {str(e)}")
             raise_ollama_error(f"Text generation failed: {str(e)}")
 
+    async def generate_stream(
+        self, 
+        prompt: str, 
+        model: Optional[str] = None,
+        format: Any = '',
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream a text completion from a prompt
+        
+        Closing the generator early closes the HTTP stream, which makes
+        Ollama stop generating.
+        
+        Args:
+            prompt: Input prompt
+            model: Model to use, routed between primary and fallback when omitted
+            format: '' for free text, 'json', or a JSON schema to constrain the output to
+            priority: Scheduling priority, BACKGROUND for work nobody is waiting on
+            metadata: Filled in with which model served the request
+            **kwargs: Additional parameters, ``num_predict=None`` for no length limit
+            
+        Yields:
+            Generated text pieces
+        """
+        if not self.is_available or not self.gateway:
+            raise_ollama_error("Ollama client not available")
+        
+        model, fallback = self._route(model, priority)
+        
+        options = self._generation_options(kwargs)
+        
+        try:
+            cache_key, cached = await self._cached_response("generate", model, prompt, format, options)
+            if metadata is not None:
+                metadata.update(self._routing_metadata(model, fallback, cached=cached is not None))
+            if cached is not None:
+                logger.info(f"Stream generation for model '{model}' served from cache")
+                yield cached.get('response', '')
+                return
+            
+            logger.info(f"Starting stream generation with model '{model}'")
+            start_time = time.time()
+            stream = self.gateway.generate_stream(
+                priority=priority,
+                model=model,
+                prompt=prompt,
+                format=format,
+                options=options
+            )
+            pieces = []
+            try:
+                async for chunk in stream:
+                    pieces.append(chunk.get('response', ''))
+                    yield pieces[-1]
+                    if chunk.get('done'):
+                        # Only complete generations are reused
+                        await self._cache_response(cache_key, {'model': model, 'response': ''.join(pieces), 'done': True})
+            finally:
+                await stream.aclose()
+                if pieces:
+                    self._record_latency(model, time.time() - start_time)
+                
+        except LLMQueueFullError:
+            raise
+        except Exception as e:
+            logger.error(f"Stream generation failed: {str(e)}")
+            raise_ollama_error(f"Stream generation failed: {str(e)}")
+
+    async def extract_farmer_info_stream(
+        self, 
+        text: str, 
+        language: str = "hi",
+        model: Optional[str] = None,
+        parser: Optional[IncrementalJSONParser] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Extract farmer information, yielding each field as soon as the LLM completes it
+        
+        Generation is cancelled once the JSON object closes.
+        
+        Args:
+            text: Input text to extract from
+            language: Language of the text ('hi' for Hindi, 'en' for English)
+            model: Model to use for extraction, routed between primary and fallback when omitted
+            parser: Parser to use, pass one in to inspect the raw output afterwards
+            metadata: Filled in with which model served the request
+            
+        Yields:
+            (field, value) tuples for valid, non-empty fields
+        """
+        if not self.is_available:
+            raise_ollama_error("Ollama not available for information extraction")
+        
+        # Route here rather than in chat_stream, the cache key below needs the model
+        model, fallback = self._route(model, LLMPriority.BACKGROUND)
+        stream_metadata = {}
+        parser = parser or IncrementalJSONParser()
+        messages = self._create_extraction_messages(text, language)
+        output_format = self._extraction_format()
+        stream = self.chat_stream(
+            messages=messages,
+            model=model,
+            format=output_format,
+            priority=LLMPriority.BACKGROUND,
+            metadata=stream_metadata,
+            temperature=0.1,  # Low temperature for consistent extraction
+            num_predict=None  # Constrained output ends with the object
+        )
+        
+        async def content():
+            try:
+                async for chunk in stream:
+                    yield chunk['message']['content']
+            finally:
+                await stream.aclose()
+        
+        async for field, value in iter_json_fields(content(), parser):
+            validated = self._validate_extracted_data({field: value})
+            if field in validated:
+                yield field, validated[field]
+        
+        if metadata is not None:
+            metadata.update({**stream_metadata, "fallback": fallback})
+        
+        if parser.done:
+            # Generation was cut off at the closing brace, so chat_stream
+            # never saw it finish; the object is the whole useful response
+            cache_key = self._response_cache_key(
+                "chat", model, messages, output_format,
+                self._generation_options({'temperature': 0.1, 'num_predict': None})
+            )
+            await self._cache_response(cache_key, self._chat_response(model, parser.raw_object))
+
     async def extract_farmer_info(
         self, 
         text: str, 
         language: str = "hi",
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Extract farmer information from text using LLM
@@ -260,7 +511,8 @@ class OllamaAgent:
         Args:
             text: Input text to extract from
             language: Language of the text ('hi' for Hindi, 'en' for English)
-            model: Model to use for extraction
+            model: Model to use for extraction, routed between primary and fallback when omitted
+            metadata: Filled in with which model served the request
             
         Returns:
             Extracted farmer information as structured data
@@ -268,113 +520,182 @@ class OllamaAgent:
         if not self.is_available:
             raise_ollama_error("Ollama not available for information extraction")
         
-        # Create structured prompt for information extraction
-        prompt = self._create_extraction_prompt(text, language)
+        if settings.ollama_stream_extraction:
+            return await self._extract_farmer_info_streaming(text, language, model, metadata)
+        
+        messages = self._create_extraction_messages(text, language)
         
         try:
             logger.info(f"Extracting farmer information from {len(text)} characters of text")
             
-            response = await self.generate(
-                prompt=prompt,
+            response = await self.chat(
+                messages=messages,
                 model=model,
+                format=self._extraction_format(),
+                priority=LLMPriority.BACKGROUND,
                 temperature=0.1,  # Low temperature for consistent extraction
-                num_predict=800
+                num_predict=None  # Constrained output ends with the object
             )
             
+            if metadata is not None:
+                metadata.update(response['routing'])
+            
             # Parse the response
-            extracted_info = self._parse_extraction_response(response['response'])
+            extracted_info = self._parse_extraction_response(response['message']['content'])
             
             logger.info(f"Successfully extracted farmer information")
             return extracted_info
             
+        except LLMQueueFullError:
+            raise
         except Exception as e:
             logger.error(f"Farmer info extraction failed: {str(e)}")
             raise_ollama_error(f"Information extraction failed: {str(e)}")
 
-    def _create_extraction_prompt(self, text: str, language: str) -> str:
-        """Create a structured prompt for farmer information extraction"""
-        
-        language_instruction = {
-            'hi': "Text is in Hindi/Hinglish. Extract information accurately.",
-            'en': "Text is in English. Extract information accurately.",
-        }.get(language, "Extract information accurately.")
-        
-        prompt = f"""
-You are an expert information extraction system for Indian farmers. {language_instruction}
-
-Extract the following information from the given text and return it in valid JSON format:
-
-Text: "{text}"
-
-Extract these fields (use null for missing information):
-- name: Farmer's full name
-- age: Age in years (number only)
-- gender: "male" or "female"
-- phone_number: 10-digit phone number
-- state: Full state name in English
-- district: District name in English
-- village: Village name
-- land_size_acres: Land size in acres (convert from other units if needed)
-- land_ownership: "owned", "leased", or "shared"
-- annual_income: Annual income in rupees (convert lakhs/crores to numbers)
-- crops: Array of crop names in English
-- irrigation_type: "rain_fed", "canal", "borewell", "drip", or "sprinkler"
-- family_size: Number of family members
-- farming_equipment: Array of equipment owned
-- fertilizers_used: Array of fertilizers mentioned
-
-Rules:
-1. Return ONLY valid JSON
-2. Convert Hindi crop names to English
-3. Convert all measurements to standard units
-4. Be precise, don't make assumptions
-5. Use null for missing information
-
-JSON Response:
-"""
-        return prompt
-
-    def _parse_extraction_response(self, response: str) -> Dict[str, Any]:
-        """Parse LLM response into structured data"""
+    async def _extract_farmer_info_streaming(
+        self, 
+        text: str, 
+        language: str,
+        model: Optional[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Collect the streamed fields"""
+        parser = IncrementalJSONParser()
+        
         try:
-            # Find JSON in response
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
+            logger.info(f"Extracting farmer information from {len(text)} characters of text (streaming)")
             
-            if json_start == -1 or json_end == 0:
-                logger.warning("No JSON found in response, attempting fallback parsing")
-                return self._fallback_parse_response(response)
+            extracted_info = {}
+            async for field, value in self.extract_farmer_info_stream(text, language, model, parser, metadata):
+                extracted_info[field] = value
             
-            json_str = response[json_start:json_end]
-            parsed_data = json.loads(json_str)
+            if not parser.done:
+                # Constrained output only ends early if generation was cut off
+                logger.warning("Extraction output ended before the JSON object closed")
             
-            # Validate and clean the data
-            return self._validate_extracted_data(parsed_data)
+            logger.info(f"Successfully extracted farmer information, stopped after {len(parser.text)} characters")
+            return extracted_info
             
-        except json.JSONDecodeError as e:
-            logger.warning(f"JSON parsing failed: {str(e)}, attempting fallback")
-            return self._fallback_parse_response(response)
+        except LLMQueueFullError:
+            raise
+        except Exception as e:
+            logger.error(f"Farmer info extraction failed: {str(e)}")
+            raise_ollama_error(f"Information extraction failed: {str(e)}")
 
-    def _fallback_parse_response(self, response: str) -> Dict[str, Any]:
-        """Fallback parser when JSON parsing fails"""
-        extracted = {}
-        
-        # Simple regex patterns for common fields
-        import re
+    def _route(self, model: Optional[str], priority: LLMPriority) -> Tuple[str, bool]:
+        """
+        Model for a request: the one asked for, else the router's choice
         
-        patterns = {
-            'name': r'(?:name|नाम)[:=]\s*["\']?([^"\',\n]+)["\']?',
-            'age': r'(?:age|उम्र|आयु)[:=]\s*(\d+)',
-            'phone_number': r'(?:phone|फोन|mobile)[:=]\s*["\']?(\d{10})["\']?',
-            'annual_income': r'(?:income|आय|salary)[:=]\s*["\']?(\d+(?:,\d+)*)["\']?'
+        Returns:
+            Tuple of (model, whether it is the fallback standing in for the primary)
+        """
+        if model:
+            return model, False
+        if not self.router:
+            return self.current_model, False
+        routed = self.router.route(priority)
+        return routed, routed != self.current_model
+
+    def _queue_depth(self, model: str) -> int:
+        if self.gateway and self.gateway.scheduler:
+            return self.gateway.scheduler.queue_depth(model)
+        return 0
+
+    def _record_latency(self, model: str, seconds: float):
+        if self.router:
+            self.router.record(model, seconds)
+
+    @staticmethod
+    def _routing_metadata(model: str, fallback: bool, cached: bool = False) -> Dict[str, Any]:
+        """Per-request record of which model served it"""
+        return {"model": model, "fallback": fallback, "cached": cached}
+
+    @staticmethod
+    def _generation_options(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Ollama options for generate calls; ``None`` values are left to the server"""
+        options = {
+            'temperature': kwargs.get('temperature', 0.7),
+            'top_p': kwargs.get('top_p', 0.9),
+            'num_predict': kwargs.get('num_predict', 512),
         }
+        return {k: v for k, v in options.items() if v is not None}
+
+    def _response_cache_key(
+        self, endpoint: str, model: str, payload: Any, format: Any, options: Dict[str, Any]
+    ) -> Optional[str]:
+        """Cache key for a call, or None when the cache is off or the call is not deterministic enough"""
+        if not self.response_cache:
+            return None
+        if options.get('temperature', 0.8) > settings.llm_cache_max_temperature:
+            return None
+        return ResultCache.make_key(
+            endpoint,
+            model,
+            json.dumps(payload, sort_keys=True, ensure_ascii=False),
+            json.dumps(format, sort_keys=True),
+            json.dumps(options, sort_keys=True)
+        )
+
+    async def _cached_response(
+        self, endpoint: str, model: str, payload: Any, format: Any, options: Dict[str, Any]
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Look a call up in the response cache
         
-        for field, pattern in patterns.items():
-            match = re.search(pattern, response, re.IGNORECASE)
-            if match:
-                extracted[field] = match.group(1).strip()
+        Returns:
+            Tuple of (cache key or None if uncacheable, cached response or None)
+        """
+        cache_key = self._response_cache_key(endpoint, model, payload, format, options)
+        if cache_key is None:
+            if self.response_cache:
+                self.cache_stats["uncacheable"] += 1
+            return None, None
         
-        return extracted
+        cached = await self.response_cache.get(cache_key)
+        return cache_key, json.loads(cached) if cached is not None else None
+
+    async def _cache_response(self, cache_key: Optional[str], response: Dict[str, Any]):
+        """Store a response, without the token context (large and unused) or routing metadata"""
+        if cache_key is None:
+            return
+        stored = {k: v for k, v in dict(response).items() if k not in ('context', 'routing')}
+        await self.response_cache.set(cache_key, json.dumps(stored, ensure_ascii=False, default=str))
+
+    @staticmethod
+    def _chat_response(model: str, content: str) -> Dict[str, Any]:
+        """Completed chat response to cache for streamed output"""
+        return {'model': model, 'message': {'role': 'assistant', 'content': content}, 'done': True}
+
+    def _extraction_format(self) -> Any:
+        """Ollama ``format`` for extraction: the FarmerInfo schema, or plain JSON mode"""
+        if not settings.ollama_format_schema:
+            return "json"
+        return FarmerInfo.extraction_schema(list(EXTRACTION_FIELDS))
+
+    @staticmethod
+    def _create_extraction_messages(text: str, language: str) -> List[Dict[str, str]]:
+        """Extraction chat: the shared system prompt, then the language hint and text"""
+        language_hint = LANGUAGE_HINTS.get(language)
+        user_content = f'Text: "{text}"'
+        if language_hint:
+            user_content = f"{language_hint}\n{user_content}"
+        
+        return [
+            {'role': 'system', 'content': EXTRACTION_SYSTEM_PROMPT},
+            {'role': 'user', 'content': user_content}
+        ]
+
+    def _parse_extraction_response(self, response: str) -> Dict[str, Any]:
+        """Parse the schema-constrained LLM response into structured data"""
+        try:
+            parsed_data = json.loads(response)
+        except json.JSONDecodeError as e:
+            # Only possible when generation was cut off
+            logger.warning(f"JSON parsing failed: {str(e)}")
+            return {}
+        
+        # Validate and clean the data
+        return self._validate_extracted_data(parsed_data)
 
     def _validate_extracted_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and clean extracted data"""
@@ -394,9 +715,8 @@ JSON Response:
                     logger.warning(f"Invalid numeric value for {field}: {data[field]}")
         
         # Array fields
-        for field in ['crops', 'farming_equipment', 'fertilizers_used']:
-            if field in data and isinstance(data[field], list):
-                validated[field] = [str(item).strip() for item in data[field] if item]
+        if isinstance(data.get('crops'), list):
+            validated['crops'] = [str(item).strip() for item in data['crops'] if item]
         
         return validated
 
@@ -414,12 +734,12 @@ JSON Response:
 
     async def pull_model(self, model_name: str) -> bool:
         """Pull a model to Ollama"""
-        if not self.is_available or not self.async_client:
+        if not self.is_available or not self.gateway:
             raise_ollama_error("Ollama client not available")
         
         try:
             logger.info(f"Pulling model: {model_name}")
-            await self.async_client.pull(model_name)
+            await self.gateway.pull(model_name)
             
             # Refresh available models
             await self._load_available_models()
@@ -433,23 +753,26 @@ JSON Response:
 
     async def is_ready(self) -> bool:
         """Check if the agent is ready to process requests"""
-        return self.is_available and self.async_client is not None and len(self.available_models) > 0
+        return self.is_available and self.gateway is not None and len(self.available_models) > 0
 
     async def get_health_status(self) -> Dict[str, Any]:
         """Get health status of the Ollama agent"""
         status = {
             "ollama_available": self.is_available,
-            "client_initialized": self.async_client is not None,
+            "client_initialized": self.gateway is not None,
             "host": self.host,
             "current_model": self.current_model,
             "available_models": self.available_models,
-            "model_count": len(self.available_models)
+            "model_count": len(self.available_models),
+            "response_cache": {**self.response_cache.get_stats(), **self.cache_stats} if self.response_cache else None,
+            "scheduler": self.gateway.scheduler.get_stats() if self.gateway and self.gateway.scheduler else None,
+            "router": self.router.get_stats() if self.router else None
         }
         
-        if self.is_available and self.async_client:
+        if self.is_available and self.gateway:
             try:
                 # Quick connectivity test
-                await self.async_client.list()
+                await self.gateway.list()
                 status["connectivity"] = "ok"
             except Exception as e:
                 status["connectivity"] = f"error: {str(e)}"
@@ -461,11 +784,14 @@ JSON Response:
     async def cleanup(self):
         """Cleanup resources"""
         try:
-            if self.async_client:
-                # AsyncClient doesn't need explicit cleanup
-                self.async_client = None
-            
-            self.sync_client = None
+            if self.gateway and self._owns_gateway:
+                await self.gateway.close()
+            if self.response_cache:
+                await self.response_cache.close()
+                self.response_cache = None
+            # The shared gateway is closed by the service on shutdown
+            self.gateway = None
+            self._owns_gateway = False
             logger.info("Ollama agent cleaned up successfully")
             
         except Exception as e:
@@ -3,24 +3,30 @@ Audio Ingestion Agent
 Handles audio file processing, transcription using Whisper, and language detection
 """
 
+import contextlib
+import io
 import os
+import subprocess
 import tempfile
 import time
+import wave
 import asyncio
-from typing import Optional, BinaryIO
+from typing import AsyncGenerator, Dict, Optional, BinaryIO, List, Tuple
 import whisper
 import librosa
 import numpy as np
 from pydub import AudioSegment
-from langdetect import detect, DetectorFactory
 import torch
 
 from config import get_settings
 from models import AudioProcessingResponse, LanguageCode, ProcessingStatus
 from utils.logger import get_logger
-
-# Set seed for consistent language detection
-DetectorFactory.seed = 0
+from audio_scheduler import AudioJobScheduler, AudioQueueFullError
+from vad import SpeechChunk, detect_speech_chunks, is_silent
+from transcription_cache import TranscriptionCache
+from whisper_batcher import WhisperBatchScheduler, decode_batch
+from whisper_engines import FASTER_WHISPER_ENGINE, OPENAI_ENGINE, detect_language, load_whisper_model
+from whisper_workers import WhisperProcessPool
 
 settings = get_settings()
 logger = get_logger(__name__)
@@ -31,6 +37,11 @@ class AudioIngestionAgent:
     
     def __init__(self):
         self.whisper_model = None
+        self.batch_scheduler: Optional[WhisperBatchScheduler] = None
+        self.transcription_cache: Optional[TranscriptionCache] = None
+        self.worker_pool: Optional[WhisperProcessPool] = None
+        self.job_scheduler: Optional[AudioJobScheduler] = None
+        self.language_stats: Dict[str, dict] = {}
         self.supported_formats = settings.supported_audio_formats
         self.max_duration = 300  # 5 minutes max
         self.sample_rate = 16000
@@ -43,6 +54,13 @@ class AudioIngestionAgent:
             self.device = "cpu"   # CPU fallback
         logger.info(f"Audio agent will use device: {self.device}")
     
+    @property
+    def model_id(self) -> str:
+        """Identifies the model weights and engine producing transcripts"""
+        if settings.whisper_engine == FASTER_WHISPER_ENGINE:
+            return f"{FASTER_WHISPER_ENGINE}:{settings.whisper_model}:{settings.whisper_compute_type}"
+        return settings.whisper_model
+    
     async def initialize(self):
         """Initialize the Whisper model and other components"""
         try:
@@ -64,7 +82,6 @@ class AudioIngestionAgent:
             logger.info(f"📦 Model '{settings.whisper_model}' estimated size: {estimated_size}")
             
             # Check if this is likely the first download
-            import whisper
             try:
                 model_path = whisper._MODELS[settings.whisper_model]
                 cache_dir = os.path.expanduser("~/.cache/whisper")
@@ -85,17 +102,59 @@ class AudioIngestionAgent:
             logger.info("🚀 Starting Whisper model loading...")
             start_time = time.time()
             
-            # Load model in a thread to avoid blocking
             loop = asyncio.get_event_loop()
-            self.whisper_model = await loop.run_in_executor(
-                None, 
-                self._load_model_with_progress,
-                settings.whisper_model,
-                self.device
-            )
+            if settings.whisper_backend == "process" and settings.whisper_engine == FASTER_WHISPER_ENGINE:
+                # CTranslate2 releases the GIL and runs parallel workers itself
+                logger.warning("Process backend is not used with faster-whisper, running it in-process")
+            
+            if settings.whisper_backend == "process" and settings.whisper_engine == OPENAI_ENGINE:
+                # Download once here so the workers don't race on the cache file
+                await loop.run_in_executor(
+                    None,
+                    self._ensure_model_downloaded,
+                    settings.whisper_model
+                )
+                self.worker_pool = WhisperProcessPool(
+                    settings.whisper_model,
+                    self.device,
+                    workers=settings.whisper_process_workers,
+                    torch_threads=settings.whisper_torch_threads
+                )
+                await self.worker_pool.start()
+            else:
+                # Load model in a thread to avoid blocking
+                self.whisper_model = await loop.run_in_executor(
+                    None, 
+                    self._load_model_with_progress,
+                    settings.whisper_model,
+                    self.device
+                )
             
             load_time = time.time() - start_time
-            logger.info(f"✅ Whisper model loaded successfully in {load_time:.1f} seconds")
+            logger.info(f"✅ Whisper model loaded successfully in {load_time:.1f} seconds ({settings.whisper_backend} backend)")
+            
+            # Batch short clips from concurrent requests into one forward pass
+            if settings.whisper_batching_enabled and getattr(self.whisper_model, "supports_batching", True):
+                self.batch_scheduler = WhisperBatchScheduler(
+                    self._decode_batch,
+                    max_batch_size=settings.whisper_batch_size,
+                    window_ms=settings.whisper_batch_window_ms
+                )
+                self.batch_scheduler.start()
+            
+            if settings.audio_scheduler_enabled:
+                self.job_scheduler = AudioJobScheduler(
+                    max_inflight_seconds=settings.audio_max_inflight_seconds,
+                    max_queued_seconds=settings.audio_max_queued_seconds,
+                    estimate_fn=self._estimate_processing_seconds,
+                    starvation_seconds=settings.audio_starvation_seconds
+                )
+            
+            if settings.transcription_cache_enabled:
+                self.transcription_cache = TranscriptionCache(
+                    settings.transcription_cache_path,
+                    max_size_mb=settings.transcription_cache_max_mb
+                )
             
             # Skip model test to avoid segfaults - model will be tested during actual audio processing
             logger.info("ℹ️ Skipping model test - model ready for audio processing")
@@ -108,48 +167,27 @@ class AudioIngestionAgent:
     
     def _load_model_with_progress(self, model_name: str, device: str):
         """Load Whisper model with detailed progress logging"""
-        import whisper
-        import urllib.request
-        import tempfile
-        import shutil
-        
         try:
-            logger.info(f"🔄 Loading Whisper model '{model_name}' on device '{device}'...")
-            
-            # Create a custom progress hook for download
-            last_logged_percent = [0]  # Use list to allow modification in nested function
-            
-            def progress_hook(block_num, block_size, total_size):
-                if total_size > 0:
-                    downloaded = block_num * block_size
-                    percent = min(100, (downloaded * 100) // total_size)
-                    mb_downloaded = downloaded / (1024 * 1024)
-                    mb_total = total_size / (1024 * 1024)
-                    
-                    # Log progress every 10% only once
-                    if percent >= last_logged_percent[0] + 10 and percent > 0:
-                        last_logged_percent[0] = (percent // 10) * 10
-                        logger.info(f"⬇️ Download progress: {last_logged_percent[0]}% ({mb_downloaded:.1f}/{mb_total:.1f} MB)")
-            
-            # Check if we need to download
-            model_url = whisper._MODELS[model_name]
-            cache_dir = os.path.expanduser("~/.cache/whisper")
-            os.makedirs(cache_dir, exist_ok=True)
-            model_file = os.path.join(cache_dir, os.path.basename(model_url))
-            
-            if not os.path.exists(model_file):
-                logger.info(f"📥 Downloading model from: {model_url}")
-                logger.info(f"💾 Saving to: {model_file}")
-                
-                # Download with progress
-                urllib.request.urlretrieve(model_url, model_file, progress_hook)
-                logger.info(f"✅ Download completed: {os.path.getsize(model_file) / (1024*1024):.1f} MB")
-            else:
-                logger.info(f"📂 Using cached model: {model_file}")
+            logger.info(f"🔄 Loading Whisper model '{model_name}' on device '{device}' ({settings.whisper_engine} engine)...")
+            
+            if settings.whisper_engine == FASTER_WHISPER_ENGINE:
+                # CTranslate2 checkpoints are fetched from the Hugging Face hub by faster-whisper
+                model = load_whisper_model(
+                    model_name,
+                    device,
+                    engine=FASTER_WHISPER_ENGINE,
+                    compute_type=settings.whisper_compute_type,
+                    cpu_threads=settings.whisper_torch_threads,
+                    num_workers=settings.whisper_process_workers
+                )
+                logger.info(f"🎯 Model loaded successfully with {settings.whisper_compute_type} weights")
+                return model
+            
+            self._ensure_model_downloaded(model_name)
             
             # Now load the model
             logger.info(f"🧠 Loading model into memory on {device}...")
-            model = whisper.load_model(model_name, device=device)
+            model = load_whisper_model(model_name, device)
             logger.info(f"🎯 Model loaded successfully with {sum(p.numel() for p in model.parameters())} parameters")
             
             return model
@@ -157,6 +195,41 @@ class AudioIngestionAgent:
         except Exception as e:
             logger.error(f"❌ Model loading failed: {str(e)}")
             raise
+    
+    def _ensure_model_downloaded(self, model_name: str):
+        """Download the Whisper checkpoint into the local cache if it isn't there yet"""
+        import urllib.request
+        
+        # Create a custom progress hook for download
+        last_logged_percent = [0]  # Use list to allow modification in nested function
+        
+        def progress_hook(block_num, block_size, total_size):
+            if total_size > 0:
+                downloaded = block_num * block_size
+                percent = min(100, (downloaded * 100) // total_size)
+                mb_downloaded = downloaded / (1024 * 1024)
+                mb_total = total_size / (1024 * 1024)
+                
+                # Log progress every 10% only once
+                if percent >= last_logged_percent[0] + 10 and percent > 0:
+                    last_logged_percent[0] = (percent // 10) * 10
+                    logger.info(f"⬇️ Download progress: {last_logged_percent[0]}% ({mb_downloaded:.1f}/{mb_total:.1f} MB)")
+        
+        # Check if we need to download
+        model_url = whisper._MODELS[model_name]
+        cache_dir = os.path.expanduser("~/.cache/whisper")
+        os.makedirs(cache_dir, exist_ok=True)
+        model_file = os.path.join(cache_dir, os.path.basename(model_url))
+        
+        if not os.path.exists(model_file):
+            logger.info(f"📥 Downloading model from: {model_url}")
+            logger.info(f"💾 Saving to: {model_file}")
+            
+            # Download with progress
+            urllib.request.urlretrieve(model_url, model_file, progress_hook)
+            logger.info(f"✅ Download completed: {os.path.getsize(model_file) / (1024*1024):.1f} MB")
+        else:
+            logger.info(f"📂 Using cached model: {model_file}")
 
     async def _test_model(self):
         """Test the Whisper model with a short synthetic audio"""
@@ -180,7 +253,8 @@ class AudioIngestionAgent:
     async def process_audio(
         self, 
         audio_file: BinaryIO, 
-        language_hint: Optional[LanguageCode] = None
+        language_hint: Optional[LanguageCode] = None,
+        reject_when_busy: bool = True
     ) -> AudioProcessingResponse:
         """
         Process audio file and return transcription with language detection
@@ -188,6 +262,7 @@ class AudioIngestionAgent:
         Args:
             audio_file: Audio file to process
             language_hint: Optional language hint for better processing
+            reject_when_busy: Raise AudioQueueFullError instead of queueing when saturated
             
         Returns:
             AudioProcessingResponse with transcription and metadata
@@ -198,19 +273,46 @@ class AudioIngestionAgent:
         try:
             logger.info(f"Starting audio processing for task {task_id}")
             
-            # Step 1: Validate and preprocess audio
-            processed_audio = await self._preprocess_audio(audio_file)
+            audio_bytes = audio_file.read()
+            
+            # Identical audio with the same model and hint transcribes identically
+            cache_key = None
+            if self.transcription_cache:
+                cache_key = TranscriptionCache.make_key(
+                    audio_bytes,
+                    self.model_id,
+                    getattr(language_hint, "value", language_hint)
+                )
+                cached = self.transcription_cache.get(cache_key)
+                if cached:
+                    logger.info(f"Transcription cache hit for task {task_id}")
+                    return cached.model_copy(update={
+                        "task_id": task_id,
+                        "processing_time": time.time() - start_time
+                    })
             
-            # Step 2: Transcribe using Whisper
-            transcription_result = await self._transcribe_audio(
-                processed_audio, 
-                language_hint
-            )
-            
-            # Step 3: Detect language from transcribed text
-            detected_language = await self._detect_language(
-                transcription_result["text"]
-            )
+            # Step 1: Validate and preprocess audio
+            processed_audio = await self._preprocess_audio(audio_bytes)
+            
+            # Wait for a slot sized by the clip's duration, short clips first
+            async with self._admit(processed_audio, reject_when_busy):
+                # Step 2: Detect language once and pin decoding to it
+                decode_language, detected_language = await self._detect_language(
+                    processed_audio,
+                    language_hint
+                )
+                
+                # Step 3: Transcribe using Whisper, skipping silence when VAD is on
+                if settings.vad_enabled:
+                    transcription_result = await self._transcribe_speech(
+                        processed_audio,
+                        decode_language
+                    )
+                else:
+                    transcription_result = await self._transcribe_audio(
+                        processed_audio, 
+                        decode_language
+                    )
             
             # Step 4: Calculate confidence score
             confidence_score = self._calculate_confidence(transcription_result)
@@ -219,15 +321,31 @@ class AudioIngestionAgent:
             
             logger.info(f"Audio processing completed for task {task_id} in {processing_time:.2f}s")
             
-            return AudioProcessingResponse(
+            response = AudioProcessingResponse(
                 task_id=task_id,
                 status=ProcessingStatus.COMPLETED,
                 transcribed_text=transcription_result["text"],
                 detected_language=detected_language,
                 confidence_score=confidence_score,
-                processing_time=processing_time
+                processing_time=processing_time,
+                segments=[
+                    {
+                        "start": round(segment.get("start", 0.0), 2),
+                        "end": round(segment.get("end", 0.0), 2),
+                        "text": segment.get("text", "").strip()
+                    }
+                    for segment in transcription_result.get("segments", [])
+                ]
             )
             
+            # An empty transcript from VAD alone is not worth pinning for every later upload
+            if cache_key and not transcription_result.get("vad_empty"):
+                self.transcription_cache.put(cache_key, response)
+            
+            return response
+            
+        except AudioQueueFullError:
+            raise
         except Exception as e:
             logger.error(f"Audio processing failed for task {task_id}: {str(e)}")
             return AudioProcessingResponse(
@@ -236,55 +354,209 @@ class AudioIngestionAgent:
                 processing_time=time.time() - start_time
             )
     
-    async def _preprocess_audio(self, audio_file: BinaryIO) -> np.ndarray:
+    async def transcribe_stream(
+        self,
+        audio_bytes: bytes,
+        language_hint: Optional[LanguageCode] = None
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Transcribe audio window by window, yielding partial results as they complete
+        
+        Args:
+            audio_bytes: Raw bytes of the uploaded audio file
+            language_hint: Optional language hint for better processing
+            
+        Yields:
+            A ``start`` event once the clip has a processing slot, ``segment``
+            events with offset timestamps as each window finishes, then a
+            single ``done`` event with the full transcript
+            
+        Raises:
+            AudioQueueFullError: Before the first event, if the queue is full
+        """
+        start_time = time.time()
+        task_id = f"audio_{int(time.time() * 1000)}"
+        logger.info(f"Starting streaming transcription for task {task_id}")
+        
+        processed_audio = await self._preprocess_audio(audio_bytes)
+        
+        async with self._admit(processed_audio):
+            yield {
+                "event": "start",
+                "task_id": task_id,
+                "duration": round(len(processed_audio) / self.sample_rate, 2),
+                "elapsed": round(time.time() - start_time, 2)
+            }
+            
+            decode_language, detected_language = await self._detect_language(
+                processed_audio,
+                language_hint
+            )
+            chunks = (
+                self._detect_speech(processed_audio)
+                if settings.vad_enabled
+                else self._fixed_windows(processed_audio)
+            )
+            if not chunks and not is_silent(processed_audio, self.sample_rate):
+                # VAD can miss speech it has no quiet stretch to compare with
+                chunks = self._fixed_windows(processed_audio)
+            
+            results = []
+            segment_index = 0
+            for chunk in chunks:
+                result = await self._transcribe_audio(
+                    processed_audio[chunk.start:chunk.end],
+                    decode_language
+                )
+                results.append(result)
+                
+                for segment in self._merge_chunk_results([chunk], [result])["segments"]:
+                    text = segment.get("text", "").strip()
+                    if not text:
+                        continue
+                    yield {
+                        "event": "segment",
+                        "task_id": task_id,
+                        "index": segment_index,
+                        "start": round(segment["start"], 2),
+                        "end": round(segment["end"], 2),
+                        "text": text,
+                        "elapsed": round(time.time() - start_time, 2)
+                    }
+                    segment_index += 1
+        
+        merged = self._merge_chunk_results(chunks, results)
+        processing_time = time.time() - start_time
+        
+        logger.info(f"Streaming transcription completed for task {task_id} in {processing_time:.2f}s")
+        
+        yield {
+            "event": "done",
+            "task_id": task_id,
+            "status": ProcessingStatus.COMPLETED.value,
+            "transcribed_text": merged["text"],
+            "detected_language": detected_language.value if detected_language else None,
+            "confidence_score": self._calculate_confidence(merged),
+            "processing_time": processing_time
+        }
+    
+    def _admit(self, audio_array: np.ndarray, reject_when_busy: bool = True):
+        """Reserve a scheduler slot for a decoded clip (no-op when the scheduler is off)"""
+        if not self.job_scheduler:
+            return contextlib.nullcontext()
+        return self.job_scheduler.reserve(len(audio_array) / self.sample_rate, reject_when_busy)
+    
+    async def _preprocess_audio(self, audio_bytes: bytes) -> np.ndarray:
         """
-        Preprocess audio file: convert format, resample, normalize
+        Preprocess audio: decode in memory, downmix, resample, normalize
         
         Args:
-            audio_file: Input audio file
+            audio_bytes: Raw bytes of the uploaded audio file
             
         Returns:
             Preprocessed audio as numpy array
         """
         try:
-            # Save uploaded file to temporary location
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                temp_file.write(audio_file.read())
-                temp_path = temp_file.name
+            # Decoding shells out to ffmpeg, keep it off the event loop
+            loop = asyncio.get_event_loop()
+            audio_array = await loop.run_in_executor(
+                None, self._decode_audio_bytes, audio_bytes
+            )
             
-            try:
-                # Load and convert audio using pydub
-                audio = AudioSegment.from_file(temp_path)
-                
-                # Check duration
-                duration_seconds = len(audio) / 1000
-                if duration_seconds > self.max_duration:
-                    logger.warning(f"Audio duration {duration_seconds}s exceeds maximum {self.max_duration}s")
-                    # Truncate to max duration
-                    audio = audio[:self.max_duration * 1000]
-                
-                # Convert to mono and resample
-                audio = audio.set_channels(1).set_frame_rate(self.sample_rate)
-                
-                # Convert to numpy array
-                audio_array = np.array(audio.get_array_of_samples(), dtype=np.float32)
-                
-                # Normalize
-                if len(audio_array) > 0:
-                    audio_array = audio_array / np.max(np.abs(audio_array))
-                
-                logger.info(f"Audio preprocessed: {len(audio_array)/self.sample_rate:.2f}s duration")
-                
-                return audio_array
-                
-            finally:
-                # Clean up temporary file
-                os.unlink(temp_path)
+            max_samples = self.max_duration * self.sample_rate
+            if len(audio_array) >= max_samples:
+                logger.warning(f"Audio truncated to maximum duration of {self.max_duration}s")
+                audio_array = audio_array[:max_samples]
+            
+            # Normalize
+            peak = np.max(np.abs(audio_array)) if len(audio_array) > 0 else 0
+            if peak > 0:
+                audio_array = audio_array / peak
+            
+            logger.info(f"Audio preprocessed: {len(audio_array)/self.sample_rate:.2f}s duration")
+            
+            return audio_array
                 
         except Exception as e:
             logger.error(f"Audio preprocessing failed: {str(e)}")
             raise ValueError(f"Failed to preprocess audio: {str(e)}")
     
+    def _decode_audio_bytes(self, audio_bytes: bytes) -> np.ndarray:
+        """
+        Decode an in-memory audio file to mono float32 at the Whisper sample rate
+        
+        PCM WAV is parsed directly; everything else (OGG/Opus from Telegram,
+        MP3, FLAC, ...) is piped through ffmpeg without touching disk.
+        """
+        if audio_bytes[:4] == b"RIFF" and audio_bytes[8:12] == b"WAVE":
+            try:
+                return self._decode_wav(audio_bytes)
+            except (wave.Error, ValueError) as e:
+                # Non-PCM WAV (e.g. IMA ADPCM) - let ffmpeg handle it
+                logger.debug(f"WAV fast path unavailable: {str(e)}")
+        
+        try:
+            return self._decode_with_ffmpeg(audio_bytes)
+        except subprocess.CalledProcessError as e:
+            # Containers that need seeking (e.g. m4a with a trailing moov atom) can't be piped
+            logger.warning(f"ffmpeg pipe decode failed, retrying from a temporary file: {e.stderr.decode(errors='ignore')[-200:]}")
+            return self._decode_via_tempfile(audio_bytes)
+    
+    def _decode_wav(self, audio_bytes: bytes) -> np.ndarray:
+        """Decode PCM WAV bytes with a zero-copy view over the sample buffer"""
+        with wave.open(io.BytesIO(audio_bytes)) as wav:
+            channels = wav.getnchannels()
+            sample_width = wav.getsampwidth()
+            frame_rate = wav.getframerate()
+            frames = wav.readframes(min(wav.getnframes(), self.max_duration * frame_rate))
+        
+        dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+        if sample_width not in dtypes:
+            raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes")
+        
+        samples = np.frombuffer(frames, dtype=dtypes[sample_width])
+        if sample_width == 1:
+            audio = (samples.astype(np.float32) - 128.0) / 128.0
+        else:
+            audio = samples.astype(np.float32) / float(np.iinfo(dtypes[sample_width]).max)
+        
+        if channels > 1:
+            audio = audio.reshape(-1, channels).mean(axis=1)
+        
+        if frame_rate != self.sample_rate:
+            audio = librosa.resample(audio, orig_sr=frame_rate, target_sr=self.sample_rate)
+        
+        return audio.astype(np.float32, copy=False)
+    
+    def _decode_with_ffmpeg(self, audio_bytes: bytes) -> np.ndarray:
+        """Decode any ffmpeg-supported format from stdin straight to 16 kHz float32 PCM"""
+        cmd = [
+            "ffmpeg", "-nostdin", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-t", str(self.max_duration),
+            "-f", "f32le", "-ac", "1", "-ar", str(self.sample_rate),
+            "pipe:1"
+        ]
+        result = subprocess.run(cmd, input=audio_bytes, capture_output=True, check=True)
+        return np.frombuffer(result.stdout, dtype=np.float32)
+    
+    def _decode_via_tempfile(self, audio_bytes: bytes) -> np.ndarray:
+        """Slow path for containers that ffmpeg cannot read from a pipe"""
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_file.write(audio_bytes)
+            temp_path = temp_file.name
+        
+        try:
+            audio = AudioSegment.from_file(temp_path)
+            audio = audio[:self.max_duration * 1000]
+            audio = audio.set_channels(1).set_frame_rate(self.sample_rate).set_sample_width(2)
+            
+            samples = np.frombuffer(audio.raw_data, dtype=np.int16)
+            return samples.astype(np.float32) / 32768.0
+        finally:
+            # Clean up temporary file
+            os.unlink(temp_path)
+    
     async def _transcribe_audio(
         self, 
         audio_array: np.ndarray, 
@@ -303,7 +575,7 @@ class AudioIngestionAgent:
         try:
             # Prepare transcription options
             options = {
-                "language": language_hint.value if language_hint else None,
+                "language": getattr(language_hint, "value", language_hint),
                 "task": "transcribe",
                 "fp16": False,  # Use fp32 for better compatibility
             }
@@ -311,12 +583,20 @@ class AudioIngestionAgent:
             # Remove None values
             options = {k: v for k, v in options.items() if v is not None}
             
-            # Run transcription in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.whisper_model.transcribe(audio_array, **options)
-            )
+            if self.batch_scheduler and self.batch_scheduler.fits(audio_array):
+                # Short clips share a batched forward pass with concurrent requests
+                result = await self.batch_scheduler.transcribe(
+                    audio_array, options.get("language")
+                )
+            elif self.worker_pool:
+                result = await self.worker_pool.transcribe(audio_array, options)
+            else:
+                # Run transcription in executor to avoid blocking
+                loop = asyncio.get_event_loop()
+                result = await loop.run_in_executor(
+                    None,
+                    lambda: self.whisper_model.transcribe(audio_array, **options)
+                )
             
             logger.info(f"Transcription completed: {len(result['text'])} characters")
             
@@ -326,46 +606,198 @@ class AudioIngestionAgent:
             logger.error(f"Transcription failed: {str(e)}")
             raise ValueError(f"Failed to transcribe audio: {str(e)}")
     
-    async def _detect_language(self, text: str) -> Optional[LanguageCode]:
+    async def _decode_batch(self, audios: List[np.ndarray], language: Optional[str]) -> List[dict]:
+        """Run one batched decode on whichever backend holds the model"""
+        if self.worker_pool:
+            return await self.worker_pool.decode_batch(audios, language)
+        
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, decode_batch, self.whisper_model, audios, language)
+    
+    async def _transcribe_speech(
+        self,
+        audio_array: np.ndarray,
+        language_hint: Optional[LanguageCode] = None
+    ) -> dict:
         """
-        Detect language from transcribed text
+        Transcribe only the speech regions of a recording
+        
+        VAD drops silence and splits long recordings on pauses; each chunk is
+        transcribed separately (and batched with concurrent requests) and the
+        segment timestamps are shifted back to positions in the original audio.
+        If VAD finds no speech in audio that is not silent, the whole clip is
+        transcribed rather than trusting it.
         
         Args:
-            text: Transcribed text
+            audio_array: Preprocessed audio array
+            language_hint: Optional language hint
             
         Returns:
-            Detected language code
+            Merged transcription result, with ``vad_empty`` set when
+            transcription was skipped
         """
-        try:
-            if not text or len(text.strip()) < 10:
-                return None
-            
-            # Use langdetect for language detection
-            detected_lang = detect(text)
-            
-            # Map to our language codes
-            lang_mapping = {
-                'hi': LanguageCode.HINDI,
-                'en': LanguageCode.ENGLISH,
-                'gu': LanguageCode.GUJARATI,
-                'pa': LanguageCode.PUNJABI,
-                'bn': LanguageCode.BENGALI,
-                'te': LanguageCode.TELUGU,
-                'ta': LanguageCode.TAMIL,
-                'ml': LanguageCode.MALAYALAM,
-                'kn': LanguageCode.KANNADA,
-                'or': LanguageCode.ODIA
-            }
-            
-            detected_language = lang_mapping.get(detected_lang, LanguageCode.HINDI)
-            
-            logger.info(f"Language detected: {detected_language.value}")
-            
-            return detected_language
+        chunks = self._detect_speech(audio_array)
+        
+        total_seconds = len(audio_array) / self.sample_rate
+        if not chunks:
+            if is_silent(audio_array, self.sample_rate):
+                logger.info(f"No speech detected in {total_seconds:.1f}s of silent audio, skipping transcription")
+                return {"text": "", "segments": [], "vad_empty": True}
+            logger.info(f"VAD found no speech in {total_seconds:.1f}s of non-silent audio, transcribing all of it")
+            return await self._transcribe_audio(audio_array, language_hint)
+        
+        speech_seconds = sum(chunk.duration for chunk in chunks)
+        logger.info(
+            f"VAD kept {speech_seconds:.1f}s of {total_seconds:.1f}s audio in {len(chunks)} chunks"
+        )
+        
+        results = await asyncio.gather(*[
+            self._transcribe_audio(audio_array[chunk.start:chunk.end], language_hint)
+            for chunk in chunks
+        ])
+        
+        return self._merge_chunk_results(chunks, results)
+    
+    def _detect_speech(self, audio_array: np.ndarray) -> List[SpeechChunk]:
+        """Run VAD with the configured thresholds"""
+        return detect_speech_chunks(
+            audio_array,
+            sample_rate=self.sample_rate,
+            threshold_db=settings.vad_threshold_db,
+            peak_range_db=settings.vad_peak_range_db,
+            min_speech_ms=settings.vad_min_speech_ms,
+            min_silence_ms=settings.vad_min_silence_ms,
+            padding_ms=settings.vad_padding_ms,
+            max_merge_gap_ms=settings.vad_max_merge_gap_ms
+        )
+    
+    def _fixed_windows(self, audio_array: np.ndarray, window_seconds: int = 30) -> List[SpeechChunk]:
+        """Split audio into consecutive Whisper-sized windows"""
+        window = window_seconds * self.sample_rate
+        return [
+            SpeechChunk(start=start, end=min(start + window, len(audio_array)), sample_rate=self.sample_rate)
+            for start in range(0, len(audio_array), window)
+        ]
+    
+    def _merge_chunk_results(self, chunks: List[SpeechChunk], results: List[dict]) -> dict:
+        """Combine per-chunk Whisper results, offsetting timestamps by chunk start"""
+        segments = []
+        texts = []
+        
+        for chunk, result in zip(chunks, results):
+            text = result.get("text", "").strip()
+            if text:
+                texts.append(text)
+            
+            for segment in result.get("segments", []):
+                segments.append({
+                    **segment,
+                    "id": len(segments),
+                    "start": segment.get("start", 0.0) + chunk.start_time,
+                    "end": segment.get("end", 0.0) + chunk.start_time
+                })
+        
+        return {
+            "text": " ".join(texts),
+            "segments": segments,
+            "language": next((r.get("language") for r in results if r.get("language")), None)
+        }
+    
+    async def _detect_language(
+        self,
+        audio_array: np.ndarray,
+        language_hint: Optional[LanguageCode] = None
+    ) -> Tuple[Optional[str], Optional[LanguageCode]]:
+        """
+        Decide the decoding language from Whisper's own language-ID head
+        
+        The first 30s window is scored once. The user's stored preference wins
+        whenever the detector gives it enough probability; otherwise the top
+        detected language is used. Either way decoding is pinned, so Whisper
+        doesn't re-detect per chunk.
+        
+        Args:
+            audio_array: Preprocessed audio array
+            language_hint: User's stored language preference, if any
             
+        Returns:
+            Language code to decode with, and the detected language for the response
+        """
+        hint = getattr(language_hint, "value", language_hint)
+        
+        if not settings.whisper_language_detection or len(audio_array) == 0:
+            return hint, self._to_language_code(hint)
+        
+        start_time = time.time()
+        try:
+            probs = await self._run_language_detector(audio_array)
         except Exception as e:
             logger.warning(f"Language detection failed: {str(e)}")
-            return LanguageCode.HINDI  # Default to Hindi
+            return hint, self._to_language_code(hint)
+        latency = time.time() - start_time
+        
+        if not probs:
+            return hint, self._to_language_code(hint)
+        
+        detected, detected_prob = max(probs.items(), key=lambda item: item[1])
+        
+        if hint and probs.get(hint, 0.0) >= settings.whisper_language_hint_min_prob:
+            decode_language = hint
+        else:
+            decode_language = detected
+        
+        self._record_language_detection(detected, latency, hint)
+        logger.info(
+            f"Language detected: {detected} ({detected_prob:.2f}) in {latency * 1000:.0f}ms, "
+            f"hint={hint}, decoding as {decode_language}"
+        )
+        
+        return decode_language, self._to_language_code(decode_language)
+    
+    async def _run_language_detector(self, audio_array: np.ndarray) -> Dict[str, float]:
+        """Score the first 30s window on whichever backend holds the model"""
+        if self.worker_pool:
+            return await self.worker_pool.detect_language(audio_array)
+        
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, detect_language, self.whisper_model, audio_array)
+    
+    @staticmethod
+    def _to_language_code(language: Optional[str]) -> Optional[LanguageCode]:
+        """Map a Whisper language code to a supported LanguageCode"""
+        try:
+            return LanguageCode(language) if language else None
+        except ValueError:
+            return None
+    
+    def _record_language_detection(self, detected: str, latency: float, hint: Optional[str]):
+        """Track per-language detection latency and agreement with the user's preference"""
+        stats = self.language_stats.setdefault(detected, {
+            "detections": 0,
+            "total_latency": 0.0,
+            "hint_checks": 0,
+            "hint_agreements": 0
+        })
+        stats["detections"] += 1
+        stats["total_latency"] += latency
+        
+        if hint:
+            stats["hint_checks"] += 1
+            if hint == detected:
+                stats["hint_agreements"] += 1
+    
+    def get_language_detection_stats(self) -> dict:
+        """Per-language detection latency and agreement rate with stored preferences"""
+        return {
+            language: {
+                "detections": stats["detections"],
+                "average_latency_ms": round(stats["total_latency"] / stats["detections"] * 1000, 1),
+                "hint_agreement_rate": (
+                    stats["hint_agreements"] / stats["hint_checks"] if stats["hint_checks"] else None
+                )
+            }
+            for language, stats in self.language_stats.items()
+        }
     
     def _calculate_confidence(self, transcription_result: dict) -> float:
         """
@@ -412,11 +844,19 @@ class AudioIngestionAgent:
     
     async def is_ready(self) -> bool:
         """Check if the agent is ready to process audio"""
-        return self.whisper_model is not None
+        return self.whisper_model is not None or self.worker_pool is not None
     
     async def cleanup(self):
         """Cleanup resources"""
         try:
+            if self.batch_scheduler:
+                await self.batch_scheduler.stop()
+                self.batch_scheduler = None
+            
+            if self.worker_pool:
+                self.worker_pool.shutdown()
+                self.worker_pool = None
+            
             if self.whisper_model:
                 # Clear GPU memory if using CUDA
                 if self.device == "cuda":
@@ -442,6 +882,10 @@ class AudioIngestionAgent:
         Returns:
             Estimated processing time in seconds
         """
+        return self._estimate_processing_seconds(duration_seconds)
+    
+    def _estimate_processing_seconds(self, duration_seconds: float) -> float:
+        """Synchronous processing-time estimate, also used by the job scheduler"""
         # Rough estimate: Whisper processes at 10-20x real-time
         # depending on model size and hardware
         model_factors = {
@@ -454,6 +898,9 @@ class AudioIngestionAgent:
         
         factor = model_factors.get(settings.whisper_model, 0.1)
         
+        if settings.whisper_engine == FASTER_WHISPER_ENGINE:
+            factor *= 0.35  # int8 CTranslate2 runs ~3x faster on CPU
+        
         if self.device == "cuda":
             factor *= 0.3  # GPU acceleration
         
@@ -462,10 +909,17 @@ class AudioIngestionAgent:
     async def get_health_status(self) -> dict:
         """Get health status of the audio agent"""
         return {
-            "model_loaded": self.whisper_model is not None,
+            "model_loaded": await self.is_ready(),
             "device": self.device,
+            "backend": settings.whisper_backend,
+            "worker_pool": self.worker_pool.get_stats() if self.worker_pool else None,
             "model_name": settings.whisper_model,
+            "engine": settings.whisper_engine,
             "supported_formats": self.supported_formats,
-            "max_duration": self.max_duration
+            "max_duration": self.max_duration,
+            "batching": self.batch_scheduler.get_stats() if self.batch_scheduler else None,
+            "transcription_cache": self.transcription_cache.get_stats() if self.transcription_cache else None,
+            "scheduler": self.job_scheduler.get_stats() if self.job_scheduler else None,
+            "language_detection": self.get_language_detection_stats()
         }
         
\ No newline at end of file
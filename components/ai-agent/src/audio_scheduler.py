@@ -0,0 +1,189 @@
+"""
+Audio Job Scheduler
+Admission control and shortest-job-first ordering for transcription requests,
+driven by the decoded duration of each clip
+"""
+
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from utils.error_handeller import RateLimitExceededError
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AudioQueueFullError(RateLimitExceededError):
+    """Raised when the audio queue cannot take another clip right now"""
+
+    def __init__(self, message: str, retry_after: float, details: Optional[dict] = None):
+        super().__init__(message, "AUDIO_QUEUE_FULL", details)
+        self.retry_after = retry_after
+
+
+@dataclass
+class _AudioJob:
+    duration: float
+    cost: float
+    seq: int
+    enqueued_at: float = field(default_factory=time.time)
+    ready: Optional[asyncio.Future] = None
+
+
+class AudioJobTicket:
+    """Reservation for one clip; ``async with`` waits for its turn and frees the slot afterwards"""
+
+    def __init__(self, scheduler: "AudioJobScheduler", job: _AudioJob):
+        self._scheduler = scheduler
+        self._job = job
+
+    async def __aenter__(self):
+        try:
+            await self._job.ready
+        except asyncio.CancelledError:
+            self._scheduler._abandon(self._job)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._scheduler._release(self._job)
+
+
+class AudioJobScheduler:
+    """
+    Caps the seconds of audio being transcribed at once and runs short clips first
+
+    Clips wait in a queue ordered by duration, so a burst of voice notes is not
+    stuck behind a long recording. A clip that has waited longer than
+    ``starvation_seconds`` goes next regardless of length. One clip is charged
+    at most half the in-flight budget, so short clips keep flowing alongside
+    a long one. When the queue already holds ``max_queued_seconds`` of audio,
+    new clips are rejected with a retry hint derived from the backlog.
+    """
+
+    def __init__(
+        self,
+        max_inflight_seconds: float,
+        max_queued_seconds: float,
+        estimate_fn: Callable[[float], float],
+        starvation_seconds: float = 30.0
+    ):
+        self.max_inflight_seconds = max_inflight_seconds
+        self.max_queued_seconds = max_queued_seconds
+        self.estimate_fn = estimate_fn
+        self.starvation_seconds = starvation_seconds
+
+        self._queue: List[_AudioJob] = []
+        self._inflight_cost = 0.0
+        self._inflight_audio = 0.0
+        self._queued_audio = 0.0
+        self._seq = itertools.count()
+
+        self.stats = {
+            "admitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "total_wait_time": 0.0,
+            "max_wait_time": 0.0
+        }
+
+    def reserve(self, duration: float, reject_when_busy: bool = True) -> AudioJobTicket:
+        """
+        Queue a clip, or reject it if the backlog is full
+
+        Args:
+            duration: Decoded clip duration in seconds
+            reject_when_busy: Internal callers pass False to wait instead of being rejected
+
+        Returns:
+            Ticket to ``async with`` around the transcription
+
+        Raises:
+            AudioQueueFullError: The queue is full; ``retry_after`` says when to try again
+        """
+        busy = self._queue or self._inflight_cost > 0
+        if reject_when_busy and busy and self._queued_audio + duration > self.max_queued_seconds:
+            retry_after = max(1.0, self.estimate_fn(self._inflight_audio + self._queued_audio))
+            self.stats["rejected"] += 1
+            logger.warning(
+                f"Audio queue full ({self._queued_audio:.0f}s queued, "
+                f"{self._inflight_audio:.0f}s in flight), rejecting {duration:.1f}s clip"
+            )
+            raise AudioQueueFullError(
+                "Audio processing is busy, please retry later",
+                retry_after=retry_after,
+                details={
+                    "retry_after_seconds": round(retry_after, 1),
+                    "queued_audio_seconds": round(self._queued_audio, 1)
+                }
+            )
+
+        job = _AudioJob(
+            duration=duration,
+            cost=min(duration, self.max_inflight_seconds / 2),
+            seq=next(self._seq),
+            ready=asyncio.get_running_loop().create_future()
+        )
+        self._queue.append(job)
+        self._queued_audio += duration
+        self.stats["admitted"] += 1
+        self._dispatch()
+        return AudioJobTicket(self, job)
+
+    def _next_job(self) -> _AudioJob:
+        oldest = min(self._queue, key=lambda job: job.seq)
+        if time.time() - oldest.enqueued_at >= self.starvation_seconds:
+            return oldest
+        return min(self._queue, key=lambda job: (job.duration, job.seq))
+
+    def _dispatch(self):
+        """Start queued clips while they fit in the in-flight budget"""
+        while self._queue:
+            job = self._next_job()
+            if self._inflight_cost > 0 and self._inflight_cost + job.cost > self.max_inflight_seconds:
+                return
+
+            self._queue.remove(job)
+            self._queued_audio -= job.duration
+            self._inflight_cost += job.cost
+            self._inflight_audio += job.duration
+
+            wait = time.time() - job.enqueued_at
+            self.stats["total_wait_time"] += wait
+            self.stats["max_wait_time"] = max(self.stats["max_wait_time"], wait)
+            job.ready.set_result(None)
+
+    def _release(self, job: _AudioJob):
+        self._inflight_cost -= job.cost
+        self._inflight_audio -= job.duration
+        self.stats["completed"] += 1
+        self._dispatch()
+
+    def _abandon(self, job: _AudioJob):
+        """Drop a clip whose caller went away, whether it was still queued or already started"""
+        if job in self._queue:
+            self._queue.remove(job)
+            self._queued_audio -= job.duration
+        elif job.ready.done():
+            self._inflight_cost -= job.cost
+            self._inflight_audio -= job.duration
+            self._dispatch()
+
+    def get_stats(self) -> dict:
+        """Get scheduler statistics"""
+        started = self.stats["admitted"] - len(self._queue)
+        return {
+            **self.stats,
+            "queued_jobs": len(self._queue),
+            "queued_audio_seconds": round(self._queued_audio, 1),
+            "inflight_audio_seconds": round(self._inflight_audio, 1),
+            "max_inflight_seconds": self.max_inflight_seconds,
+            "max_queued_seconds": self.max_queued_seconds,
+            "average_wait_time": self.stats["total_wait_time"] / started if started else 0.0
+        }
+
+
+__all__ = ["AudioJobScheduler", "AudioJobTicket", "AudioQueueFullError"]
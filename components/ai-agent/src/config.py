@@ -32,11 +32,46 @@ class Settings(BaseSettings):
     max_audio_size_mb: int = 50
     supported_audio_formats: List[str] = ["wav", "mp3", "m4a", "ogg", "flac"]
     whisper_language_detection: bool = True  # Use Whisper's built-in language detection
+    whisper_language_hint_min_prob: float = 0.2  # Keep the user's stored language if Whisper gives it at least this probability
+    whisper_engine: str = "openai"  # openai (PyTorch fp32) or faster-whisper (CTranslate2, quantized)
+    whisper_compute_type: str = "int8"  # faster-whisper weight type: int8, int8_float16, float16, float32
+    whisper_backend: str = "thread"  # thread (in-process executor) or process (worker pool)
+    whisper_process_workers: int = 2  # Worker processes for the process backend, each loads its own model
+    whisper_torch_threads: int = 0  # torch intra-op threads per worker, 0 = split cores evenly
+    whisper_batching_enabled: bool = True  # Decode concurrent short clips together
+    whisper_batch_size: int = 8  # Max clips per batched forward pass
+    whisper_batch_window_ms: int = 50  # How long to wait for more clips before decoding
+    audio_scheduler_enabled: bool = True  # Admission control and shortest-clip-first ordering
+    audio_max_inflight_seconds: float = 120.0  # Seconds of audio transcribed at once
+    audio_max_queued_seconds: float = 600.0  # Seconds of audio allowed to wait before clients get 429
+    audio_starvation_seconds: float = 30.0  # Clips waiting this long run next regardless of length
+    audio_max_parallel_files: int = 0  # Voice files transcribed at once per session, 0 = one per CPU core
+    transcription_cache_enabled: bool = True  # Reuse results for byte-identical audio
+    transcription_cache_path: str = "./data/transcription_cache"
+    transcription_cache_max_mb: int = 256
+    vad_enabled: bool = True  # Drop silence and split long recordings on pauses
+    vad_threshold_db: float = 12.0  # Speech must be this far above the noise floor
+    vad_peak_range_db: float = 6.0  # Frames this close to the loudest always count, for audio without pauses
+    vad_min_speech_ms: int = 250
+    vad_min_silence_ms: int = 300
+    vad_padding_ms: int = 200
+    vad_max_merge_gap_ms: int = 1500  # Longer pauses are cut out of the audio
     
     # NLP Models
     spacy_model: str = "en_core_web_sm"
     hindi_model: str = "hi_core_news_sm"
     sentence_transformer_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    spacy_preload_languages: List[str] = ["hi"]  # Built at startup and never evicted; others load on first use
+    spacy_idle_eviction_seconds: float = 1800.0  # Drop other pipelines unused this long, 0 = never
+    llm_gate_required_fields: List[str] = ["land_size_acres", "land_ownership", "crops", "age", "irrigation_type"]  # Fields eligibility rules use
+    llm_gate_min_confidence: float = 0.7  # Ask the LLM for required fields below this confidence
+    extraction_cache_enabled: bool = True  # Reuse extraction results for identical normalized text
+    extraction_cache_max_entries: int = 2048
+    extraction_cache_ttl_seconds: float = 3600.0  # Shared across replicas through redis_url when set
+    nlp_batch_size: int = 256  # Texts per nlp.pipe batch in bulk extraction
+    nlp_n_process: int = 1  # spaCy worker processes for bulk extraction
+    session_state_max_sessions: int = 1024  # Sessions with a running incremental extraction
+    session_state_ttl_seconds: float = 86400.0  # Drop running state for sessions that never finalize
     
     # Vector Database
     vector_db_type: str = "chroma"  # chroma or faiss
@@ -62,6 +97,29 @@ class Settings(BaseSettings):
     ollama_model: str = "gemma3:4b"  # Perfect balance: 140+ languages, fast inference, 4GB
     ollama_fallback_model: str = "llama3.2:3b"  # Ultra-fast fallback for high load
     ollama_timeout: int = 45  # Optimized for smaller model
+    ollama_stream_extraction: bool = True  # Parse extraction JSON while streaming and stop once it closes
+    ollama_format_schema: bool = True  # Constrain extraction output to the FarmerInfo schema (Ollama server >= 0.5), else plain JSON mode
+    ollama_max_connections: int = 8  # Pooled HTTP connections shared by every LLM call
+    ollama_max_keepalive_connections: int = 4
+    ollama_keepalive_expiry: float = 300.0  # Seconds an idle pooled connection is kept open
+    ollama_coalesce_requests: bool = True  # Identical in-flight requests share one generation
+    ollama_keep_alive: str = "30m"  # How long Ollama keeps a model, and its prompt prefix cache, loaded after a request
+    llm_scheduler_enabled: bool = True  # Cap concurrent generations per model, interactive chat before background work
+    llm_max_concurrent_per_model: int = 2
+    llm_max_queued_per_model: int = 32  # Background requests are shed once this many are waiting
+    llm_background_wait_budget_seconds: float = 20.0  # Background requests waiting longer are shed, 0 = wait indefinitely
+    llm_routing_enabled: bool = True  # Send background extraction to ollama_fallback_model while the primary is slow
+    llm_latency_slo_seconds: float = 15.0  # p90 primary latency above this switches background traffic to the fallback
+    llm_latency_window_seconds: float = 120.0
+    llm_routing_min_samples: int = 5
+    llm_routing_max_queue_depth: int = 8  # A primary queue this deep also switches to the fallback
+    llm_routing_recovery_ratio: float = 0.7  # Switch back once p90 is under this fraction of the SLO
+    llm_cache_enabled: bool = True  # Reuse OllamaAgent responses for repeated near-deterministic calls
+    llm_cache_max_temperature: float = 0.2  # Only calls at or below this temperature are cached
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl_seconds: float = 86400.0
+    llm_cache_path: str = "./data/llm_cache.sqlite3"  # Keeps responses across restarts; empty for memory only
+    llm_cache_disk_max_entries: int = 50000
     # Celery
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/0"
@@ -3,64 +3,103 @@ Enhanced Information Extraction Agent (NLU) with Ollama LLM Integration
 Extracts farmer information using spaCy, rule-based patterns, NER, and Ollama for adaptive extraction
 """
 
-import re
 import asyncio
 import time
-from typing import Dict, List, Optional, Any, Tuple
-import spacy
-from spacy.matcher import Matcher, PhraseMatcher
+from typing import Dict, List, Optional, Any, Tuple, Union
 import json
-import os
-# Add these imports
-from eligibility_checker import EligibilityCheckerAgent
-from vector_db import VectorDBAgent
-from web_scraper import WebScraperAgent
-from OllamaAgent import OllamaAgent
-# Ollama integration imports
-try:
-    import ollama
-    from ollama import Client, ChatResponse
-    OLLAMA_AVAILABLE = True
-except ImportError:
-    OLLAMA_AVAILABLE = False
 
 from config import get_settings
+from extraction_engine import ExtractionEngine
+from llm_gateway import OLLAMA_AVAILABLE, LLMGateway, get_llm_gateway
+from llm_scheduler import LLMPriority, LLMQueueFullError
 from models import ExtractedInfo, FarmerInfo, LanguageCode
+from spacy_registry import SpacyPipelineRegistry, current_rss_mb
+from utils.cache import ResultCache, create_shared_backend
+from utils.json_stream import IncrementalJSONParser, iter_json_fields
 from utils.logger import get_logger
 
 settings = get_settings()
 logger = get_logger(__name__)
 
+# Bump when extraction logic changes in a way the pattern digest can't see
+EXTRACTOR_VERSION = "3"
+
+# FarmerInfo fields the LLM can be asked for, in prompt order; the output
+# schema comes from FarmerInfo itself
+LLM_FIELD_DESCRIPTIONS = {
+    'name': "Farmer's name",
+    'age': "Age in years",
+    'gender': "male/female",
+    'phone_number': "Phone number",
+    'state': "State name",
+    'district': "District name",
+    'village': "Village name",
+    'land_size_acres': "Land size in acres (convert if needed)",
+    'land_ownership': "owned/leased/shared",
+    'annual_income': "Annual income in rupees (convert lakhs/crores to numbers)",
+    'crops': "Crops grown",
+    'irrigation_type': "Type of irrigation used",
+    'family_size': "Number of family members"
+}
+
+# Identical for every request and sent first, so Ollama reuses its KV cache.
+# The output shape is enforced through Ollama's format parameter, so the
+# prompt only has to say what each field means
+EXTRACTION_SYSTEM_PROMPT = (
+    "Extract farmer information from the user's text (English or Hindi) as JSON.\n"
+    "Use null for anything not mentioned; don't guess. Convert units as described.\n\n"
+    "Fields:\n" + "\n".join(f"- {field}: {description}" for field, description in LLM_FIELD_DESCRIPTIONS.items())
+)
+
 
 class EnhancedInfoExtractionAgent:
     """Enhanced Agent for extracting farmer information with Ollama LLM integration"""
     
     def __init__(self):
-        self.nlp_models = {}
-        self.ollama_client = None
-        self.matchers = {}
-        self.agricultural_patterns = {}
-        self.location_patterns = {}
-        self.numeric_patterns = {}
+        self.nlp_registry: Optional[SpacyPipelineRegistry] = None
+        self.startup_metrics: Dict[str, float] = {}
+        self.llm_gateway: Optional[LLMGateway] = None
+        self.engine: Optional[ExtractionEngine] = None
         self.ollama_enabled = OLLAMA_AVAILABLE
         self.ollama_model = "llama3.2"  # Default model
+        self.llm_gate_stats = {"llm_calls": 0, "llm_skipped": 0, "llm_failed": 0, "fields_requested": 0, "stream_early_stops": 0}
+        self.result_cache: Optional[ResultCache] = None
+        self.extractor_version = EXTRACTOR_VERSION
         
     async def initialize(self):
         """Initialize spaCy models, Ollama integration, and extraction patterns"""
         try:
             logger.info("Initializing Enhanced NLU models and patterns...")
+            start_time = time.time()
+            rss_before = current_rss_mb()
             
-            # Load spaCy models
+            # Initialize patterns first, matchers are built from them as pipelines load
+            await self._initialize_patterns()
+            
+            # Set up lazy spaCy pipelines
             await self._load_nlp_models()
             
             # Initialize Ollama integration if available
             if self.ollama_enabled:
                 await self._initialize_ollama()
             
-            # Initialize matchers and patterns
-            await self._initialize_patterns()
+            if settings.extraction_cache_enabled:
+                self.result_cache = ResultCache(
+                    "extraction",
+                    max_entries=settings.extraction_cache_max_entries,
+                    ttl_seconds=settings.extraction_cache_ttl_seconds,
+                    backend=create_shared_backend(settings.redis_url)
+                )
             
-            logger.info("Enhanced NLU agent initialized successfully")
+            self.startup_metrics = {
+                "startup_time": round(time.time() - start_time, 3),
+                "rss_before_mb": round(rss_before, 1),
+                "rss_after_mb": round(current_rss_mb(), 1)
+            }
+            logger.info(
+                f"Enhanced NLU agent initialized successfully in {self.startup_metrics['startup_time']:.2f}s "
+                f"(RSS {self.startup_metrics['rss_before_mb']:.0f} -> {self.startup_metrics['rss_after_mb']:.0f} MB)"
+            )
             
         except Exception as e:
             logger.error(f"Failed to initialize Enhanced NLU agent: {str(e)}")
@@ -69,15 +108,12 @@ class EnhancedInfoExtractionAgent:
     async def _initialize_ollama(self):
         """Initialize Ollama client and check available models"""
         try:
-            # Initialize Ollama client
-            ollama_host = getattr(settings, 'OLLAMA_HOST', 'http://localhost:11434')
-            self.ollama_client = Client(host=ollama_host)
+            # Shared pooled client, also used by OllamaAgent
+            self.llm_gateway = get_llm_gateway()
             
             # Check if Ollama server is running
             try:
-                models = await asyncio.get_event_loop().run_in_executor(
-                    None, self.ollama_client.list
-                )
+                models = await self.llm_gateway.list()
                 available_models = [model['name'] for model in models['models']]
                 logger.info(f"Available Ollama models: {available_models}")
                 
@@ -102,156 +138,40 @@ class EnhancedInfoExtractionAgent:
             self.ollama_enabled = False
     
     async def _load_nlp_models(self):
-        """Load spaCy models for different languages"""
+        """Set up the spaCy pipeline registry and preload the pinned languages"""
         try:
-            loop = asyncio.get_event_loop()
-            
-            # Load English model
-            try:
-                self.nlp_models['en'] = await loop.run_in_executor(
-                    None, spacy.load, "en_core_web_sm"
-                )
-                logger.info("English spaCy model loaded")
-            except OSError:
-                logger.warning("English spaCy model not found, using blank model")
-                self.nlp_models['en'] = spacy.blank("en")
-            
-            # Load models for Indian languages (only supported ones)
-            logger.info("🌐 Initializing spaCy language models...")
-            
-            supported_langs = ['hi', 'gu', 'bn', 'te', 'ta', 'ml', 'kn', 'or']
-            loaded_count = 0
-            failed_count = 0
-            
-            for lang in supported_langs:
-                try:
-                    logger.info(f"📚 Loading spaCy blank model for language: {lang}")
-                    self.nlp_models[lang] = spacy.blank(lang)
-                    logger.info(f"✅ Successfully loaded model for {lang}")
-                    loaded_count += 1
-                except Exception as e:
-                    logger.warning(f"⚠️ Failed to load model for {lang}, using English fallback: {e}")
-                    self.nlp_models[lang] = spacy.blank("en")
-                    failed_count += 1
+            self.nlp_registry = SpacyPipelineRegistry(
+                english_model=settings.spacy_model,
+                matcher_builder=self.engine.add_patterns_to_matcher,
+                idle_seconds=settings.spacy_idle_eviction_seconds,
+                pinned_languages=settings.spacy_preload_languages
+            )
             
-            # For Punjabi and other unsupported languages, use English fallback
-            unsupported_langs = ['pa', 'ur', 'ne', 'as', 'mr', 'sa']
-            for lang in unsupported_langs:
-                logger.info(f"🔄 Using English fallback for unsupported language: {lang}")
-                self.nlp_models[lang] = spacy.blank("en")
+            # Everything else is built on first use
+            for lang in settings.spacy_preload_languages:
+                await self.nlp_registry.get(lang)
             
-            logger.info(f"📊 spaCy models summary: {loaded_count} loaded, {failed_count} failed, {len(unsupported_langs)} using fallbacks")
+            logger.info(
+                f"📊 spaCy pipelines preloaded for {settings.spacy_preload_languages}, "
+                f"{len(self.nlp_registry.supported_languages)} languages available on demand"
+            )
             
         except Exception as e:
             logger.error(f"Failed to load NLP models: {str(e)}")
             raise
     
     async def _initialize_patterns(self):
-        """Initialize extraction patterns for different entity types"""
-        
-        # Enhanced agricultural patterns with more comprehensive coverage
-        self.agricultural_patterns = {
-            'crops': [
-                # Hindi crops
-                'धान', 'चावल', 'गेहूं', 'मक्का', 'ज्वार', 'बाजरा', 'रागी', 'दाल', 'अरहर', 'चना',
-                'मटर', 'मसूर', 'उड़द', 'मूंग', 'सरसों', 'सूरजमुखी', 'तिल', 'अलसी', 'कपास',
-                'गन्ना', 'आलू', 'प्याज', 'टमाटर', 'बैंगन', 'भिंडी', 'खीरा', 'लौकी', 'करेला',
-                'पत्तागोभी', 'फूलगोभी', 'गाजर', 'मूली', 'पालक', 'मेथी', 'धनिया',
-                # English crops
-                'rice', 'wheat', 'maize', 'corn', 'jowar', 'bajra', 'ragi', 'dal', 'arhar',
-                'chickpea', 'pea', 'lentil', 'urad', 'moong', 'mustard', 'sunflower', 'sesame',
-                'cotton', 'sugarcane', 'potato', 'onion', 'tomato', 'brinjal', 'okra', 'cucumber',
-                'bitter gourd', 'cabbage', 'cauliflower', 'carrot', 'radish', 'spinach', 'fenugreek'
-            ],
-            'farming_equipment': [
-                'ट्रैक्टर', 'हल', 'बीज ड्रिल', 'थ्रेशर', 'कंबाइन हार्वेस्टर', 'कल्टिवेटर',
-                'tractor', 'plough', 'seed drill', 'thresher', 'combine harvester',
-                'cultivator', 'harrow', 'rotavator', 'sprayer', 'weeder', 'transplanter'
-            ],
-            'irrigation_types': [
-                'बारिश', 'नहर', 'बोरवेल', 'कुआं', 'ड्रिप सिंचाई', 'फव्वारा सिंचाई', 'नलकूप',
-                'rain fed', 'canal', 'borewell', 'well', 'drip irrigation', 'sprinkler irrigation',
-                'tube well', 'surface irrigation', 'flood irrigation'
-            ],
-            'fertilizers': [
-                'खाद', 'यूरिया', 'डीएपी', 'पोटाश', 'जैविक खाद', 'कंपोस्ट', 'गोबर की खाद',
-                'fertilizer', 'urea', 'dap', 'potash', 'organic manure', 'compost', 'vermicompost',
-                'npk', 'phosphorus', 'nitrogen', 'potassium'
-            ]
-        }
-        
-        # Enhanced location patterns
-        self.location_patterns = {
-            'states': [
-                'उत्तर प्रदेश', 'महाराष्ट्र', 'बिहार', 'पश्चिम बंगाल', 'मध्य प्रदेश',
-                'तमिलनाडु', 'राजस्थान', 'कर्नाटक', 'गुजरात', 'आंध्र प्रदेश',
-                'uttar pradesh', 'up', 'maharashtra', 'bihar', 'west bengal', 'wb',
-                'madhya pradesh', 'mp', 'tamil nadu', 'tn', 'rajasthan', 'karnataka',
-                'gujarat', 'andhra pradesh', 'ap', 'punjab', 'haryana', 'kerala',
-                'odisha', 'jharkhand', 'chhattisgarh', 'assam', 'telangana'
-            ],
-            'districts': [
-                'अलीगढ़', 'मेरठ', 'मुजफ्फरनगर', 'सहारनपुर', 'गाज़ियाबाद', 'आगरा', 'कानपुर',
-                'aligarh', 'meerut', 'muzaffarnagar', 'saharanpur', 'ghaziabad', 'agra', 'kanpur',
-                'pune', 'nashik', 'ahmednagar', 'solapur', 'sangli', 'kolhapur', 'satara'
-            ]
-        }
-        
-        # Enhanced numeric patterns
-        self.numeric_patterns = {
-            'land_size': [
-                r'(\d+(?:\.\d+)?)\s*(?:एकड़|acre|acres|hectare|hectares|हेक्टेयर)',
-                r'(\d+(?:\.\d+)?)\s*(?:बीघा|bigha)',
-                r'(\d+(?:\.\d+)?)\s*(?:कट्ठा|katha)',
-                r'(\d+(?:\.\d+)?)\s*(?:गुंठा|guntha)'
-            ],
-            'income': [
-                r'(?:रुपये|रु|rs|₹|rupees?)\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-                r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:रुपये|रु|rs|₹|rupees?)',
-                r'(\d+(?:,\d+)*)\s*(?:लाख|lakh|lakhs)',
-                r'(\d+(?:,\d+)*)\s*(?:करोड़|crore|crores)'
-            ],
-            'age': [
-                r'(\d+)\s*(?:साल|वर्ष|years?|year old)',
-                r'(?:उम्र|age|आयु)\s*(\d+)'
-            ],
-            'family_size': [
-                r'(\d+)\s*(?:सदस्य|members?|लोग|people)',
-                r'(?:परिवार में|family of)\s*(\d+)'
-            ]
-        }
-        
-        # Initialize matchers for each language
-        for lang_code, nlp in self.nlp_models.items():
-            self.matchers[lang_code] = Matcher(nlp.vocab)
-            self._add_patterns_to_matcher(lang_code)
-    
-    def _add_patterns_to_matcher(self, lang_code: str):
-        """Add extraction patterns to spaCy matcher"""
-        matcher = self.matchers[lang_code]
+        """Load the shared, versioned extraction patterns"""
+        self.engine = ExtractionEngine()
         
-        # Crop patterns
-        crop_patterns = []
-        for crop in self.agricultural_patterns['crops']:
-            crop_patterns.append([{"LOWER": crop.lower()}])
-        
-        if crop_patterns:
-            matcher.add("CROPS", crop_patterns)
-        
-        # Location patterns
-        location_patterns = []
-        for location in self.location_patterns['states'] + self.location_patterns['districts']:
-            location_patterns.append([{"LOWER": location.lower()}])
-        
-        if location_patterns:
-            matcher.add("LOCATIONS", location_patterns)
-        
-        logger.info(f"Added patterns to matcher for {lang_code}")
+        # Cached results are only valid for the patterns that produced them
+        self.extractor_version = f"{EXTRACTOR_VERSION}-{self.engine.version}"
     
     async def extract_information(
         self, 
         text: str, 
-        language: LanguageCode = LanguageCode.HINDI
+        language: LanguageCode = LanguageCode.HINDI,
+        use_llm: Optional[bool] = None
     ) -> ExtractedInfo:
         """
         Extract farmer information from text using multiple methods including Ollama LLM
@@ -259,6 +179,7 @@ class EnhancedInfoExtractionAgent:
         Args:
             text: Input text (transcribed or direct)
             language: Language of the text
+            use_llm: Ask the LLM for missing fields, defaults to whether Ollama is enabled
             
         Returns:
             ExtractedInfo object with extracted farmer information
@@ -269,401 +190,367 @@ class EnhancedInfoExtractionAgent:
             logger.info(f"Extracting information from text (lang: {language.value})")
             
             # Clean and preprocess text
-            cleaned_text = self._preprocess_text(text)
+            cleaned_text = self.engine.preprocess(text)
+            use_llm = self.ollama_enabled if use_llm is None else use_llm and self.ollama_enabled
+            
+            # Identical normalized text extracts identically
+            cache_key = self._cache_key(cleaned_text, language, use_llm)
+            if self.result_cache:
+                cached = await self.result_cache.get(cache_key)
+                if cached:
+                    logger.info("Extraction cache hit")
+                    return ExtractedInfo.model_validate_json(cached).model_copy(update={"raw_text": text})
             
-            # Get appropriate NLP model
-            nlp = self.nlp_models.get(language.value, self.nlp_models['en'])
+            # Get appropriate NLP model, built on first use
+            nlp, _ = await self.nlp_registry.get(language.value)
             
             # Process text with spaCy
             doc = nlp(cleaned_text)
             
-            # Extract entities using different methods
-            entities = {}
-            confidence_scores = {}
-            
-            # Method 1: Pattern-based extraction
-            pattern_entities, pattern_confidence = await self._extract_with_patterns(
-                cleaned_text, language.value
+            result, llm_failed = await self._extract_from_doc(
+                text, cleaned_text, doc, language, use_llm=use_llm
             )
-            entities.update(pattern_entities)
-            confidence_scores.update(pattern_confidence)
             
-            # Method 2: Rule-based extraction
-            rule_entities, rule_confidence = await self._extract_with_rules(
-                cleaned_text, doc
-            )
-            entities.update(rule_entities)
-            confidence_scores.update(rule_confidence)
-            
-            # Method 3: Named Entity Recognition (for English)
-            if language == LanguageCode.ENGLISH:
-                ner_entities, ner_confidence = await self._extract_with_ner(doc)
-                entities.update(ner_entities)
-                confidence_scores.update(ner_confidence)
-            
-            # Method 4: Ollama LLM-based extraction (adaptive and context-aware)
-            if self.ollama_enabled:
-                llm_entities, llm_confidence = await self._extract_with_ollama(
-                    cleaned_text, language
-                )
-                # Merge LLM results with higher confidence for missing entities
-                for key, value in llm_entities.items():
-                    if key not in entities or confidence_scores.get(key, 0) < llm_confidence.get(key, 0):
-                        entities[key] = value
-                        confidence_scores[key] = llm_confidence[key]
-            
-            # Build FarmerInfo object
-            farmer_info = self._build_farmer_info(entities)
+            # A rules-only answer under the LLM key would outlive the outage
+            # or overload that caused it, for every replica sharing the cache
+            if self.result_cache and not llm_failed:
+                await self.result_cache.set(cache_key, result.model_dump_json())
             
             processing_time = time.time() - start_time
-            
-            extraction_method = "spacy+rules+patterns"
-            if self.ollama_enabled:
-                extraction_method += "+ollama"
-            
             logger.info(f"Information extraction completed in {processing_time:.2f}s")
             
-            return ExtractedInfo(
-                raw_text=text,
-                farmer_info=farmer_info,
-                entities=entities,
-                confidence_scores=confidence_scores,
-                extraction_method=extraction_method
-            )
+            return result
             
         except Exception as e:
             logger.error(f"Information extraction failed: {str(e)}")
             
             # Return basic structure with original text
-            return ExtractedInfo(
-                raw_text=text,
-                farmer_info=FarmerInfo(),
-                entities={},
-                confidence_scores={},
-                extraction_method="failed"
-            )
+            return self._failed_extraction(text)
+    
+    async def extract_information_batch(
+        self,
+        texts: List[str],
+        languages: Union[LanguageCode, List[LanguageCode]] = LanguageCode.HINDI,
+        use_llm: bool = False
+    ) -> List[ExtractedInfo]:
+        """
+        Extract farmer information from many texts, batching the spaCy work
+        
+        Texts are grouped by the spaCy pipeline serving their language and
+        each group runs through ``nlp.pipe``. Pattern, rule and NER extraction
+        then run on the resulting docs exactly as in ``extract_information``.
+        
+        Args:
+            texts: Input texts
+            languages: One language for all texts, or one per text
+            use_llm: Also run Ollama extraction per text (off by default, it
+                dominates the cost of bulk backfills)
+            
+        Returns:
+            ExtractedInfo per input text, in input order
+        """
+        if isinstance(languages, LanguageCode):
+            languages = [languages] * len(texts)
+        if len(languages) != len(texts):
+            raise ValueError(f"Got {len(languages)} languages for {len(texts)} texts")
+        
+        start_time = time.time()
+        use_llm = use_llm and self.ollama_enabled
+        cleaned_texts = [self.engine.preprocess(text) for text in texts]
+        results: List[Optional[ExtractedInfo]] = [None] * len(texts)
+        
+        # Languages that share a pipeline are piped together
+        groups: Dict[str, List[int]] = {}
+        for index, language in enumerate(languages):
+            groups.setdefault(self.nlp_registry.resolve(language.value), []).append(index)
+        
+        loop = asyncio.get_event_loop()
+        for indices in groups.values():
+            try:
+                nlp, _ = await self.nlp_registry.get(languages[indices[0]].value)
+                group_texts = [cleaned_texts[index] for index in indices]
+                docs = await loop.run_in_executor(
+                    None,
+                    lambda: list(nlp.pipe(
+                        group_texts,
+                        batch_size=settings.nlp_batch_size,
+                        n_process=settings.nlp_n_process
+                    ))
+                )
+            except Exception as e:
+                logger.error(f"Batch spaCy processing failed: {str(e)}")
+                for index in indices:
+                    results[index] = self._failed_extraction(texts[index])
+                continue
+            
+            for index, doc in zip(indices, docs):
+                try:
+                    results[index], _ = await self._extract_from_doc(
+                        texts[index], cleaned_texts[index], doc, languages[index], use_llm=use_llm
+                    )
+                except Exception as e:
+                    logger.warning(f"Batch extraction failed for text {index}: {str(e)}")
+                    results[index] = self._failed_extraction(texts[index])
+        
+        processing_time = time.time() - start_time
+        logger.info(
+            f"Batch extraction of {len(texts)} texts in {len(groups)} pipeline groups "
+            f"completed in {processing_time:.2f}s"
+        )
+        
+        return results
+    
+    async def _extract_from_doc(
+        self,
+        text: str,
+        cleaned_text: str,
+        doc,
+        language: LanguageCode,
+        use_llm: bool
+    ) -> Tuple[ExtractedInfo, bool]:
+        """
+        Run every extraction method on an already processed doc
+        
+        Returns:
+            Tuple of (extracted info, whether the LLM was needed but failed)
+        """
+        # Methods 1 and 2: Pattern and rule-based extraction
+        entities, confidence_scores = self.engine.extract(cleaned_text)
+        
+        # Method 3: Named Entity Recognition (for English)
+        if language == LanguageCode.ENGLISH:
+            ner_entities, ner_confidence = await self._extract_with_ner(doc)
+            entities.update(ner_entities)
+            confidence_scores.update(ner_confidence)
+        
+        # Method 4: Ollama LLM-based extraction, only for fields the cheaper
+        # methods left missing or uncertain
+        llm_result = None
+        if use_llm:
+            llm_result = await self.refine_with_llm(cleaned_text, language, entities, confidence_scores)
+        
+        # Build FarmerInfo object
+        farmer_info = self.build_farmer_info(entities)
+        
+        extraction_method = "spacy+rules+patterns"
+        if llm_result:
+            extraction_method += "+ollama"
+        
+        return ExtractedInfo(
+            raw_text=text,
+            farmer_info=farmer_info,
+            entities=entities,
+            confidence_scores=confidence_scores,
+            extraction_method=extraction_method
+        ), llm_result is False
+    
+    async def refine_with_llm(
+        self,
+        text: str,
+        language: LanguageCode,
+        entities: Dict[str, Any],
+        confidence_scores: Dict[str, float]
+    ) -> Optional[bool]:
+        """
+        Ask the LLM for required fields that are missing or uncertain
+        
+        Args:
+            text: Cleaned text the entities were extracted from
+            language: Language of the text
+            entities: Extracted entities, updated in place
+            confidence_scores: Per-field confidence, updated in place
+            
+        Returns:
+            True if the LLM answered, False if it was needed but failed or
+            shed the request, None if no field needed it
+        """
+        llm_fields = self._fields_needing_llm(entities, confidence_scores)
+        self.llm_gate_stats["llm_calls" if llm_fields else "llm_skipped"] += 1
+        self.llm_gate_stats["fields_requested"] += len(llm_fields)
+        
+        if not llm_fields:
+            return None
+        
+        llm_entities, llm_confidence, succeeded = await self._extract_with_ollama(text, language, llm_fields)
+        if not succeeded:
+            self.llm_gate_stats["llm_failed"] += 1
+            return False
+        # Merge LLM results with higher confidence for missing entities
+        for key, value in llm_entities.items():
+            if key not in entities or confidence_scores.get(key, 0) < llm_confidence.get(key, 0):
+                entities[key] = value
+                confidence_scores[key] = llm_confidence[key]
+        return True
+    
+    def _cache_key(self, cleaned_text: str, language: LanguageCode, use_llm: bool) -> str:
+        """Key on everything that determines an extraction result"""
+        return ResultCache.make_key(
+            self.extractor_version,
+            language.value,
+            self.ollama_model if use_llm else "no-llm",
+            ",".join(settings.llm_gate_required_fields),
+            settings.llm_gate_min_confidence,
+            cleaned_text
+        )
+    
+    def _fields_needing_llm(
+        self, entities: Dict[str, Any], confidence_scores: Dict[str, float]
+    ) -> List[str]:
+        """Required fields that are missing or below the confidence threshold"""
+        return [
+            field for field in settings.llm_gate_required_fields
+            if field not in entities
+            or confidence_scores.get(field, 0.0) < settings.llm_gate_min_confidence
+        ]
+    
+    def _failed_extraction(self, text: str) -> ExtractedInfo:
+        """Basic structure with the original text, for when extraction fails"""
+        return ExtractedInfo(
+            raw_text=text,
+            farmer_info=FarmerInfo(),
+            entities={},
+            confidence_scores={},
+            extraction_method="failed"
+        )
     
     async def _extract_with_ollama(
-        self, text: str, language: LanguageCode
-    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
-        """Extract entities using Ollama LLM for adaptive and context-aware extraction"""
+        self, text: str, language: LanguageCode, fields: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, float], bool]:
+        """
+        Extract entities using Ollama LLM, optionally only the given fields
+        
+        Returns:
+            Tuple of (entities, confidence scores, whether the LLM answered)
+        """
         entities = {}
         confidence_scores = {}
         
-        if not self.ollama_enabled or not self.ollama_client:
-            return entities, confidence_scores
+        if not self.ollama_enabled or not self.llm_gateway:
+            return entities, confidence_scores, False
         
         try:
-            # Create structured prompt for farmer information extraction
-            extraction_prompt = self._create_extraction_prompt(text, language)
-            
-            # Get response from Ollama
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, 
-                lambda: self.ollama_client.chat(
+            # Shared system prompt first, then this text
+            messages = self._create_extraction_messages(text, language, fields)
+            
+            output_format = self._extraction_format(fields)
+            if settings.ollama_stream_extraction:
+                parsed_entities = await self._stream_ollama_entities(messages, output_format)
+            else:
+                # Get response from Ollama
+                response = await self.llm_gateway.chat(
+                    priority=LLMPriority.BACKGROUND,
                     model=self.ollama_model,
-                    messages=[{
-                        'role': 'user',
-                        'content': extraction_prompt
-                    }],
+                    messages=messages,
+                    format=output_format,
                     options={
                         'temperature': 0.1,  # Low temperature for consistent extraction
-                        'top_p': 0.9,
-                        'num_predict': 500
+                        'top_p': 0.9
                     }
                 )
-            )
-            
-            # Parse the LLM response
-            llm_output = response['message']['content']
-            parsed_entities = self._parse_ollama_response(llm_output)
+                
+                # Parse the LLM response
+                llm_output = response['message']['content']
+                parsed_entities = self._parse_ollama_response(llm_output)
             
             # Add confidence scores for LLM-extracted entities
             for key, value in parsed_entities.items():
+                if fields and key not in fields:
+                    continue
                 if value:  # Only add non-empty values
                     entities[key] = value
                     confidence_scores[key] = 0.85  # High confidence for LLM extraction
             
             logger.info(f"Ollama extracted {len(entities)} entities")
             
+        except LLMQueueFullError as e:
+            logger.warning(f"Ollama extraction shed under load: {str(e)}")
+            return {}, {}, False
         except Exception as e:
             logger.warning(f"Ollama extraction failed: {str(e)}")
+            return {}, {}, False
         
-        return entities, confidence_scores
+        return entities, confidence_scores, True
     
-    def _create_extraction_prompt(self, text: str, language: LanguageCode) -> str:
-        """Create a structured prompt for Ollama to extract farmer information"""
-        
-        prompt = f"""
-You are an expert information extraction system specialized in extracting farmer information from text. 
-Extract the following information from the given text and return it in JSON format.
-
-Text to analyze: "{text}"
-
-Extract these fields if present:
-- name: Farmer's name
-- age: Age in years (number only)
-- gender: male/female
-- phone_number: Phone number
-- state: State name
-- district: District name
-- village: Village name
-- land_size_acres: Land size in acres (convert if needed)
-- land_ownership: owned/leased/shared
-- annual_income: Annual income in rupees (convert lakhs/crores to numbers)
-- crops: List of crops grown
-- irrigation_type: Type of irrigation used
-- family_size: Number of family members
-- farming_equipment: Equipment owned
-- fertilizers_used: Fertilizers mentioned
-
-Rules:
-1. Return ONLY valid JSON format
-2. Use null for missing information
-3. Convert all measurements to standard units
-4. For crops, return as array even if single crop
-5. Be precise and don't make assumptions
-6. Handle both English and Hindi text
-
-Example output format:
-{{
-    "name": "Ram Kumar",
-    "age": 45,
-    "gender": "male",
-    "phone_number": "9876543210",
-    "state": "Uttar Pradesh",
-    "district": "Aligarh",
-    "village": "Rampur",
-    "land_size_acres": 5.0,
-    "land_ownership": "owned",
-    "annual_income": 200000,
-    "crops": ["wheat", "rice"],
-    "irrigation_type": "borewell",
-    "family_size": 6,
-    "farming_equipment": ["tractor"],
-    "fertilizers_used": ["urea", "dap"]
-}}
-
-JSON Response:
-"""
-        
-        return prompt
+    def _extraction_format(self, fields: Optional[List[str]]) -> Any:
+        """Ollama ``format``: the FarmerInfo schema of the requested fields, or plain JSON mode"""
+        if not settings.ollama_format_schema:
+            return "json"
+        return FarmerInfo.extraction_schema(
+            [field for field in (fields or LLM_FIELD_DESCRIPTIONS) if field in LLM_FIELD_DESCRIPTIONS]
+        )
     
-    def _parse_ollama_response(self, response: str) -> Dict[str, Any]:
-        """Parse Ollama's JSON response into structured entities"""
-        entities = {}
-        
-        try:
-            # Extract JSON from response
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            
-            if json_start != -1 and json_end != 0:
-                json_str = response[json_start:json_end]
-                parsed_data = json.loads(json_str)
-                
-                # Map parsed data to our entity structure
-                entity_mapping = {
-                    'name': 'name',
-                    'age': 'age',
-                    'gender': 'gender',
-                    'phone_number': 'phone_number',
-                    'state': 'state',
-                    'district': 'district',
-                    'village': 'village',
-                    'land_size_acres': 'land_size_acres',
-                    'land_ownership': 'land_ownership',
-                    'annual_income': 'annual_income',
-                    'crops': 'crops',
-                    'irrigation_type': 'irrigation_type',
-                    'family_size': 'family_size',
-                    'farming_equipment': 'farming_equipment',
-                    'fertilizers_used': 'fertilizers_used'
-                }
-                
-                for llm_key, entity_key in entity_mapping.items():
-                    if llm_key in parsed_data and parsed_data[llm_key] is not None:
-                        entities[entity_key] = parsed_data[llm_key]
-                
-        except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse Ollama JSON response: {str(e)}")
-            # Fallback: try to extract information using regex
-            entities = self._fallback_parse_ollama_response(response)
-        except Exception as e:
-            logger.warning(f"Error parsing Ollama response: {str(e)}")
+    async def _stream_ollama_entities(self, messages: List[Dict[str, str]], output_format: Any) -> Dict[str, Any]:
+        """Parse the LLM's JSON while it streams and cancel generation once the object closes"""
+        stream = self.llm_gateway.chat_stream(
+            priority=LLMPriority.BACKGROUND,
+            model=self.ollama_model,
+            messages=messages,
+            format=output_format,
+            options={
+                'temperature': 0.1,  # Low temperature for consistent extraction
+                'top_p': 0.9
+            }
+        )
         
-        return entities
-    
-    def _fallback_parse_ollama_response(self, response: str) -> Dict[str, Any]:
-        """Fallback parser for when JSON parsing fails"""
-        entities = {}
+        finished = False
         
-        # Simple regex patterns to extract key information
-        patterns = {
-            'name': r'(?:name|नाम)[:=]\s*["\']?([^"\',\n]+)["\']?',
-            'age': r'(?:age|उम्र|आयु)[:=]\s*(\d+)',
-            'phone_number': r'(?:phone|फोन)[:=]\s*["\']?(\d{10})["\']?',
-            'annual_income': r'(?:income|आय)[:=]\s*["\']?(\d+(?:,\d+)*)["\']?'
-        }
+        async def content():
+            nonlocal finished
+            try:
+                async for chunk in stream:
+                    finished = finished or chunk.get('done', False)
+                    yield chunk['message']['content']
+            finally:
+                # Generation stops once no identical request is still reading it
+                await stream.aclose()
         
-        for key, pattern in patterns.items():
-            match = re.search(pattern, response, re.IGNORECASE)
-            if match:
-                entities[key] = match.group(1).strip()
+        parser = IncrementalJSONParser()
+        entities = {}
+        async for key, value in iter_json_fields(content(), parser):
+            if key in LLM_FIELD_DESCRIPTIONS and value is not None:
+                entities[key] = value
         
+        if not parser.done:
+            # Constrained output only ends early if generation was cut off
+            logger.warning("Ollama output ended before the JSON object closed")
+        elif not finished:
+            # Only count streams actually closed before Ollama's final chunk
+            self.llm_gate_stats["stream_early_stops"] += 1
         return entities
     
-    def _preprocess_text(self, text: str) -> str:
-        """Clean and preprocess input text"""
-        if not text:
-            return ""
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # Remove special characters but keep important punctuation
-        text = re.sub(r'[^\w\s.,।?!₹]', ' ', text)
+    def _create_extraction_messages(
+        self, text: str, language: LanguageCode, fields: Optional[List[str]] = None
+    ) -> List[Dict[str, str]]:
+        """Chat messages for Ollama: the shared system prompt, then the text and any field subset"""
+        user_content = f'Text: "{text}"'
+        if fields:
+            # The schema already limits the output; naming the fields keeps the model on them
+            wanted = [field for field in fields if field in LLM_FIELD_DESCRIPTIONS]
+            user_content += f"\nOnly extract: {', '.join(wanted)}"
         
-        # Normalize common variations
-        text = text.replace('रु.', 'रुपये')
-        text = text.replace('Rs.', 'rupees')
-        text = text.replace('₹', 'rupees')
-        
-        return text
+        return [
+            {'role': 'system', 'content': EXTRACTION_SYSTEM_PROMPT},
+            {'role': 'user', 'content': user_content}
+        ]
     
-    async def _extract_with_patterns(
-        self, text: str, language: str
-    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
-        """Extract entities using pattern matching"""
+    def _parse_ollama_response(self, response: str) -> Dict[str, Any]:
+        """Parse Ollama's schema-constrained JSON response into structured entities"""
         entities = {}
-        confidence_scores = {}
         
         try:
-            # Extract crops
-            crops = []
-            for crop in self.agricultural_patterns['crops']:
-                if crop.lower() in text.lower():
-                    crops.append(crop)
-            
-            if crops:
-                entities['crops'] = crops
-                confidence_scores['crops'] = 0.8
-            
-            # Extract land size
-            land_size = self._extract_numeric_value(text, 'land_size')
-            if land_size:
-                entities['land_size_acres'] = float(land_size)
-                confidence_scores['land_size_acres'] = 0.9
-            
-            # Extract income
-            income = self._extract_numeric_value(text, 'income')
-            if income:
-                entities['annual_income'] = self._normalize_income(income, text)
-                confidence_scores['annual_income'] = 0.8
-            
-            # Extract age
-            age = self._extract_numeric_value(text, 'age')
-            if age:
-                entities['age'] = int(age)
-                confidence_scores['age'] = 0.9
-            
-            # Extract family size
-            family_size = self._extract_numeric_value(text, 'family_size')
-            if family_size:
-                entities['family_size'] = int(family_size)
-                confidence_scores['family_size'] = 0.8
-            
-        except Exception as e:
-            logger.warning(f"Pattern extraction failed: {str(e)}")
+            parsed_data = json.loads(response)
+        except json.JSONDecodeError as e:
+            # Only possible when generation was cut off
+            logger.warning(f"Failed to parse Ollama JSON response: {str(e)}")
+            return entities
         
-        return entities, confidence_scores
-    
-    def _normalize_income(self, income_str: str, full_text: str) -> int:
-        """Normalize income to rupees"""
-        try:
-            income_num = float(income_str.replace(',', ''))
-            
-            # Check for lakh/crore indicators
-            if any(word in full_text.lower() for word in ['lakh', 'लाख']):
-                income_num *= 100000
-            elif any(word in full_text.lower() for word in ['crore', 'करोड़']):
-                income_num *= 10000000
-            
-            return int(income_num)
-        except:
-            return income_str
+        # Keep the fields we know, under the same names
+        for key in LLM_FIELD_DESCRIPTIONS:
+            if key in parsed_data and parsed_data[key] is not None:
+                entities[key] = parsed_data[key]
+        
+        return entities
     
-    async def _extract_with_rules(
-        self, text: str, doc
-    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
-        """Extract entities using rule-based approach"""
-        entities = {}
-        confidence_scores = {}
-
-        try:
-            # Rule 1: Extract phone numbers
-            phone_pattern = r'(?:\+91|91)?[-.\s]?[6-9]\d{9}'
-            phone_matches = re.findall(phone_pattern, text)
-            if phone_matches:
-                entities['phone_number'] = phone_matches[0]
-                confidence_scores['phone_number'] = 0.95
-
-            # Rule 2: Extract irrigation type
-            irrigation_keywords = {
-                'rain fed': ['rain', 'बारिश', 'rainfall'],
-                'canal': ['canal', 'नहर'],
-                'borewell': ['borewell', 'bore well', 'tube well', 'बोरवेल', 'नलकूप'],
-                'drip': ['drip', 'ड्रिप'],
-                'sprinkler': ['sprinkler', 'फव्वारा']
-            }
-
-            for irrigation_type, keywords in irrigation_keywords.items():
-                if any(keyword.lower() in text.lower() for keyword in keywords):
-                    entities['irrigation_type'] = irrigation_type
-                    confidence_scores['irrigation_type'] = 0.7
-                    break
-
-            # Rule 3: Extract known location mentions
-            locations = []
-            for location in self.location_patterns['states'] + self.location_patterns['districts']:
-                if location.lower() in text.lower():
-                    locations.append(location)
-            
-            if locations:
-                entities['locations'] = locations
-                confidence_scores['locations'] = 0.85
-
-            # Rule 4: Extract gender information
-            gender_keywords = {
-                'male': ['sir', 'mr', 'साहब', 'भाई', 'जी'],
-                'female': ['madam', 'mrs', 'ms', 'मैडम', 'बहन', 'जी']
-            }
-            
-            for gender, keywords in gender_keywords.items():
-                if any(keyword.lower() in text.lower() for keyword in keywords):
-                    entities['gender'] = gender
-                    confidence_scores['gender'] = 0.6
-                    break
-
-            # Rule 5: Extract land ownership type
-            ownership_keywords = {
-                'owned': ['own', 'owned', 'अपना', 'स्वामित्व'],
-                'leased': ['lease', 'leased', 'rent', 'किराया', 'लीज'],
-                'shared': ['share', 'shared', 'साझा', 'बंटाई']
-            }
-            
-            for ownership_type, keywords in ownership_keywords.items():
-                if any(keyword.lower() in text.lower() for keyword in keywords):
-                    entities['land_ownership'] = ownership_type
-                    confidence_scores['land_ownership'] = 0.7
-                    break
-
-        except Exception as e:
-            logger.warning(f"Rule-based extraction failed: {str(e)}")
-
-        return entities, confidence_scores
-
     async def _extract_with_ner(self, doc) -> Tuple[Dict[str, Any], Dict[str, float]]:
         """Extract entities using spaCy's NER (only for English)"""
         entities = {}
@@ -690,55 +577,24 @@ JSON Response:
 
         return entities, confidence_scores
 
-    def _extract_numeric_value(self, text: str, category: str) -> Optional[str]:
-        """Extract numeric value from text using regex for a given category"""
-        patterns = self.numeric_patterns.get(category, [])
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).replace(",", "")
-        return None
-
-    def _build_farmer_info(self, entities: Dict[str, Any]) -> FarmerInfo:
+    def build_farmer_info(self, entities: Dict[str, Any]) -> FarmerInfo:
         """Build FarmerInfo dataclass object from extracted entities"""
-        # Handle locations - separate state and district
-        locations = entities.get('locations', [])
-        state = None
-        district = None
-        
-        if locations:
-            for location in locations:
-                if location.lower() in [s.lower() for s in self.location_patterns['states']]:
-                    state = location
-                elif location.lower() in [d.lower() for d in self.location_patterns['districts']]:
-                    district = location
-        
-        return FarmerInfo(
-            name=entities.get("name"),
-            phone_number=entities.get("phone_number"),
-            age=entities.get("age"),
-            gender=entities.get("gender"),
-            family_size=entities.get("family_size"),
-            state=entities.get("state") or state,
-            district=entities.get("district") or district,
-            village=entities.get("village"),
-            land_size_acres=entities.get("land_size_acres"),
-            land_ownership=entities.get("land_ownership"),
-            annual_income=entities.get("annual_income"),
-            crops=entities.get("crops", []),
-            irrigation_type=entities.get("irrigation_type")
-        )
+        return FarmerInfo(**self.engine.farmer_fields(entities))
     
     async def is_ready(self) -> bool:
         """Check if the agent is ready"""
-        return len(self.nlp_models) > 0
+        return self.nlp_registry is not None
     
     async def cleanup(self):
         """Cleanup resources"""
         try:
-            self.nlp_models.clear()
-            self.matchers.clear()
-            self.ollama_client = None
+            if self.nlp_registry:
+                self.nlp_registry.clear()
+            if self.result_cache:
+                await self.result_cache.close()
+                self.result_cache = None
+            # The gateway is shared, the service closes it on shutdown
+            self.llm_gateway = None
             logger.info("Enhanced NLU agent cleaned up successfully")
         except Exception as e:
             logger.error(f"Error during NLU cleanup: {str(e)}")
@@ -759,13 +615,11 @@ JSON Response:
     
     async def get_ollama_models(self) -> List[str]:
         """Get list of available Ollama models"""
-        if not self.ollama_enabled or not self.ollama_client:
+        if not self.ollama_enabled or not self.llm_gateway:
             return []
         
         try:
-            models = await asyncio.get_event_loop().run_in_executor(
-                None, self.ollama_client.list
-            )
+            models = await self.llm_gateway.list()
             return [model['name'] for model in models['models']]
         except Exception as e:
             logger.error(f"Failed to get Ollama models: {str(e)}")
@@ -773,11 +627,19 @@ JSON Response:
     
     def get_extraction_statistics(self) -> Dict[str, Any]:
         """Get statistics about extraction performance"""
+        gated = self.llm_gate_stats["llm_calls"] + self.llm_gate_stats["llm_skipped"]
         return {
-            "supported_languages": list(self.nlp_models.keys()),
-            "total_crop_patterns": len(self.agricultural_patterns.get('crops', [])),
-            "total_location_patterns": len(self.location_patterns.get('states', []) + self.location_patterns.get('districts', [])),
-            "numeric_pattern_categories": list(self.numeric_patterns.keys()),
+            "supported_languages": self.nlp_registry.supported_languages if self.nlp_registry else [],
+            "spacy_pipelines": self.nlp_registry.get_stats() if self.nlp_registry else None,
+            "startup": self.startup_metrics,
+            "llm_gating": {
+                **self.llm_gate_stats,
+                "llm_avoided_rate": self.llm_gate_stats["llm_skipped"] / gated if gated else 0.0
+            },
+            "extractor_version": self.extractor_version,
+            "result_cache": self.result_cache.get_stats() if self.result_cache else None,
+            "patterns": self.engine.get_stats() if self.engine else None,
             "ollama_enabled": self.ollama_enabled,
-            "ollama_model": self.ollama_model if self.ollama_enabled else None
+            "ollama_model": self.ollama_model if self.ollama_enabled else None,
+            "llm_gateway": self.llm_gateway.get_stats() if self.llm_gateway else None
         }
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+LLM Gateway
+One long-lived, pooled async Ollama client for the whole AI agent, with
+identical in-flight requests coalesced onto a single upstream generation
+and upstream generations admitted through the priority scheduler
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+try:
+    import httpx
+    from ollama import AsyncClient
+    OLLAMA_AVAILABLE = True
+except ImportError:
+    OLLAMA_AVAILABLE = False
+
+from config import get_settings
+from llm_scheduler import LLMPriority, LLMScheduler, LLMTicket
+from utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+class _Flight:
+    """One upstream request and everything it has produced so far, shared by its subscribers"""
+
+    def __init__(self, key: str, priority: LLMPriority):
+        self.key = key
+        self.priority = priority
+        self.ticket: Optional[LLMTicket] = None
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Event()
+
+    def publish(self, chunk: Any):
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.done = True
+        self.error = error
+        self._notify()
+
+    def _notify(self):
+        # Wake everyone waiting on the current event and hand out a fresh one
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class LLMGateway:
+    """
+    Shared async Ollama client with a bounded keep-alive connection pool
+
+    Requests with the same endpoint, model, messages/prompt, format and
+    options that overlap in time share one upstream call (singleflight).
+    Streamed requests are fanned out chunk by chunk, and a subscriber that
+    joins late replays what was already produced. The upstream stream is
+    closed, which stops generation on the server, only once every
+    subscriber has gone. Nothing is kept after a request completes.
+
+    Each upstream call takes a slot from the LLMScheduler for its model,
+    so coalesced requests share one slot. A flight queued as background
+    is promoted when an interactive request joins it.
+
+    Requests without their own ``keep_alive`` get the gateway's, so the
+    model stays loaded between requests and Ollama can reuse the cached
+    prompt prefix instead of evaluating it again.
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        coalesce: Optional[bool] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        keep_alive: Optional[str] = None
+    ):
+        if not OLLAMA_AVAILABLE:
+            raise RuntimeError("ollama is not installed")
+
+        self.host = host or settings.ollama_host
+        self.timeout = timeout or settings.ollama_timeout
+        self.coalesce = settings.ollama_coalesce_requests if coalesce is None else coalesce
+        self.keep_alive = keep_alive or settings.ollama_keep_alive
+        self.limits = httpx.Limits(
+            max_connections=max_connections or settings.ollama_max_connections,
+            max_keepalive_connections=max_keepalive_connections or settings.ollama_max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry or settings.ollama_keepalive_expiry
+        )
+
+        # Extra keyword arguments are passed through to the underlying httpx.AsyncClient
+        self.client = AsyncClient(host=self.host, timeout=self.timeout, limits=self.limits)
+
+        self.scheduler = scheduler
+        if self.scheduler is None and settings.llm_scheduler_enabled:
+            self.scheduler = LLMScheduler(
+                max_concurrent=settings.llm_max_concurrent_per_model,
+                max_queued=settings.llm_max_queued_per_model,
+                background_wait_budget=settings.llm_background_wait_budget_seconds
+            )
+
+        self._inflight: Dict[str, _Flight] = {}
+        self.stats = {"requests": 0, "upstream_requests": 0, "coalesced": 0, "errors": 0}
+
+        logger.info(
+            f"LLM gateway for {self.host}: max {self.limits.max_connections} connections, "
+            f"{self.limits.max_keepalive_connections} kept alive for {self.limits.keepalive_expiry}s"
+        )
+
+    async def chat(self, priority: LLMPriority = LLMPriority.INTERACTIVE, **request) -> Dict[str, Any]:
+        """Non-streaming ``/api/chat``, takes AsyncClient.chat keyword arguments"""
+        return await self._request("chat", request, priority)
+
+    async def generate(self, priority: LLMPriority = LLMPriority.INTERACTIVE, **request) -> Dict[str, Any]:
+        """Non-streaming ``/api/generate``, takes AsyncClient.generate keyword arguments"""
+        return await self._request("generate", request, priority)
+
+    def chat_stream(self, priority: LLMPriority = LLMPriority.INTERACTIVE, **request) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming ``/api/chat``; close the iterator to stop consuming"""
+        return self._stream("chat", request, True, priority)
+
+    def generate_stream(self, priority: LLMPriority = LLMPriority.INTERACTIVE, **request) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming ``/api/generate``; close the iterator to stop consuming"""
+        return self._stream("generate", request, True, priority)
+
+    async def list(self) -> Dict[str, Any]:
+        return await self.client.list()
+
+    async def pull(self, model: str) -> Dict[str, Any]:
+        return await self.client.pull(model)
+
+    async def _request(self, endpoint: str, request: Dict[str, Any], priority: LLMPriority) -> Dict[str, Any]:
+        stream = self._stream(endpoint, request, False, priority)
+        try:
+            async for response in stream:
+                return response
+        finally:
+            await stream.aclose()
+
+    async def _stream(
+        self, endpoint: str, request: Dict[str, Any], stream: bool, priority: LLMPriority
+    ) -> AsyncIterator[Any]:
+        """Join the in-flight identical request, or start one, and yield its chunks"""
+        self.stats["requests"] += 1
+        if self.keep_alive:
+            request = {"keep_alive": self.keep_alive, **request}
+
+        key = self._request_key(endpoint, request, stream)
+        flight = self._inflight.get(key) if self.coalesce else None
+        if flight:
+            self.stats["coalesced"] += 1
+            if priority < flight.priority:
+                flight.priority = priority
+                if flight.ticket:
+                    self.scheduler.promote(flight.ticket, priority)
+        else:
+            flight = _Flight(key, priority)
+            flight.task = asyncio.ensure_future(self._run(flight, endpoint, request, stream))
+            if self.coalesce:
+                self._inflight[key] = flight
+
+        flight.subscribers += 1
+        index = 0
+        try:
+            while True:
+                if index < len(flight.chunks):
+                    index += 1
+                    yield flight.chunks[index - 1]
+                elif flight.done:
+                    if flight.error:
+                        raise flight.error
+                    return
+                else:
+                    await flight.changed.wait()
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done:
+                # Nobody is listening any more, stop the generation. Take the
+                # flight out of _inflight first so an identical request that
+                # arrives now starts afresh instead of joining a cancelled one,
+                # and finish it here because a task cancelled before its first
+                # step never runs _run's finally
+                if self._inflight.get(flight.key) is flight:
+                    del self._inflight[flight.key]
+                flight.finish(asyncio.CancelledError())
+                flight.task.cancel()
+
+    async def _run(self, flight: _Flight, endpoint: str, request: Dict[str, Any], stream: bool):
+        """Make the upstream call and publish what it returns to the flight"""
+        self.stats["upstream_requests"] += 1
+        error = None
+        try:
+            if self.scheduler:
+                flight.ticket = self.scheduler.reserve(request.get("model", ""), flight.priority)
+            async with flight.ticket or contextlib.nullcontext():
+                call = getattr(self.client, endpoint)
+                if stream:
+                    upstream = await call(stream=True, **request)
+                    try:
+                        async for chunk in upstream:
+                            flight.publish(chunk)
+                    finally:
+                        # Closing the HTTP stream stops generation on the server
+                        await upstream.aclose()
+                else:
+                    flight.publish(await call(**request))
+        except asyncio.CancelledError:
+            error = asyncio.CancelledError()
+        except Exception as e:
+            self.stats["errors"] += 1
+            error = e
+        finally:
+            if self._inflight.get(flight.key) is flight:
+                del self._inflight[flight.key]
+            if not flight.done:
+                flight.finish(error)
+
+    @staticmethod
+    def _request_key(endpoint: str, request: Dict[str, Any], stream: bool) -> str:
+        payload = json.dumps([endpoint, stream, request], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get gateway statistics"""
+        return {
+            **self.stats,
+            "in_flight": len(self._inflight),
+            "coalesce_rate": self.stats["coalesced"] / self.stats["requests"] if self.stats["requests"] else 0.0,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "scheduler": self.scheduler.get_stats() if self.scheduler else None
+        }
+
+    async def close(self):
+        """Close pooled connections"""
+        for flight in list(self._inflight.values()):
+            flight.task.cancel()
+        # AsyncClient has no public close; its httpx client owns the pool
+        await self.client._client.aclose()
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> Optional[LLMGateway]:
+    """The process-wide gateway, created on first use; None when ollama is not installed"""
+    global _gateway
+    if _gateway is None and OLLAMA_AVAILABLE:
+        _gateway = LLMGateway()
+    return _gateway
+
+
+async def close_llm_gateway():
+    """Close the process-wide gateway, if one was created"""
+    global _gateway
+    if _gateway is not None:
+        await _gateway.close()
+        _gateway = None
+
+
+__all__ = ["LLMGateway", "get_llm_gateway", "close_llm_gateway", "OLLAMA_AVAILABLE"]
@@ -0,0 +1,139 @@
+"""
+LLM Model Router
+Moves background LLM traffic to the fallback model while the primary model
+is too slow or too backed up, and back again once it recovers
+"""
+
+import time
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from llm_scheduler import LLMPriority
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ModelRouter:
+    """
+    Latency-aware choice between a primary and a fallback model
+
+    Every generation's wall time, queueing included, is recorded per model
+    and kept for ``window_seconds``. The primary is considered degraded when
+    the p90 of its window exceeds ``latency_slo`` (given at least
+    ``min_samples`` samples) or its scheduler queue reaches
+    ``max_queue_depth``. It recovers once the p90 is back under
+    ``recovery_ratio`` times the SLO, or the samples have aged out, and the
+    queue has drained to half that depth. The gap between the two thresholds
+    keeps the router from flapping.
+
+    Only BACKGROUND traffic is rerouted; interactive requests always go to
+    the primary, which also keeps its latency window fresh.
+    """
+
+    def __init__(
+        self,
+        primary: str,
+        fallback: Optional[str],
+        latency_slo: float,
+        window_seconds: float = 120.0,
+        min_samples: int = 5,
+        max_queue_depth: int = 8,
+        recovery_ratio: float = 0.7,
+        queue_depth_fn: Optional[Callable[[str], int]] = None
+    ):
+        self.primary = primary
+        self.fallback = fallback
+        self.latency_slo = latency_slo
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.max_queue_depth = max_queue_depth
+        self.recovery_ratio = recovery_ratio
+        self.queue_depth_fn = queue_depth_fn or (lambda model: 0)
+
+        self.degraded = False
+        self._latencies: Dict[str, Deque[Tuple[float, float]]] = defaultdict(deque)  # model -> (recorded_at, seconds)
+        self.stats = {"switches_to_fallback": 0, "switches_to_primary": 0, "routed": defaultdict(int)}
+
+    def set_models(self, primary: str, fallback: Optional[str]):
+        """Update the model pair, e.g. after the available models were reloaded"""
+        if (primary, fallback) != (self.primary, self.fallback):
+            self.primary = primary
+            self.fallback = fallback
+            self.degraded = False
+
+    def record(self, model: str, seconds: float):
+        """Record how long a generation on ``model`` took"""
+        self._latencies[model].append((time.time(), seconds))
+
+    def _window(self, model: str) -> List[float]:
+        samples = self._latencies[model]
+        cutoff = time.time() - self.window_seconds
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+        return [seconds for _, seconds in samples]
+
+    def p90(self, model: str) -> Optional[float]:
+        """90th percentile latency over the window, None with too few samples"""
+        window = sorted(self._window(model))
+        if len(window) < self.min_samples:
+            return None
+        return window[min(len(window) - 1, int(0.9 * len(window)))]
+
+    def route(self, priority: LLMPriority) -> str:
+        """
+        Pick the model for a request
+
+        Args:
+            priority: Scheduling priority of the request
+
+        Returns:
+            Model name
+        """
+        self._update()
+        model = self.fallback if self.degraded and priority == LLMPriority.BACKGROUND else self.primary
+        self.stats["routed"][model] += 1
+        return model
+
+    def _update(self):
+        if not self.fallback:
+            return
+
+        p90 = self.p90(self.primary)
+        queue_depth = self.queue_depth_fn(self.primary)
+
+        if not self.degraded:
+            if (p90 is not None and p90 > self.latency_slo) or queue_depth >= self.max_queue_depth:
+                self.degraded = True
+                self.stats["switches_to_fallback"] += 1
+                logger.warning(
+                    f"Primary model '{self.primary}' degraded (p90 {p90 or 0:.1f}s, queue {queue_depth}), "
+                    f"routing background requests to '{self.fallback}'"
+                )
+        elif (p90 is None or p90 <= self.latency_slo * self.recovery_ratio) and queue_depth < max(1, self.max_queue_depth // 2):
+            self.degraded = False
+            self.stats["switches_to_primary"] += 1
+            logger.info(f"Primary model '{self.primary}' recovered, routing background requests back to it")
+
+    def get_stats(self) -> dict:
+        """Get router statistics"""
+        return {
+            "primary": self.primary,
+            "fallback": self.fallback,
+            "degraded": self.degraded,
+            "latency_slo": self.latency_slo,
+            "switches_to_fallback": self.stats["switches_to_fallback"],
+            "switches_to_primary": self.stats["switches_to_primary"],
+            "routed": dict(self.stats["routed"]),
+            "models": {
+                model: {
+                    "samples": len(self._window(model)),
+                    "p90_latency": self.p90(model),
+                    "queue_depth": self.queue_depth_fn(model)
+                }
+                for model in [self.primary, self.fallback] if model
+            }
+        }
+
+
+__all__ = ["ModelRouter"]
@@ -0,0 +1,229 @@
+"""
+LLM Request Scheduler
+Per-model concurrency limit and priority queue in front of Ollama, so
+interactive chat is not stuck behind background extraction and a local
+server is never flooded past the point where latency collapses
+"""
+
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, List, Optional
+
+from utils.error_handeller import RateLimitExceededError
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMPriority(IntEnum):
+    """Lower runs first"""
+    INTERACTIVE = 0  # Someone is waiting on the reply, e.g. bot chat
+    BACKGROUND = 1  # Extraction and other work nobody watches token by token
+
+
+class LLMQueueFullError(RateLimitExceededError):
+    """Raised when background LLM work is shed because the queue is too long or too slow"""
+
+    def __init__(self, message: str, retry_after: float, details: Optional[dict] = None):
+        super().__init__(message, "LLM_QUEUE_FULL", details)
+        self.retry_after = retry_after
+
+
+@dataclass
+class _LLMRequest:
+    model: str
+    priority: LLMPriority
+    seq: int
+    enqueued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    ready: Optional[asyncio.Future] = None
+
+
+@dataclass
+class _ModelQueue:
+    queue: List[_LLMRequest] = field(default_factory=list)
+    inflight: int = 0
+    average_service_time: float = 0.0  # Moving average of seconds per generation
+
+
+class LLMTicket:
+    """Slot for one generation; ``async with`` waits for its turn and frees the slot afterwards"""
+
+    def __init__(self, scheduler: "LLMScheduler", request: _LLMRequest):
+        self._scheduler = scheduler
+        self._request = request
+
+    async def __aenter__(self):
+        request = self._request
+        budget = self._scheduler.background_wait_budget
+        try:
+            if request.priority == LLMPriority.BACKGROUND and budget > 0:
+                try:
+                    await asyncio.wait_for(asyncio.shield(request.ready), budget)
+                except asyncio.TimeoutError:
+                    # Promoted or started while the timeout was being handled: keep it
+                    if request.priority == LLMPriority.BACKGROUND and not request.ready.done():
+                        self._scheduler._abandon(request)
+                        raise self._scheduler._shed(request.model, "waited too long")
+            await request.ready
+        except asyncio.CancelledError:
+            self._scheduler._abandon(request)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._scheduler._release(self._request)
+
+
+class LLMScheduler:
+    """
+    Caps concurrent generations per model and serves interactive requests first
+
+    Requests for a model beyond ``max_concurrent`` wait in a queue ordered by
+    priority, then arrival. Background work is deferred behind every
+    interactive request and shed with ``LLMQueueFullError`` when the model
+    already has ``max_queued`` requests waiting, or when it has waited
+    longer than ``background_wait_budget`` seconds. Interactive requests are
+    never shed.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int, background_wait_budget: float):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.background_wait_budget = background_wait_budget
+
+        self._models: Dict[str, _ModelQueue] = {}
+        self._seq = itertools.count()
+
+        self.stats = {
+            "admitted": 0,
+            "shed": 0,
+            "completed": 0,
+            "total_wait_time": {priority.name.lower(): 0.0 for priority in LLMPriority},
+            "max_wait_time": {priority.name.lower(): 0.0 for priority in LLMPriority},
+            "started": {priority.name.lower(): 0 for priority in LLMPriority}
+        }
+
+    def reserve(self, model: str, priority: LLMPriority = LLMPriority.INTERACTIVE) -> LLMTicket:
+        """
+        Queue a generation for a model
+
+        Args:
+            model: Model the request runs on; each model has its own slots
+            priority: INTERACTIVE or BACKGROUND
+
+        Returns:
+            Ticket to ``async with`` around the generation
+
+        Raises:
+            LLMQueueFullError: Background request while the model's queue is full
+        """
+        state = self._models.setdefault(model, _ModelQueue())
+        if priority == LLMPriority.BACKGROUND and len(state.queue) >= self.max_queued:
+            raise self._shed(model, "queue is full")
+
+        request = _LLMRequest(
+            model=model,
+            priority=priority,
+            seq=next(self._seq),
+            ready=asyncio.get_running_loop().create_future()
+        )
+        state.queue.append(request)
+        self.stats["admitted"] += 1
+        self._dispatch(state)
+        return LLMTicket(self, request)
+
+    def promote(self, ticket: LLMTicket, priority: LLMPriority):
+        """Raise a still-queued request's priority, e.g. when an interactive caller joins it"""
+        if priority < ticket._request.priority:
+            ticket._request.priority = priority
+
+    def _shed(self, model: str, reason: str) -> LLMQueueFullError:
+        state = self._models[model]
+        # Time for the backlog ahead to drain through the model's slots
+        backlog = len(state.queue) + state.inflight
+        retry_after = max(1.0, state.average_service_time * backlog / self.max_concurrent)
+        self.stats["shed"] += 1
+        logger.warning(
+            f"Shedding background LLM request for '{model}', {reason} "
+            f"({len(state.queue)} queued, {state.inflight} running)"
+        )
+        return LLMQueueFullError(
+            f"LLM model '{model}' is busy, please retry later",
+            retry_after=retry_after,
+            details={
+                "retry_after_seconds": round(retry_after, 1),
+                "queue_depth": len(state.queue)
+            }
+        )
+
+    def _dispatch(self, state: _ModelQueue):
+        """Start queued requests while the model has free slots"""
+        while state.queue and state.inflight < self.max_concurrent:
+            request = min(state.queue, key=lambda queued: (queued.priority, queued.seq))
+            state.queue.remove(request)
+            state.inflight += 1
+
+            request.started_at = time.time()
+            wait = request.started_at - request.enqueued_at
+            name = request.priority.name.lower()
+            self.stats["started"][name] += 1
+            self.stats["total_wait_time"][name] += wait
+            self.stats["max_wait_time"][name] = max(self.stats["max_wait_time"][name], wait)
+            request.ready.set_result(None)
+
+    def _release(self, request: _LLMRequest):
+        state = self._models[request.model]
+        state.inflight -= 1
+        service_time = time.time() - request.started_at
+        state.average_service_time = (
+            service_time if not state.average_service_time
+            else 0.8 * state.average_service_time + 0.2 * service_time
+        )
+        self.stats["completed"] += 1
+        self._dispatch(state)
+
+    def _abandon(self, request: _LLMRequest):
+        """Drop a request whose caller went away, whether it was still queued or already started"""
+        state = self._models[request.model]
+        if request in state.queue:
+            state.queue.remove(request)
+        elif request.ready.done():
+            state.inflight -= 1
+            self._dispatch(state)
+
+    def queue_depth(self, model: Optional[str] = None) -> int:
+        """Requests waiting for a model, or for all models"""
+        if model is not None:
+            state = self._models.get(model)
+            return len(state.queue) if state else 0
+        return sum(len(state.queue) for state in self._models.values())
+
+    def get_stats(self) -> dict:
+        """Get scheduler statistics"""
+        return {
+            **self.stats,
+            "average_wait_time": {
+                name: self.stats["total_wait_time"][name] / started if started else 0.0
+                for name, started in self.stats["started"].items()
+            },
+            "max_concurrent_per_model": self.max_concurrent,
+            "max_queued_per_model": self.max_queued,
+            "background_wait_budget": self.background_wait_budget,
+            "models": {
+                model: {
+                    "queue_depth": len(state.queue),
+                    "queued_interactive": sum(1 for r in state.queue if r.priority == LLMPriority.INTERACTIVE),
+                    "inflight": state.inflight,
+                    "average_service_time": round(state.average_service_time, 3),
+                    "oldest_wait": round(time.time() - min(r.enqueued_at for r in state.queue), 3) if state.queue else 0.0
+                }
+                for model, state in self._models.items()
+            }
+        }
+
+
+__all__ = ["LLMScheduler", "LLMTicket", "LLMPriority", "LLMQueueFullError"]
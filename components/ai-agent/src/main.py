@@ -4,9 +4,11 @@ Handles audio transcription, information extraction, and data processing
 Called by the Orchestrator to process farmer data
 """
 
+import asyncio
+import os
 import time
 import uuid
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -15,10 +17,14 @@ import uvicorn
 # Import the existing agent components
 from audio_injestion import AudioIngestionAgent
 from info_extraction import EnhancedInfoExtractionAgent
+from llm_gateway import close_llm_gateway
 from eligibility_checker import EligibilityCheckerAgent
 from vector_db import VectorDBAgent
 from config import get_settings
-from models import FarmerInfo, LanguageCode, ProcessingStatus
+from models import ExtractedInfo, FarmerInfo, LanguageCode, ProcessingStatus
+from router_audio import router as audio_router
+from session_state import SessionStateStore
+from utils.error_handeller import FarmerAIException, farmer_ai_exception_handler
 from utils.logger import get_logger
 
 # Initialize settings and logger
@@ -41,9 +47,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Map custom pipeline errors raised by the routers to proper HTTP responses
+app.add_exception_handler(FarmerAIException, farmer_ai_exception_handler)
+
+# Audio upload, transcription and streaming endpoints under /api/v1/audio
+app.include_router(audio_router, prefix="/api/v1")
+
 # Global agent instances
 agents: Dict[str, Any] = {}
 
+# Running extraction state of sessions whose messages are sent as they arrive
+session_states = SessionStateStore(
+    max_sessions=settings.session_state_max_sessions,
+    ttl_seconds=settings.session_state_ttl_seconds
+)
+
 # Request/Response models for orchestrator integration
 class ProcessRequest(BaseModel):
     session_id: str
@@ -85,6 +103,84 @@ async def startup_event():
         logger.error(f"Failed to initialize AI Agent service: {str(e)}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the pooled LLM connections"""
+    await close_llm_gateway()
+
+def _audio_worker_count() -> int:
+    """Number of voice files to transcribe at once for a single session"""
+    if settings.audio_max_parallel_files > 0:
+        return settings.audio_max_parallel_files
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def _language_code(language: str) -> LanguageCode:
+    return LanguageCode(language) if language in [e.value for e in LanguageCode] else LanguageCode.HINDI
+
+async def transcribe_voice_files(voice_file_paths: List[str], language: LanguageCode) -> List[str]:
+    """
+    Transcribe a session's voice files concurrently
+    
+    Returns transcripts in the original message order; files that fail
+    produce an empty string so the rest of the session is still processed.
+    """
+    semaphore = asyncio.Semaphore(_audio_worker_count())
+    
+    async def transcribe_one(voice_file_path: str) -> str:
+        async with semaphore:
+            try:
+                # Use the audio agent to transcribe
+                with open(voice_file_path, "rb") as audio_file:
+                    # Queue behind other clips rather than failing the whole session
+                    audio_result = await agents["audio"].process_audio(
+                        audio_file=audio_file,
+                        language_hint=language,
+                        reject_when_busy=False
+                    )
+                return audio_result.transcribed_text or ""
+            except Exception as e:
+                logger.warning(f"Failed to process voice file {voice_file_path}: {str(e)}")
+                return ""
+    
+    return await asyncio.gather(*(transcribe_one(path) for path in voice_file_paths))
+
+def _build_farmer_data(
+    farmer_id: str,
+    session_id: str,
+    farmer_info: FarmerInfo,
+    extracted_text: str,
+    language: str
+) -> Dict[str, Any]:
+    """Structured farmer data for the EFR database, without empty fields"""
+    farmer_data = {
+        "farmer_id": farmer_id,
+        "session_id": session_id,
+        "name": farmer_info.name,
+        "contact": farmer_info.phone_number,
+        "land_size": farmer_info.land_size_acres,
+        "crops": farmer_info.crops,
+        "location": {
+            "state": farmer_info.state,
+            "district": farmer_info.district,
+            "village": farmer_info.village,
+            "pincode": farmer_info.pincode
+        },
+        "annual_income": farmer_info.annual_income,
+        "irrigation_type": farmer_info.irrigation_type,
+        "land_ownership": farmer_info.land_ownership,
+        "age": farmer_info.age,
+        "family_size": farmer_info.family_size,
+        "extracted_text": extracted_text,
+        "language_detected": language,
+        "processed_at": time.time()
+    }
+    
+    # Remove None values
+    return {k: v for k, v in farmer_data.items() if v is not None}
+
 @app.post("/api/v1/process", response_model=ProcessResponse)
 async def process_farmer_data(request: ProcessRequest):
     """
@@ -97,22 +193,15 @@ async def process_farmer_data(request: ProcessRequest):
         logger.info(f"Processing request for session {request.session_id}")
         
         combined_text = ""
+        language_code = _language_code(request.language)
         
         # Step 1: Process voice files if provided
         if request.voice_file_paths:
             logger.info(f"Processing {len(request.voice_file_paths)} voice files")
-            for voice_file_path in request.voice_file_paths:
-                try:
-                    # Use the audio agent to transcribe
-                    with open(voice_file_path, "rb") as audio_file:
-                        audio_result = await agents["audio"].process_audio(
-                            audio_file=audio_file,
-                            language_hint=request.language
-                        )
-                        if audio_result.transcribed_text:
-                            combined_text += " " + audio_result.transcribed_text
-                except Exception as e:
-                    logger.warning(f"Failed to process voice file {voice_file_path}: {str(e)}")
+            transcripts = await transcribe_voice_files(request.voice_file_paths, language_code)
+            for transcript in transcripts:
+                if transcript:
+                    combined_text += " " + transcript
         
         # Step 2: Add text content if provided
         if request.text_content:
@@ -125,7 +214,6 @@ async def process_farmer_data(request: ProcessRequest):
         
         # Step 3: Extract farmer information using NLP agent
         logger.info("Extracting farmer information...")
-        language_code = LanguageCode(request.language) if request.language in [e.value for e in LanguageCode] else LanguageCode.HINDI
         
         extraction_result = await agents["nlp"].extract_information(
             text=combined_text.strip(),
@@ -133,31 +221,13 @@ async def process_farmer_data(request: ProcessRequest):
         )
         
         # Step 4: Build structured farmer data for EFR database
-        farmer_data = {
-            "farmer_id": request.farmer_id,
-            "session_id": request.session_id,
-            "name": extraction_result.farmer_info.name,
-            "contact": extraction_result.farmer_info.phone_number,
-            "land_size": extraction_result.farmer_info.land_size_acres,
-            "crops": extraction_result.farmer_info.crops,
-            "location": {
-                "state": extraction_result.farmer_info.state,
-                "district": extraction_result.farmer_info.district,
-                "village": extraction_result.farmer_info.village,
-                "pincode": extraction_result.farmer_info.pincode
-            },
-            "annual_income": extraction_result.farmer_info.annual_income,
-            "irrigation_type": extraction_result.farmer_info.irrigation_type,
-            "land_ownership": extraction_result.farmer_info.land_ownership,
-            "age": extraction_result.farmer_info.age,
-            "family_size": extraction_result.farmer_info.family_size,
-            "extracted_text": combined_text,
-            "language_detected": request.language,
-            "processed_at": time.time()
-        }
-        
-        # Remove None values
-        farmer_data = {k: v for k, v in farmer_data.items() if v is not None}
+        farmer_data = _build_farmer_data(
+            request.farmer_id,
+            request.session_id,
+            extraction_result.farmer_info,
+            combined_text,
+            request.language
+        )
         
         processing_time = time.time() - start_time
         
@@ -188,6 +258,159 @@ async def process_farmer_data(request: ProcessRequest):
             error=str(e)
         )
 
+class SessionMessageRequest(BaseModel):
+    farmer_id: str
+    message_id: str
+    message_index: int  # Position in the session, later messages win confidence ties
+    text_content: Optional[str] = None
+    voice_file_path: Optional[str] = None
+    language: str = "hi"
+
+class SessionFinalizeRequest(BaseModel):
+    expected_messages: Optional[int] = None  # Refuse to finalize until this many messages were merged
+
+@app.post("/api/v1/sessions/{session_id}/messages")
+async def add_session_message(session_id: str, request: SessionMessageRequest):
+    """
+    Extract one message as it arrives and merge it into the session's farmer state
+    
+    Sent by the Telegram bot for every message so that ending the session
+    only has to finalize what is already extracted. Resending a message ID
+    is a no-op.
+    """
+    state = session_states.get(session_id)
+    if state and state.has_message(request.message_id):
+        return {"status": "duplicate", **state.get_summary()}
+    
+    start_time = time.time()
+    language_code = _language_code(request.language)
+    
+    text = request.text_content or ""
+    if request.voice_file_path:
+        transcripts = await transcribe_voice_files([request.voice_file_path], language_code)
+        text = transcripts[0]
+    
+    if text.strip():
+        # The LLM runs once at finalize over the whole session, not per message
+        extraction_result = await agents["nlp"].extract_information(
+            text=text.strip(),
+            language=language_code,
+            use_llm=False
+        )
+    else:
+        # Still count the message so finalize knows it was handled
+        extraction_result = ExtractedInfo(raw_text="", farmer_info=FarmerInfo(), extraction_method="empty")
+    
+    state = session_states.merge(
+        session_id,
+        request.farmer_id,
+        request.language,
+        request.message_id,
+        request.message_index,
+        extraction_result
+    )
+    
+    return {
+        "status": "merged",
+        **state.get_summary(),
+        "farmer_info": agents["nlp"].build_farmer_info(state.entities).dict(),
+        "processing_time": time.time() - start_time
+    }
+
+@app.post("/api/v1/sessions/{session_id}/finalize", response_model=ProcessResponse)
+async def finalize_session(session_id: str, request: SessionFinalizeRequest):
+    """
+    Turn a session's merged extraction into farmer data
+    
+    Returns 404 when no messages were extracted incrementally and 409 when
+    fewer than ``expected_messages`` were merged; callers then fall back to
+    /api/v1/process with the full session content.
+    """
+    start_time = time.time()
+    
+    state = session_states.get(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="No incremental extraction for this session")
+    if request.expected_messages is not None and state.message_count < request.expected_messages:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Only {state.message_count} of {request.expected_messages} messages extracted"
+        )
+    session_states.pop(session_id)
+    
+    combined_text = state.combined_text
+    entities = dict(state.entities)
+    confidence_scores = dict(state.confidence_scores)
+    extraction_methods = set(state.extraction_methods)
+    
+    nlp_agent = agents["nlp"]
+    if nlp_agent.ollama_enabled and combined_text:
+        # One gated LLM pass over the whole session for fields no message settled
+        if await nlp_agent.refine_with_llm(
+            combined_text, _language_code(state.language), entities, confidence_scores
+        ):
+            extraction_methods.add("ollama")
+    
+    farmer_info = nlp_agent.build_farmer_info(entities)
+    farmer_data = _build_farmer_data(state.farmer_id, session_id, farmer_info, combined_text, state.language)
+    
+    processing_time = time.time() - start_time
+    logger.info(
+        f"Finalized session {session_id} from {state.message_count} messages in {processing_time:.3f}s"
+    )
+    
+    return ProcessResponse(
+        status="completed",
+        session_id=session_id,
+        farmer_data=farmer_data,
+        processing_time=processing_time,
+        extracted_info={
+            "entities_found": len(entities),
+            "confidence_scores": confidence_scores,
+            "extraction_method": "+".join(sorted(extraction_methods)),
+            "messages_processed": state.message_count
+        }
+    )
+
+class BatchExtractionRequest(BaseModel):
+    texts: List[str]
+    languages: Optional[List[str]] = None  # One per text, defaults to `language` for all
+    language: str = "hi"
+    use_llm: bool = False
+
+@app.post("/api/v1/extract/batch")
+async def extract_batch(request: BatchExtractionRequest):
+    """
+    Extract farmer information from many texts at once
+    
+    Used to backfill extraction for historical session transcripts; spaCy
+    work is batched per language with nlp.pipe.
+    """
+    if request.languages is not None and len(request.languages) != len(request.texts):
+        raise HTTPException(status_code=400, detail="languages must have one entry per text")
+    
+    languages = [_language_code(language) for language in (request.languages or [request.language] * len(request.texts))]
+    
+    start_time = time.time()
+    results = await agents["nlp"].extract_information_batch(
+        request.texts,
+        languages,
+        use_llm=request.use_llm
+    )
+    
+    return {
+        "status": "completed",
+        "results": [result.dict() for result in results],
+        "processing_time": time.time() - start_time
+    }
+
+@app.get("/api/v1/extract/stats")
+async def extraction_statistics():
+    """Extraction agent statistics, including LLM gating and result cache hit rates"""
+    if "nlp" not in agents:
+        raise HTTPException(status_code=503, detail="Extraction service unavailable")
+    return {**agents["nlp"].get_extraction_statistics(), "sessions": session_states.get_stats()}
+
 @app.post("/api/v1/check_eligibility")
 async def check_eligibility(farmer_data: Dict[str, Any]):
     """
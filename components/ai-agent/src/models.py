@@ -53,6 +53,7 @@ class AudioProcessingResponse(BaseModel):
     detected_language: Optional[LanguageCode] = None
     confidence_score: Optional[float] = None
     processing_time: Optional[float] = None
+    segments: List[Dict[str, Any]] = Field(default_factory=list)  # start/end seconds and text
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -91,6 +92,25 @@ class FarmerInfo(BaseModel):
         if v and not v.startswith('+91'):
             v = '+91' + v.lstrip('0')
         return v
+    
+    @classmethod
+    def extraction_schema(cls, fields: List[str]) -> Dict[str, Any]:
+        """
+        JSON schema of some fields, for constraining LLM extraction output
+        
+        Every field is required so the model always emits it, using null
+        when the text doesn't mention it.
+        """
+        properties = cls.model_json_schema()["properties"]
+        fields = [field for field in fields if field in properties]
+        return {
+            "type": "object",
+            "properties": {
+                field: {key: value for key, value in properties[field].items() if key not in ("title", "default")}
+                for field in fields
+            },
+            "required": fields
+        }
 
 
 class ExtractedInfo(BaseModel):
@@ -3,20 +3,22 @@ Audio processing router for the Farmer AI Pipeline
 Handles audio upload, transcription, and related endpoints
 """
 
+import json
+import math
 import time
 from typing import Optional
 from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from audio_scheduler import AudioQueueFullError
 from models import (
     AudioUploadRequest,
     AudioProcessingResponse,
     LanguageCode,
     ProcessingStatus
 )
-from errorhandler import (
+from utils.error_handeller import (
     raise_audio_processing_error,
-    raise_transcription_error,
     AudioProcessingError,
     TranscriptionError
 )
@@ -31,10 +33,42 @@ router = APIRouter(
     responses={
         400: {"description": "Audio processing error"},
         413: {"description": "Audio file too large"},
-        415: {"description": "Unsupported audio format"}
+        415: {"description": "Unsupported audio format"},
+        429: {"description": "Audio queue is full, retry after the Retry-After header"}
     }
 )
 
+ALLOWED_CONTENT_TYPES = [
+    "audio/wav", "audio/mpeg", "audio/mp4", "audio/ogg", 
+    "audio/flac", "audio/x-flac", "audio/webm"
+]
+MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+
+def _validate_upload(audio_file: UploadFile):
+    """Reject unsupported formats and files over the size limit before reading them"""
+    if audio_file.content_type not in ALLOWED_CONTENT_TYPES:
+        raise_audio_processing_error(
+            f"Unsupported audio format: {audio_file.content_type}",
+            {"supported_formats": ALLOWED_CONTENT_TYPES}
+        )
+    
+    if audio_file.size and audio_file.size > MAX_FILE_SIZE:
+        _too_large(audio_file.size)
+
+def _too_large(size: int):
+    raise_audio_processing_error(
+        f"Audio file too large: {size / (1024*1024):.1f}MB (max: {MAX_FILE_SIZE // (1024*1024)}MB)",
+        {"file_size_mb": size / (1024*1024), "max_size_mb": MAX_FILE_SIZE // (1024*1024)}
+    )
+
+def _queue_full(error: AudioQueueFullError) -> HTTPException:
+    """429 response carrying the scheduler's retry estimate"""
+    return HTTPException(
+        status_code=429,
+        detail={"message": error.message, **error.details},
+        headers={"Retry-After": str(math.ceil(error.retry_after))}
+    )
+
 # Dependency to get audio agent
 async def get_audio_agent():
     """Dependency to get the audio processing agent"""
@@ -61,25 +95,8 @@ async def upload_audio(
     logger.info(f"Received audio upload: {audio_file.filename}")
     
     try:
-        # Validate file type
-        allowed_content_types = [
-            "audio/wav", "audio/mpeg", "audio/mp4", "audio/ogg", 
-            "audio/flac", "audio/x-flac", "audio/webm"
-        ]
-        
-        if audio_file.content_type not in allowed_content_types:
-            raise_audio_processing_error(
-                f"Unsupported audio format: {audio_file.content_type}",
-                {"supported_formats": allowed_content_types}
-            )
-        
-        # Check file size (50MB limit)
-        MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
-        if audio_file.size and audio_file.size > MAX_FILE_SIZE:
-            raise_audio_processing_error(
-                f"Audio file too large: {audio_file.size / (1024*1024):.1f}MB (max: 50MB)",
-                {"file_size_mb": audio_file.size / (1024*1024), "max_size_mb": 50}
-            )
+        # Validate file type and size
+        _validate_upload(audio_file)
         
         # Process audio
         result = await audio_agent.process_audio(
@@ -94,6 +111,8 @@ async def upload_audio(
         
         return result
         
+    except AudioQueueFullError as e:
+        raise _queue_full(e)
     except AudioProcessingError:
         raise
     except TranscriptionError:
@@ -119,6 +138,54 @@ async def transcribe_audio(
     """
     return await upload_audio(background_tasks, audio_file, language_hint, audio_agent)
 
+@router.post("/transcribe/stream")
+async def transcribe_audio_stream(
+    audio_file: UploadFile = File(...),
+    language_hint: Optional[LanguageCode] = LanguageCode.HINDI,
+    audio_agent = Depends(get_audio_agent)
+):
+    """
+    Transcribe an audio file and stream partial transcripts as server-sent events
+    
+    Emits a `segment` event as each speech window is transcribed and a final
+    `done` event with the full transcript, so long recordings produce usable
+    text well before the whole clip is finished.
+    """
+    logger.info(f"Received audio for streaming transcription: {audio_file.filename}")
+    
+    _validate_upload(audio_file)
+    
+    # The size may not be declared; never read more than the limit
+    audio_bytes = await audio_file.read(MAX_FILE_SIZE + 1)
+    if len(audio_bytes) > MAX_FILE_SIZE:
+        _too_large(len(audio_bytes))
+    
+    events = audio_agent.transcribe_stream(audio_bytes, language_hint)
+    
+    # Admission happens before the first event, so a full queue is still a plain 429
+    try:
+        first_event = await events.__anext__()
+    except AudioQueueFullError as e:
+        raise _queue_full(e)
+    except ValueError as e:
+        raise_audio_processing_error(str(e))
+    
+    async def event_stream():
+        try:
+            yield f"event: {first_event['event']}\ndata: {json.dumps(first_event, ensure_ascii=False)}\n\n"
+            async for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            logger.error(f"Streaming transcription failed: {str(e)}")
+            error = {"event": "error", "error": str(e)}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/formats")
 async def get_supported_formats(audio_agent = Depends(get_audio_agent)):
     """
@@ -128,7 +195,7 @@ async def get_supported_formats(audio_agent = Depends(get_audio_agent)):
         formats = await audio_agent.get_supported_formats()
         return {
             "supported_formats": formats,
-            "max_file_size_mb": 50,
+            "max_file_size_mb": MAX_FILE_SIZE // (1024*1024),
             "max_duration_seconds": 300
         }
     except Exception as e:
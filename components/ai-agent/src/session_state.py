@@ -0,0 +1,153 @@
+"""
+Incremental Session State
+Keeps a running extraction per session so each message is processed as it
+arrives and session end only has to assemble what is already known
+"""
+
+import time
+from typing import Any, Dict, Optional, Set
+
+from models import ExtractedInfo
+from utils.cache import TTLCache
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Entities holding several values; messages add to them instead of replacing them
+LIST_FIELDS = ['crops', 'locations']
+
+
+class SessionExtractionState:
+    """
+    Entities merged from every message of one session
+
+    Scalar fields keep the value with the highest confidence; on a tie the
+    later message wins, so a farmer correcting themselves is believed. List
+    fields are the union of every message's values in first-seen order.
+    """
+
+    def __init__(self, session_id: str, farmer_id: str, language: str):
+        self.session_id = session_id
+        self.farmer_id = farmer_id
+        self.language = language
+        self.entities: Dict[str, Any] = {}
+        self.confidence_scores: Dict[str, float] = {}
+        self.texts: Dict[int, str] = {}  # message index -> text
+        self.extraction_methods: Set[str] = set()
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+        self._field_sources: Dict[str, int] = {}  # field -> message index of its current value
+        self._message_ids: Set[str] = set()
+
+    @property
+    def message_count(self) -> int:
+        return len(self._message_ids)
+
+    def has_message(self, message_id: str) -> bool:
+        return message_id in self._message_ids
+
+    def merge(self, message_id: str, message_index: int, extracted: ExtractedInfo):
+        """
+        Fold one message's extraction into the session
+
+        Args:
+            message_id: Unique message ID; a message seen before is ignored
+            message_index: Position of the message in the session
+            extracted: Extraction result for the message text
+        """
+        if self.has_message(message_id):
+            return
+
+        self._message_ids.add(message_id)
+        self.texts[message_index] = extracted.raw_text
+        self.extraction_methods.add(extracted.extraction_method)
+        self.updated_at = time.time()
+
+        for field, value in extracted.entities.items():
+            if value is None or value == [] or value == "":
+                continue
+
+            confidence = extracted.confidence_scores.get(field, 0.0)
+            if field in LIST_FIELDS:
+                current = self.entities.setdefault(field, [])
+                current.extend(item for item in value if item not in current)
+                self.confidence_scores[field] = max(confidence, self.confidence_scores.get(field, 0.0))
+                continue
+
+            current_confidence = self.confidence_scores.get(field)
+            if (
+                current_confidence is None
+                or confidence > current_confidence
+                or (confidence == current_confidence and message_index >= self._field_sources[field])
+            ):
+                self.entities[field] = value
+                self.confidence_scores[field] = confidence
+                self._field_sources[field] = message_index
+
+    @property
+    def combined_text(self) -> str:
+        """Every message text in session order"""
+        return " ".join(self.texts[index] for index in sorted(self.texts) if self.texts[index])
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Entities and per-field confidence merged so far"""
+        return {
+            "session_id": self.session_id,
+            "messages_processed": self.message_count,
+            "entities": self.entities,
+            "confidence_scores": self.confidence_scores,
+            "extraction_methods": sorted(self.extraction_methods)
+        }
+
+
+class SessionStateStore:
+    """Running session states, dropped when finalized or after ``ttl_seconds``"""
+
+    def __init__(self, max_sessions: int = 1024, ttl_seconds: float = 86400.0):
+        self._states = TTLCache(max_sessions, ttl_seconds)
+        self.stats = {"messages_merged": 0, "duplicates_ignored": 0, "finalized": 0}
+
+    def get(self, session_id: str) -> Optional[SessionExtractionState]:
+        return self._states.get(session_id)
+
+    def get_or_create(self, session_id: str, farmer_id: str, language: str) -> SessionExtractionState:
+        state = self._states.get(session_id)
+        if state is None:
+            state = SessionExtractionState(session_id, farmer_id, language)
+            logger.info(f"Started incremental extraction for session {session_id}")
+        # Re-set on every access so active sessions don't expire
+        self._states.set(session_id, state)
+        return state
+
+    def merge(
+        self,
+        session_id: str,
+        farmer_id: str,
+        language: str,
+        message_id: str,
+        message_index: int,
+        extracted: ExtractedInfo
+    ) -> SessionExtractionState:
+        """Merge one message's extraction into its session, creating the session if needed"""
+        state = self.get_or_create(session_id, farmer_id, language)
+        if state.has_message(message_id):
+            self.stats["duplicates_ignored"] += 1
+        else:
+            state.merge(message_id, message_index, extracted)
+            self.stats["messages_merged"] += 1
+        return state
+
+    def pop(self, session_id: str) -> Optional[SessionExtractionState]:
+        """Remove and return a session's state"""
+        state = self._states.pop(session_id)
+        if state is not None:
+            self.stats["finalized"] += 1
+        return state
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        return {**self.stats, "active_sessions": len(self._states)}
+
+
+__all__ = ["SessionExtractionState", "SessionStateStore", "LIST_FIELDS"]
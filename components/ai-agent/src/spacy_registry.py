@@ -0,0 +1,182 @@
+"""
+spaCy Pipeline Registry
+Builds spaCy pipelines on first use per language, shares one instance between
+languages that fall back to English, and evicts pipelines that sit idle
+"""
+
+import asyncio
+import os
+import resource
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import spacy
+from spacy.matcher import Matcher
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Languages spaCy can tokenize with a blank pipeline
+BLANK_LANGUAGES = ['hi', 'gu', 'bn', 'te', 'ta', 'ml', 'kn', 'or']
+
+# Languages without spaCy support; they share the blank English pipeline
+FALLBACK_LANGUAGES = ['pa', 'ur', 'ne', 'as', 'mr', 'sa']
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is KB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+class _Pipeline:
+    """A loaded pipeline, its matcher and usage bookkeeping"""
+
+    def __init__(self, nlp, matcher: Matcher, load_time: float):
+        self.nlp = nlp
+        self.matcher = matcher
+        self.load_time = load_time
+        self.last_used = time.time()
+        self.uses = 0
+
+
+class SpacyPipelineRegistry:
+    """
+    Lazily constructed, shared spaCy pipelines
+
+    Each language resolves to a pipeline key: ``blank:<lang>`` for blank
+    pipelines, ``blank:en`` shared by every language spaCy doesn't support,
+    and ``en`` (the trained English model) for English and unknown codes.
+    Pipelines are built on first request, once per key, and dropped after
+    ``idle_seconds`` without use unless pinned.
+    """
+
+    def __init__(
+        self,
+        english_model: str = "en_core_web_sm",
+        matcher_builder: Optional[Callable[[Matcher], None]] = None,
+        idle_seconds: float = 1800.0,
+        pinned_languages: Optional[List[str]] = None
+    ):
+        self.english_model = english_model
+        self.matcher_builder = matcher_builder
+        self.idle_seconds = idle_seconds
+        self.pinned_keys = {self.resolve(lang) for lang in (pinned_languages or [])}
+
+        self._pipelines: Dict[str, _Pipeline] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"loads": 0, "evictions": 0, "hits": 0}
+
+    @property
+    def supported_languages(self) -> List[str]:
+        return ['en'] + BLANK_LANGUAGES + FALLBACK_LANGUAGES
+
+    @staticmethod
+    def resolve(language: str) -> str:
+        """Pipeline key serving a language"""
+        if language in BLANK_LANGUAGES:
+            return f"blank:{language}"
+        if language in FALLBACK_LANGUAGES:
+            return "blank:en"
+        return 'en'  # English and anything unknown
+
+    async def get(self, language: str) -> Tuple[object, Matcher]:
+        """
+        Get the pipeline and matcher for a language, building them on first use
+
+        Args:
+            language: ISO language code
+
+        Returns:
+            Tuple of (spaCy Language, Matcher)
+        """
+        key = self.resolve(language)
+        self.evict_idle()
+
+        pipeline = self._pipelines.get(key)
+        if pipeline is None:
+            lock = self._locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                pipeline = self._pipelines.get(key)
+                if pipeline is None:
+                    pipeline = await self._load(key)
+                    self._pipelines[key] = pipeline
+        else:
+            self.stats["hits"] += 1
+
+        pipeline.last_used = time.time()
+        pipeline.uses += 1
+        return pipeline.nlp, pipeline.matcher
+
+    async def _load(self, key: str) -> _Pipeline:
+        """Build a pipeline off the event loop"""
+        loop = asyncio.get_event_loop()
+        start_time = time.time()
+        rss_before = current_rss_mb()
+
+        nlp = await loop.run_in_executor(None, self._build_nlp, key)
+        matcher = Matcher(nlp.vocab)
+        if self.matcher_builder:
+            self.matcher_builder(matcher)
+
+        load_time = time.time() - start_time
+        self.stats["loads"] += 1
+        logger.info(
+            f"Loaded spaCy pipeline '{key}' in {load_time:.2f}s "
+            f"(RSS {rss_before:.0f} -> {current_rss_mb():.0f} MB)"
+        )
+        return _Pipeline(nlp, matcher, load_time)
+
+    def _build_nlp(self, key: str):
+        if key == 'en':
+            try:
+                return spacy.load(self.english_model)
+            except OSError:
+                logger.warning("English spaCy model not found, using blank model")
+                return spacy.blank("en")
+
+        lang = key.split(":", 1)[1]
+        try:
+            return spacy.blank(lang)
+        except Exception as e:
+            logger.warning(f"Failed to load blank model for {lang}, using English fallback: {e}")
+            return spacy.blank("en")
+
+    def evict_idle(self):
+        """Drop pipelines that haven't been used for ``idle_seconds``"""
+        if self.idle_seconds <= 0:
+            return
+
+        now = time.time()
+        for key, pipeline in list(self._pipelines.items()):
+            if key not in self.pinned_keys and now - pipeline.last_used > self.idle_seconds:
+                del self._pipelines[key]
+                self.stats["evictions"] += 1
+                logger.info(f"Evicted idle spaCy pipeline '{key}' after {now - pipeline.last_used:.0f}s")
+
+    def clear(self):
+        """Drop every loaded pipeline"""
+        self._pipelines.clear()
+
+    def get_stats(self) -> dict:
+        """Get registry statistics"""
+        return {
+            **self.stats,
+            "loaded_pipelines": {
+                key: {"uses": pipeline.uses, "load_time": round(pipeline.load_time, 3)}
+                for key, pipeline in self._pipelines.items()
+            },
+            "pinned": sorted(self.pinned_keys),
+            "idle_seconds": self.idle_seconds,
+            "rss_mb": round(current_rss_mb(), 1)
+        }
+
+
+__all__ = ["SpacyPipelineRegistry", "current_rss_mb", "BLANK_LANGUAGES", "FALLBACK_LANGUAGES"]
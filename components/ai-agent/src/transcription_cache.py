@@ -0,0 +1,140 @@
+"""
+Transcription Cache
+Content-addressed, disk-backed cache of audio transcription results with LRU eviction
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from models import AudioProcessingResponse
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TranscriptionCache:
+    """
+    Persistent cache of AudioProcessingResponse objects
+
+    Entries are keyed by a hash of the audio bytes, the Whisper model and the
+    language hint, stored as one JSON file each, and evicted least-recently-used
+    first once the directory grows past its size cap.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: int = 256):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # key -> file size, oldest first
+        self._total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(audio_bytes: bytes, model_name: str, language_hint: Optional[str] = None) -> str:
+        """Build a cache key from the audio content and decoding parameters"""
+        digest = hashlib.sha256()
+        digest.update(audio_bytes)
+        digest.update(b"\0")
+        digest.update(model_name.encode())
+        digest.update(b"\0")
+        digest.update((language_hint or "auto").encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_index(self):
+        """Rebuild the LRU index from files on disk, oldest access first"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+        logger.info(
+            f"Transcription cache loaded: {len(self._index)} entries, "
+            f"{self._total_bytes / (1024 * 1024):.1f} MB"
+        )
+
+    def get(self, key: str) -> Optional[AudioProcessingResponse]:
+        """Return the cached response for a key, or None on a miss"""
+        if key not in self._index:
+            self.stats["misses"] += 1
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                response = AudioProcessingResponse.model_validate_json(f.read())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable transcription cache entry {key}: {str(e)}")
+            self._remove(key)
+            self.stats["misses"] += 1
+            return None
+
+        # Record the access on disk too so recency survives restarts
+        self._index.move_to_end(key)
+        os.utime(path)
+        self.stats["hits"] += 1
+        return response
+
+    def put(self, key: str, response: AudioProcessingResponse):
+        """Store a response and evict old entries if over the size cap"""
+        path = self._path(key)
+        data = response.model_dump_json()
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write transcription cache entry: {str(e)}")
+            return
+
+        if key in self._index:
+            self._total_bytes -= self._index.pop(key)
+        size = os.path.getsize(path)
+        self._index[key] = size
+        self._total_bytes += size
+
+        self._evict()
+
+    def _remove(self, key: str):
+        size = self._index.pop(key, 0)
+        self._total_bytes -= size
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_size_bytes and self._index:
+            oldest = next(iter(self._index))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._index),
+            "size_mb": round(self._total_bytes / (1024 * 1024), 2),
+            "max_size_mb": self.max_size_bytes / (1024 * 1024),
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+        }
+
+
+__all__ = ["TranscriptionCache"]
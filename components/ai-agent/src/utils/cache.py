@@ -0,0 +1,278 @@
+"""
+Result cache for Farmer AI Pipeline
+
+In-process LRU + TTL cache with an optional second tier: Redis, so replicas
+of the AI agent can reuse each other's results, or a local SQLite file, so
+results survive restarts
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TTLCache:
+    """Least-recently-used cache whose entries also expire after ``ttl_seconds``"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.time() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> Optional[Any]:
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Shared cache tier in Redis; values are strings with a server-side TTL"""
+
+    def __init__(self, redis_url: str):
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis is not installed; pip install redis")
+        self.redis_url = redis_url
+        self._client = aioredis.from_url(redis_url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl_seconds: float):
+        await self._client.set(key, value, ex=max(1, int(ttl_seconds)))
+
+    async def close(self):
+        await self._client.close()
+
+    def describe(self) -> str:
+        return "redis"
+
+
+class SQLiteBackend:
+    """
+    Persistent cache tier in a local SQLite file
+
+    Expired rows are dropped on read and at startup; past ``max_entries``
+    the least recently read rows are deleted. Queries run in a worker
+    thread so disk I/O never blocks the event loop.
+    """
+
+    def __init__(self, path: str, max_entries: int = 50000):
+        self.path = path
+        self.max_entries = max_entries
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+            self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def _set(self, key: str, value: str, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl_seconds, now)
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str, ttl_seconds: float):
+        await asyncio.to_thread(self._set, key, value, ttl_seconds)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def describe(self) -> str:
+        return "sqlite"
+
+
+class ResultCache:
+    """
+    Two-tier string cache: in-process LRU + TTL in front of an optional backend
+
+    Backend failures are logged and counted but never raised; the cache
+    then behaves as a purely local one.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        backend: Optional[Any] = None
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.local = TTLCache(max_entries, ttl_seconds)
+        self.backend = backend
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "sets": 0, "backend_errors": 0}
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Hash the parts that determine a result into a fixed-length key"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _backend_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look a key up locally, then in the shared backend"""
+        value = self.local.get(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+
+        if self.backend:
+            try:
+                value = await self.backend.get(self._backend_key(key))
+            except Exception as e:
+                self.stats["backend_errors"] += 1
+                logger.warning(f"{self.namespace} cache backend read failed: {str(e)}")
+                value = None
+
+            if value is not None:
+                self.local.set(key, value)
+                self.stats["shared_hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        """Store a value in both tiers"""
+        self.local.set(key, value)
+        self.stats["sets"] += 1
+
+        if self.backend:
+            try:
+                await self.backend.set(self._backend_key(key), value, self.ttl_seconds)
+            except Exception as e:
+                self.stats["backend_errors"] += 1
+                logger.warning(f"{self.namespace} cache backend write failed: {str(e)}")
+
+    async def close(self):
+        """Release the shared backend connection"""
+        if self.backend:
+            await self.backend.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        hits = self.stats["local_hits"] + self.stats["shared_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "backend": self.backend.describe() if self.backend else None,
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+
+def create_shared_backend(redis_url: str) -> Optional[RedisBackend]:
+    """Build the shared backend for a URL, or None if unset or unavailable"""
+    if not redis_url:
+        return None
+    if not REDIS_AVAILABLE:
+        logger.warning("redis_url is set but the redis package is not installed, using a local cache only")
+        return None
+    return RedisBackend(redis_url)
+
+
+def create_disk_backend(path: str, max_entries: int = 50000) -> Optional[SQLiteBackend]:
+    """Build the persistent backend for a path, or None if unset or unusable"""
+    if not path:
+        return None
+    try:
+        return SQLiteBackend(path, max_entries)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Cannot open cache database {path}, using a local cache only: {str(e)}")
+        return None
+
+
+__all__ = [
+    'TTLCache',
+    'RedisBackend',
+    'SQLiteBackend',
+    'ResultCache',
+    'create_shared_backend',
+    'create_disk_backend',
+    'REDIS_AVAILABLE'
+]
@@ -0,0 +1,148 @@
+"""
+Incremental JSON parsing for Farmer AI Pipeline
+
+Reads a JSON object out of streamed LLM output, reporting each top-level
+field as soon as its value is complete and noticing the moment the object
+closes, so generation can be cancelled instead of paying for the rambling
+small models tend to add after the JSON
+"""
+
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IncrementalJSONParser:
+    """
+    Streaming parser for the first top-level JSON object in a text
+
+    Text before the opening brace (e.g. "Here is the JSON:" or a code fence)
+    is skipped. Each character is scanned once; a field is decoded with
+    ``json.loads`` only when the comma or brace ending its value arrives.
+    Nested objects and arrays are returned whole as part of their field.
+    """
+
+    def __init__(self):
+        self.result: Dict[str, Any] = {}
+        self.done = False
+        self.text = ""
+
+        self._pos = 0  # Next character of ``text`` to scan
+        self._start: Optional[int] = None  # Index of the opening brace
+        self._field_start = 0  # Start of the current "key": value member
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def started(self) -> bool:
+        return self._start is not None
+
+    @property
+    def raw_object(self) -> Optional[str]:
+        """The JSON object text once it has closed"""
+        return self.text[self._start:self._pos] if self.done else None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next piece of text
+
+        Args:
+            chunk: Streamed text, split anywhere
+
+        Returns:
+            Fields whose values completed within this chunk, in order
+        """
+        if self.done:
+            return []
+
+        self.text += chunk
+        fields = []
+        text = self.text
+
+        while self._pos < len(text):
+            char = text[self._pos]
+            self._pos += 1
+
+            if self._start is None:
+                if char == '{':
+                    self._start = self._pos - 1
+                    self._field_start = self._pos
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    fields.extend(self._close_member(text[self._field_start:self._pos - 1]))
+                    self.done = True
+                    break
+            elif char == ',' and self._depth == 1:
+                fields.extend(self._close_member(text[self._field_start:self._pos - 1]))
+                self._field_start = self._pos
+
+        return fields
+
+    def _close_member(self, member: str) -> List[Tuple[str, Any]]:
+        """Decode one ``"key": value`` member of the top-level object"""
+        if not member.strip():
+            return []
+
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError as e:
+            logger.debug(f"Skipping malformed JSON member {member.strip()[:40]!r}: {str(e)}")
+            return []
+
+        self.result.update(parsed)
+        return list(parsed.items())
+
+
+async def iter_json_fields(
+    chunks: AsyncIterable[str],
+    parser: Optional[IncrementalJSONParser] = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Yield top-level fields of the JSON object in a text stream as they complete
+
+    Stops reading ``chunks`` as soon as the object closes and closes the
+    source iterator, which for an HTTP stream cancels the generation.
+
+    Args:
+        chunks: Streamed text
+        parser: Parser to use, pass one in to inspect ``done``/``text`` afterwards
+
+    Yields:
+        (field, value) tuples
+    """
+    parser = parser or IncrementalJSONParser()
+    iterator = chunks.__aiter__()
+    try:
+        async for chunk in iterator:
+            for field in parser.feed(chunk):
+                yield field
+            if parser.done:
+                break
+    finally:
+        close = getattr(iterator, "aclose", None)
+        if close:
+            await close()
+
+
+__all__ = ['IncrementalJSONParser', 'iter_json_fields']
@@ -4,6 +4,7 @@ Logger utility for Farmer AI Pipeline
 Provides structured logging with proper formatting and levels
 """
 
+import functools
 import logging
 import sys
 import os
@@ -117,8 +118,9 @@ def log_execution_time(func):
     
     return wrapper
 
-async def log_async_execution_time(func):
+def log_async_execution_time(func):
     """Decorator to log async function execution time"""
+    @functools.wraps(func)
     async def wrapper(*args, **kwargs):
         logger = get_logger(func.__module__)
         start_time = datetime.now()
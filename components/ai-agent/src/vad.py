@@ -0,0 +1,163 @@
+"""
+Voice Activity Detection
+Energy-based speech detection used to drop silence and split long recordings
+into Whisper-sized chunks before transcription
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+# Frames quieter than this are never speech, whatever the rest of the clip does
+SILENCE_DB = -50.0
+
+
+@dataclass
+class SpeechChunk:
+    """A span of speech in the original recording, in samples"""
+    start: int
+    end: int
+    sample_rate: int = 16000
+
+    @property
+    def start_time(self) -> float:
+        return self.start / self.sample_rate
+
+    @property
+    def end_time(self) -> float:
+        return self.end / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        return (self.end - self.start) / self.sample_rate
+
+
+def _frame_energy_db(audio: np.ndarray, frame_len: int) -> np.ndarray:
+    """Per-frame RMS energy in dB"""
+    n_frames = len(audio) // frame_len
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    power = np.mean(frames.astype(np.float64) ** 2, axis=1)
+    return 10 * np.log10(power + 1e-10)
+
+
+def _runs(mask: np.ndarray) -> List[List[int]]:
+    """[start, end) index pairs of consecutive True values"""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return [[int(s), int(e)] for s, e in zip(edges[::2], edges[1::2])]
+
+
+def detect_speech_chunks(
+    audio: np.ndarray,
+    sample_rate: int = 16000,
+    frame_ms: int = 30,
+    threshold_db: float = 12.0,
+    peak_range_db: float = 6.0,
+    min_speech_ms: int = 250,
+    min_silence_ms: int = 300,
+    padding_ms: int = 200,
+    max_merge_gap_ms: int = 1500,
+    max_chunk_s: float = 30.0
+) -> List[SpeechChunk]:
+    """
+    Find speech regions and group them into chunks of at most ``max_chunk_s``
+
+    Frames louder than the estimated noise floor plus ``threshold_db`` count as
+    speech. The floor is the 10th-percentile frame energy, which is the speech
+    itself in recordings without pauses or in steady background noise, so
+    frames within ``peak_range_db`` of the loudest always count. Short pauses
+    are bridged, short blips dropped, and neighbouring regions merged while
+    the chunk stays within the Whisper window. Regions that are still too long
+    are split at their quietest frame.
+
+    Args:
+        audio: Mono float32 audio
+        sample_rate: Sample rate of ``audio``
+        frame_ms: Analysis frame length
+        threshold_db: How far above the noise floor a frame must be to count as speech
+        peak_range_db: Frames this close to the loudest one count as speech regardless
+        min_speech_ms: Speech runs shorter than this are discarded
+        min_silence_ms: Pauses shorter than this are treated as speech
+        padding_ms: Context kept on each side of a speech region
+        max_merge_gap_ms: Largest pause that may be kept inside one chunk
+        max_chunk_s: Maximum chunk length
+
+    Returns:
+        Speech chunks in chronological order, empty if no speech was found
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    if len(audio) < frame_len:
+        return []
+
+    energy = _frame_energy_db(audio, frame_len)
+    noise_floor = np.percentile(energy, 10)
+    threshold = min(noise_floor + threshold_db, np.max(energy) - peak_range_db)
+    # Never call near-digital-silence speech, even in an all-quiet clip
+    threshold = max(threshold, SILENCE_DB)
+    speech = energy > threshold
+
+    to_frames = lambda ms: max(1, int(round(ms / frame_ms)))
+
+    # Bridge short pauses, then drop short blips
+    for start, end in _runs(~speech):
+        if start > 0 and end < len(speech) and end - start < to_frames(min_silence_ms):
+            speech[start:end] = True
+    for start, end in _runs(speech):
+        if end - start < to_frames(min_speech_ms):
+            speech[start:end] = False
+
+    regions = _runs(speech)
+    if not regions:
+        return []
+
+    # Pad regions with a little context and merge the ones that now overlap
+    pad = to_frames(padding_ms)
+    padded: List[List[int]] = []
+    for start, end in regions:
+        start, end = max(0, start - pad), min(len(speech), end + pad)
+        if padded and start <= padded[-1][1]:
+            padded[-1][1] = max(padded[-1][1], end)
+        else:
+            padded.append([start, end])
+
+    # Split anything longer than the Whisper window at its quietest frame
+    max_frames = int(max_chunk_s * 1000 / frame_ms)
+    split: List[List[int]] = []
+    for start, end in padded:
+        while end - start > max_frames:
+            # Search the second half of the window so chunks don't get tiny
+            search_from = start + max_frames // 2
+            cut = search_from + int(np.argmin(energy[search_from:start + max_frames]))
+            split.append([start, cut])
+            start = cut
+        split.append([start, end])
+
+    # Group neighbouring regions into as few chunks as fit in the window
+    max_gap = to_frames(max_merge_gap_ms)
+    chunks: List[List[int]] = []
+    for start, end in split:
+        if chunks and start - chunks[-1][1] <= max_gap and end - chunks[-1][0] <= max_frames:
+            chunks[-1][1] = end
+        else:
+            chunks.append([start, end])
+
+    return [
+        SpeechChunk(
+            start=start * frame_len,
+            end=len(audio) if end >= len(energy) else end * frame_len,
+            sample_rate=sample_rate
+        )
+        for start, end in chunks
+    ]
+
+
+def is_silent(audio: np.ndarray, sample_rate: int = 16000, frame_ms: int = 30) -> bool:
+    """True when no frame of ``audio`` rises above SILENCE_DB"""
+    frame_len = int(sample_rate * frame_ms / 1000)
+    if len(audio) < frame_len:
+        return True
+    return bool(np.max(_frame_energy_db(audio, frame_len)) <= SILENCE_DB)
+
+
+__all__ = ["SpeechChunk", "detect_speech_chunks", "is_silent", "SILENCE_DB"]
@@ -0,0 +1,231 @@
+"""
+Whisper Batch Scheduler
+Collects short audio clips from concurrent requests and runs the Whisper
+encoder/decoder over them as one batch, then fans results back to callers
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+import torch
+import whisper
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Quality thresholds used by whisper.transcribe to decide on a temperature fallback
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+@dataclass
+class _BatchItem:
+    """A single clip waiting to be decoded"""
+    audio: np.ndarray
+    language: Optional[str]
+    future: asyncio.Future
+
+
+def decode_batch(model, audios: List[np.ndarray], language: Optional[str] = None) -> List[dict]:
+    """
+    Decode a batch of clips (each at most 30s) with a single forward pass
+
+    Args:
+        model: Loaded Whisper model
+        audios: 16 kHz float32 clips
+        language: Language to pin decoding to, or None to let Whisper detect
+
+    Returns:
+        One transcription dict per clip, shaped like ``whisper.transcribe`` output
+    """
+    mel_batch = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+        for audio in audios
+    ]).to(model.device)
+
+    options = whisper.DecodingOptions(
+        language=language,
+        task="transcribe",
+        without_timestamps=True,
+        fp16=False,  # Use fp32 for better compatibility
+    )
+    decoded = whisper.decode(model, mel_batch, options)
+
+    results = []
+    for audio, result in zip(audios, decoded):
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD and not result.avg_logprob > LOGPROB_THRESHOLD:
+            # Silence, which transcribe() drops rather than keeping hallucinated text
+            results.append({"text": "", "language": result.language, "segments": []})
+            continue
+
+        needs_fallback = (
+            result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+            or (
+                result.avg_logprob < LOGPROB_THRESHOLD
+                and result.no_speech_prob < NO_SPEECH_THRESHOLD
+            )
+        )
+        if needs_fallback:
+            # Let transcribe() retry this clip with its temperature schedule
+            fallback_options = {"task": "transcribe", "fp16": False}
+            if language:
+                fallback_options["language"] = language
+            results.append(model.transcribe(audio, **fallback_options))
+            continue
+
+        duration = len(audio) / whisper.audio.SAMPLE_RATE
+        results.append({
+            "text": result.text,
+            "language": result.language,
+            "segments": [{
+                "id": 0,
+                "start": 0.0,
+                "end": duration,
+                "text": result.text,
+                "temperature": result.temperature,
+                "avg_logprob": result.avg_logprob,
+                "compression_ratio": result.compression_ratio,
+                "no_speech_prob": result.no_speech_prob,
+            }],
+        })
+
+    return results
+
+
+class WhisperBatchScheduler:
+    """
+    Micro-batching scheduler for Whisper transcription
+
+    Concurrent callers enqueue clips; a single worker task waits a short window
+    for more clips to arrive, groups them by language and decodes each group
+    in one pass. ``decode_fn`` runs the batch wherever the model lives - the
+    default thread pool or a Whisper worker process.
+    """
+
+    def __init__(
+        self,
+        decode_fn: Callable[[List[np.ndarray], Optional[str]], Awaitable[List[dict]]],
+        max_batch_size: int = 8,
+        window_ms: int = 50
+    ):
+        self.decode_fn = decode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0, window_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.stats = {
+            "batches": 0,
+            "clips": 0,
+            "max_batch_seen": 0,
+        }
+
+    @staticmethod
+    def fits(audio: np.ndarray) -> bool:
+        """Whether a clip is short enough to be decoded as a single batch item"""
+        return len(audio) <= whisper.audio.N_SAMPLES
+
+    def start(self):
+        """Start the background batching worker"""
+        if self._worker and not self._worker.done():
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Whisper batch scheduler started (max_batch_size={self.max_batch_size}, "
+            f"window={self.window * 1000:.0f}ms)"
+        )
+
+    async def stop(self):
+        """Stop the worker and fail any clips still waiting"""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        while self._queue and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if not item.future.done():
+                item.future.set_exception(RuntimeError("Whisper batch scheduler stopped"))
+
+    async def transcribe(self, audio: np.ndarray, language: Optional[str] = None) -> dict:
+        """
+        Queue a clip for batched transcription and wait for its result
+
+        Args:
+            audio: 16 kHz float32 clip of at most 30 seconds
+            language: Optional language code to pin decoding to
+
+        Returns:
+            Transcription dict shaped like ``whisper.transcribe`` output
+        """
+        if not self.fits(audio):
+            raise ValueError("Clip exceeds the 30 second Whisper window")
+
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_BatchItem(audio=audio, language=language, future=future))
+        return await future
+
+    async def _collect(self) -> List[_BatchItem]:
+        """Wait for one clip, then gather more until the window closes or the batch is full"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Worker loop: collect, group by language, decode, fan out"""
+        while True:
+            batch = await self._collect()
+
+            groups: Dict[Optional[str], List[_BatchItem]] = {}
+            for item in batch:
+                groups.setdefault(item.language, []).append(item)
+
+            for language, items in groups.items():
+                try:
+                    results = await self.decode_fn([item.audio for item in items], language)
+                    for item, result in zip(items, results):
+                        if not item.future.done():
+                            item.future.set_result(result)
+
+                    self.stats["batches"] += 1
+                    self.stats["clips"] += len(items)
+                    self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(items))
+                    logger.info(f"Decoded Whisper batch of {len(items)} clips (language={language})")
+
+                except Exception as e:
+                    logger.error(f"Batched transcription failed: {str(e)}")
+                    for item in items:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+
+    def get_stats(self) -> dict:
+        """Get batching statistics"""
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "average_batch_size": (
+                self.stats["clips"] / self.stats["batches"] if self.stats["batches"] else 0.0
+            ),
+        }
+
+
+__all__ = ["WhisperBatchScheduler", "decode_batch"]
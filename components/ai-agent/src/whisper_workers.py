@@ -0,0 +1,155 @@
+"""
+Whisper Process Pool
+Runs Whisper inference in separate worker processes so PyTorch work does not
+share the GIL with the FastAPI event loop
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Model loaded once per worker process by _init_worker
+_worker_model = None
+
+
+@dataclass(frozen=True)
+class SharedAudio:
+    """Handle to a float32 audio buffer placed in shared memory by the parent"""
+    name: str
+    shape: Tuple[int, ...]
+
+
+def _init_worker(model_name: str, device: str, torch_threads: int):
+    """Process initializer: pin torch threads and load the model once"""
+    global _worker_model
+
+    import torch
+    from whisper_engines import load_whisper_model
+
+    if torch_threads > 0:
+        torch.set_num_threads(torch_threads)
+    _worker_model = load_whisper_model(model_name, device)
+    logger.info(f"Whisper worker {os.getpid()} ready (model={model_name}, threads={torch.get_num_threads()})")
+
+
+def _read_shared(audio: SharedAudio) -> np.ndarray:
+    """Copy a shared buffer into worker-local memory so the segment can be released"""
+    shm = shared_memory.SharedMemory(name=audio.name)
+    try:
+        return np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+
+
+def _worker_ping() -> int:
+    return os.getpid()
+
+
+def _worker_transcribe(audio: SharedAudio, options: dict) -> dict:
+    return _worker_model.transcribe(_read_shared(audio), **options)
+
+
+def _worker_detect_language(audio: SharedAudio) -> dict:
+    from whisper_engines import detect_language
+    return detect_language(_worker_model, _read_shared(audio))
+
+
+def _worker_decode_batch(audios: List[SharedAudio], language: Optional[str]) -> List[dict]:
+    from whisper_batcher import decode_batch
+    return decode_batch(_worker_model, [_read_shared(audio) for audio in audios], language)
+
+
+@contextmanager
+def _share(audio: np.ndarray) -> Iterator[SharedAudio]:
+    """Place an array in a shared memory segment for the lifetime of the block"""
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, audio.nbytes))
+    try:
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+        yield SharedAudio(name=shm.name, shape=audio.shape)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+class WhisperProcessPool:
+    """
+    Pool of worker processes, each holding its own preloaded Whisper model
+
+    Audio is handed to workers through shared memory rather than pickled over
+    the pipe; only the small result dicts travel back.
+    """
+
+    def __init__(self, model_name: str, device: str, workers: int = 2, torch_threads: int = 0):
+        self.model_name = model_name
+        self.device = device
+        self.workers = max(1, workers)
+        # Split the cores evenly between workers unless told otherwise
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def start(self):
+        """Spawn the workers and wait until every one has loaded the model"""
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            # fork is unsafe once torch has started its own threads
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.device, self.torch_threads)
+        )
+
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _worker_ping) for _ in range(self.workers)
+        ])
+        logger.info(
+            f"Whisper process pool started: {len(set(pids))} workers, "
+            f"{self.torch_threads} torch threads each"
+        )
+
+    async def transcribe(self, audio: np.ndarray, options: dict) -> dict:
+        """Run whisper.transcribe on a worker"""
+        loop = asyncio.get_running_loop()
+        with _share(audio) as shared:
+            return await loop.run_in_executor(self._executor, _worker_transcribe, shared, options)
+
+    async def detect_language(self, audio: np.ndarray) -> dict:
+        """Run Whisper's language-identification head on a worker"""
+        loop = asyncio.get_running_loop()
+        with _share(audio) as shared:
+            return await loop.run_in_executor(self._executor, _worker_detect_language, shared)
+
+    async def decode_batch(self, audios: List[np.ndarray], language: Optional[str] = None) -> List[dict]:
+        """Run a batched decode on a worker"""
+        loop = asyncio.get_running_loop()
+        with ExitStack() as stack:
+            shared = [stack.enter_context(_share(audio)) for audio in audios]
+            return await loop.run_in_executor(self._executor, _worker_decode_batch, shared, language)
+
+    def shutdown(self):
+        """Stop all workers"""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> dict:
+        """Get pool configuration"""
+        return {
+            "workers": self.workers,
+            "torch_threads_per_worker": self.torch_threads,
+            "running": self._executor is not None,
+        }
+
+
+__all__ = ["WhisperProcessPool"]
@@ -0,0 +1,6 @@
+"""Make the service modules importable the way the service itself runs them"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,89 @@
+"""Request coalescing in the LLM gateway, against a stand-in Ollama client"""
+
+import asyncio
+
+import pytest
+
+llm_gateway = pytest.importorskip("llm_gateway")
+
+REQUEST = {"model": "gemma3:4b", "messages": [{"role": "user", "content": "namaste"}]}
+
+
+class FakeClient:
+    """Streams a fixed number of chunks per call, one every ``delay`` seconds, or returns one response"""
+
+    def __init__(self, chunks: int = 3, delay: float = 0.01):
+        self.chunks = chunks
+        self.delay = delay
+        self.calls = 0
+
+    async def chat(self, stream: bool = False, **request):
+        self.calls += 1
+
+        async def generate():
+            for index in range(self.chunks):
+                await asyncio.sleep(self.delay)
+                yield {"message": {"content": str(index)}, "done": index == self.chunks - 1}
+
+        if stream:
+            return generate()
+        await asyncio.sleep(self.delay)
+        return {"message": {"content": "done"}, "done": True}
+
+
+def make_gateway(client: FakeClient) -> "llm_gateway.LLMGateway":
+    gateway = llm_gateway.LLMGateway(coalesce=True)
+    gateway.client = client
+    return gateway
+
+
+def test_identical_streams_share_one_upstream_call():
+    async def run():
+        client = FakeClient()
+        gateway = make_gateway(client)
+
+        async def consume():
+            return [chunk async for chunk in gateway.chat_stream(**REQUEST)]
+
+        first, second = await asyncio.gather(consume(), consume())
+        return client.calls, first, second
+
+    calls, first, second = asyncio.run(run())
+    assert calls == 1
+    assert first == second and len(first) == 3
+
+
+def test_request_after_last_subscriber_leaves_starts_afresh():
+    async def run():
+        client = FakeClient()
+        gateway = make_gateway(client)
+
+        stream = gateway.chat_stream(**REQUEST)
+        await stream.__anext__()
+        await stream.aclose()
+
+        # Sent before the cancelled upstream task has had a chance to clean up
+        chunks = [chunk async for chunk in gateway.chat_stream(**REQUEST)]
+        return client.calls, chunks, gateway.get_stats()["in_flight"]
+
+    calls, chunks, in_flight = asyncio.run(run())
+    assert calls == 2
+    assert len(chunks) == 3
+    assert in_flight == 0
+
+
+def test_cancelled_before_upstream_starts_does_not_block_later_requests():
+    async def run():
+        client = FakeClient()
+        gateway = make_gateway(client)
+
+        consumer = asyncio.ensure_future(gateway.chat(**REQUEST))
+        await asyncio.sleep(0)
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+
+        return await asyncio.wait_for(gateway.chat(**REQUEST), timeout=1.0)
+
+    response = asyncio.run(run())
+    assert response["message"]["content"] == "done"
@@ -0,0 +1,66 @@
+"""Tests for the energy-based voice activity detection"""
+
+import numpy as np
+
+from vad import detect_speech_chunks, is_silent
+
+SAMPLE_RATE = 16000
+
+
+def _tone(seconds: float, amplitude: float = 0.5, frequency: float = 200.0) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return amplitude * np.sin(2 * np.pi * frequency * t)
+
+
+def _syllables(seconds: float, rate: float = 4.0, depth: float = 0.5) -> np.ndarray:
+    """Voiced tone with a syllable-rate envelope and no pauses"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return _tone(seconds) * (1 + depth * np.sin(2 * np.pi * rate * t))
+
+
+def _spans(chunks):
+    return [(round(chunk.start_time, 2), round(chunk.end_time, 2)) for chunk in chunks]
+
+
+def test_continuous_speech_is_kept():
+    audio = _syllables(5.0).astype(np.float32)
+    assert _spans(detect_speech_chunks(audio, SAMPLE_RATE)) == [(0.0, 5.0)]
+
+
+def test_constant_tone_is_kept():
+    audio = _tone(5.0).astype(np.float32)
+    assert _spans(detect_speech_chunks(audio, SAMPLE_RATE)) == [(0.0, 5.0)]
+
+
+def test_continuous_speech_in_steady_noise_is_kept():
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0, 0.05, 5 * SAMPLE_RATE)
+    # Syllables about 10 dB above the noise, with no pause to measure the floor in
+    speech = _syllables(5.0) * 0.05 * np.sqrt(20) / 0.5 / 1.5
+    chunks = detect_speech_chunks((noise + speech).astype(np.float32), SAMPLE_RATE)
+    assert chunks
+    assert sum(chunk.duration for chunk in chunks) > 4.0
+
+
+def test_speech_after_noise_is_trimmed_to_speech():
+    rng = np.random.default_rng(1)
+    audio = rng.normal(0, 0.05, 6 * SAMPLE_RATE)
+    audio[2 * SAMPLE_RATE:4 * SAMPLE_RATE] += _syllables(2.0)
+    chunks = detect_speech_chunks(audio.astype(np.float32), SAMPLE_RATE)
+    assert len(chunks) == 1
+    assert 1.5 <= chunks[0].start_time <= 2.0
+    assert 4.0 <= chunks[0].end_time <= 4.5
+
+
+def test_long_pause_splits_chunks():
+    audio = np.concatenate([_syllables(2.0), np.zeros(3 * SAMPLE_RATE), _syllables(2.0)]).astype(np.float32)
+    chunks = detect_speech_chunks(audio, SAMPLE_RATE)
+    assert len(chunks) == 2
+    assert chunks[0].end_time < 2.5 and chunks[1].start_time > 4.5
+
+
+def test_digital_silence_has_no_speech():
+    audio = np.zeros(3 * SAMPLE_RATE, dtype=np.float32)
+    assert detect_speech_chunks(audio, SAMPLE_RATE) == []
+    assert is_silent(audio, SAMPLE_RATE)
+    assert not is_silent(_tone(1.0).astype(np.float32), SAMPLE_RATE)
@@ -119,7 +119,8 @@ async def process_session(session_data: SessionData):
                 voice_files=voice_files,
                 farmer_id=session_data.farmer_id,
                 session_id=session_data.session_id,
-                language=session_data.user_language or "hi"
+                language=session_data.user_language or "hi",
+                message_count=len(session_data.messages)
             )
             
             # Check if AI agent failed and we should not fallback
@@ -191,7 +192,28 @@ async def process_session(session_data: SessionData):
             processing_time=None
         )
 
-async def _call_ai_agent(content: str, voice_files: List[str], farmer_id: str, session_id: str, language: str) -> Dict[str, Any]:
+async def _finalize_incremental_session(client: "httpx.AsyncClient", session_id: str, message_count: int) -> Optional[Dict[str, Any]]:
+    """Finalize a session the AI Agent extracted message by message, or None if it can't"""
+    try:
+        response = await client.post(
+            f"{AI_AGENT_URL}/api/v1/sessions/{session_id}/finalize",
+            json={"expected_messages": message_count},
+            timeout=30.0
+        )
+    except httpx.HTTPError as e:
+        logger.warning(f"⚠️ Incremental finalize failed for session {session_id}, processing in full: {e}")
+        return None
+    
+    if response.status_code in (404, 409):
+        # Not extracted incrementally, or some messages were missed
+        logger.info(f"📋 Session {session_id} not ready to finalize ({response.status_code}), processing in full")
+        return None
+    response.raise_for_status()
+    
+    logger.info(f"⚡ Finalized incrementally extracted session {session_id}")
+    return response.json()
+
+async def _call_ai_agent(content: str, voice_files: List[str], farmer_id: str, session_id: str, language: str, message_count: Optional[int] = None) -> Dict[str, Any]:
     """Call the AI Agent for real processing with detailed error tracking"""
     import httpx
     
@@ -226,14 +248,18 @@ async def _call_ai_agent(content: str, voice_files: List[str], farmer_id: str, s
         
         # Call AI Agent
         async with httpx.AsyncClient() as client:
-            logger.info("🔄 Making API call to AI Agent...")
-            response = await client.post(
-                f"{AI_AGENT_URL}/api/v1/process",
-                json=ai_payload,
-                timeout=60.0
-            )
-            response.raise_for_status()
-            ai_result = response.json()
+            # Sessions whose messages were extracted as they arrived only need finalizing
+            ai_result = await _finalize_incremental_session(client, session_id, message_count)
+            
+            if ai_result is None:
+                logger.info("🔄 Making API call to AI Agent...")
+                response = await client.post(
+                    f"{AI_AGENT_URL}/api/v1/process",
+                    json=ai_payload,
+                    timeout=60.0
+                )
+                response.raise_for_status()
+                ai_result = response.json()
             
             logger.info(f"✅ AI Agent response received: status={ai_result.get('status')}")
             logger.info(f"📊 Processing results: farmer_data={bool(ai_result.get('farmer_data'))}, extraction_time={ai_result.get('processing_time', 'N/A')}s")
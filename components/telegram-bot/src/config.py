@@ -34,6 +34,11 @@ class Settings(BaseSettings):
     orchestrator_url: str = "http://orchestrator:8000"  # Docker service name for production
     orchestrator_timeout: int = 30
     
+    # Incremental extraction: each message is sent to the AI Agent as it arrives
+    ai_agent_url: str = "http://ai-agent:8004"
+    ai_agent_timeout: int = 120  # Covers transcribing a voice message
+    incremental_extraction_enabled: bool = True
+    
     # Logging
     log_level: str = "INFO"
     log_file: str = "./logs/bot.log"  # Local directory for testing
@@ -23,6 +23,7 @@ class SessionManager:
         self.db = database
         self.active_sessions: Dict[int, str] = {}  # telegram_user_id -> session_id
         self.eod_scheduled = False  # Track if EOD cleanup is scheduled
+        self.extraction_tasks: Dict[str, set] = {}  # session_id -> pending incremental extraction tasks
         
     async def start_session(self, telegram_user_id: int, farmer_id: str) -> SessionLog:
         """Start a new logging session for user"""
@@ -104,6 +105,7 @@ class SessionManager:
             success = await self.db.add_message_to_session(session.session_id, message)
             if success:
                 logger.info(f"Added text message to session {session.session_id}")
+                self._schedule_incremental_extraction(session, message, len(session.messages))
                 
                 # Note: Removed auto-processing on completion indicators
                 # Sessions now stay active all day until manually ended or EOD
@@ -149,6 +151,7 @@ class SessionManager:
             success = await self.db.add_message_to_session(session.session_id, message)
             if success:
                 logger.info(f"Added voice message to session {session.session_id}: {filename}")
+                self._schedule_incremental_extraction(session, message, len(session.messages))
             else:
                 # Clean up file if database operation failed
                 try:
@@ -227,6 +230,9 @@ class SessionManager:
                     "result": mock_result
                 }
             else:
+                # Let in-flight message extractions land so the AI Agent can just finalize
+                await self._wait_for_incremental_extraction(session.session_id)
+                
                 # Send to orchestrator for real processing (which will call AI Agent)
                 orchestrator_result = await self._send_to_orchestrator(session_data)
                 
@@ -344,22 +350,71 @@ class SessionManager:
                     "timestamp": msg.timestamp.isoformat()
                 })
         
-        # Get user language preference
+        return {
+            "session_id": session.session_id,
+            "farmer_id": session.farmer_id,
+            "start_time": session.start_time.isoformat(),
+            "messages": messages,
+            "user_language": await self._get_user_language(session.telegram_user_id)
+        }
+    
+    async def _get_user_language(self, telegram_user_id: int) -> str:
+        """Get user language preference"""
         user_language = "hi"  # Default
         try:
-            farmer = await self.db.get_farmer_by_telegram_id(session.telegram_user_id)
+            farmer = await self.db.get_farmer_by_telegram_id(telegram_user_id)
             if farmer and hasattr(farmer, 'language_preference') and farmer.language_preference:
                 user_language = farmer.language_preference
         except Exception as e:
             logger.error(f"Failed to get user language: {e}")
+        return user_language
+    
+    def _schedule_incremental_extraction(self, session: SessionLog, message: LogMessage, message_index: int):
+        """Start extracting a message in the background without delaying the reply to the user"""
+        if not settings.incremental_extraction_enabled or settings.mock_responses:
+            return
+        
+        task = asyncio.create_task(self._extract_incrementally(session, message, message_index))
+        tasks = self.extraction_tasks.setdefault(session.session_id, set())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    
+    async def _extract_incrementally(self, session: SessionLog, message: LogMessage, message_index: int):
+        """Send one message to the AI Agent to be extracted and merged into the session's farmer state"""
         
-        return {
-            "session_id": session.session_id,
+        import aiohttp
+        
+        payload = {
             "farmer_id": session.farmer_id,
-            "start_time": session.start_time.isoformat(),
-            "messages": messages,
-            "user_language": user_language
+            "message_id": message.message_id,
+            "message_index": message_index,
+            "text_content": message.content,
+            "voice_file_path": message.file_path,
+            "language": await self._get_user_language(session.telegram_user_id)
         }
+        
+        try:
+            timeout = aiohttp.ClientTimeout(total=settings.ai_agent_timeout)
+            async with aiohttp.ClientSession(timeout=timeout) as client:
+                async with client.post(
+                    f"{settings.ai_agent_url}/api/v1/sessions/{session.session_id}/messages",
+                    json=payload
+                ) as response:
+                    if response.status == 200:
+                        logger.info(f"Extracted message {message_index} of session {session.session_id}")
+                    else:
+                        error_text = await response.text()
+                        logger.warning(f"Incremental extraction returned {response.status}: {error_text}")
+        except Exception as e:
+            # The session is still processed in full when it ends
+            logger.warning(f"Incremental extraction failed for session {session.session_id}: {e}")
+    
+    async def _wait_for_incremental_extraction(self, session_id: str):
+        """Wait for a session's pending message extractions before it is finalized"""
+        tasks = self.extraction_tasks.pop(session_id, set())
+        if tasks:
+            logger.info(f"Waiting for {len(tasks)} pending extractions of session {session_id}")
+            await asyncio.wait(list(tasks), timeout=settings.ai_agent_timeout)
     
     async def _generate_mock_response(self, session: SessionLog) -> Dict[str, Any]:
         """Generate mock AI response for testing"""
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Parity and latency harness for the shared extraction engine
+Runs EnhancedInfoExtractionAgent from the AI agent service and from the
+standalone agent on the same texts with the LLM and result cache disabled,
+and fails unless both produce identical FarmerInfo at comparable latency
+
+Each entry point runs in its own interpreter, since both services ship
+top-level ``config``, ``models`` and ``info_extraction`` modules. Both use
+the installed extraction engine:
+    pip install -e components/ai-agent/extraction-engine
+
+Usage:
+    python scripts/benchmark_extraction_engine.py --iterations 200 --tolerance 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = {
+    "components": ROOT / "components" / "ai-agent" / "src",
+    "agent": ROOT / "agent",
+}
+
+# Working directory for the engine alone, which is imported as installed
+ENGINE_PATH = ROOT
+
+SAMPLES = [
+    ("मेरा नाम राम कुमार है, मेरी उम्र 45 साल है और मेरे पास 5 एकड़ जमीन है। परिवार में 6 सदस्य हैं, सालाना आय 2 लाख रुपये है। गेहूं और धान उगाता हूं, बोरवेल से सिंचाई।", "hi"),
+    ("I am Suresh, 38 years old, farming 3.5 acres of wheat and rice near Meerut, Uttar Pradesh. Family of 4, income rs 150000 per year. Phone 9876543210, I own the land.", "en"),
+    ("मैं गुजरात से हूं, 12 बीघा में कपास उगाता हूं, 7 लोग घर में हैं, जमीन लीज पर है", "hi"),
+    ("Just calling to ask about the PM Kisan scheme status, nothing else to add.", "en"),
+]
+
+
+async def _run_entry_point(iterations: int) -> dict:
+    """Extract every sample with the entry point on sys.path, LLM and cache off"""
+    from info_extraction import EnhancedInfoExtractionAgent
+    from models import LanguageCode
+
+    agent = EnhancedInfoExtractionAgent()
+    agent.ollama_enabled = False
+    await agent.initialize()
+    agent.result_cache = None
+
+    samples = [(text, LanguageCode(language)) for text, language in SAMPLES]
+    results = [
+        (await agent.extract_information(text, language)).farmer_info.dict()
+        for text, language in samples
+    ]
+
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        for text, language in samples:
+            await agent.extract_information(text, language)
+    elapsed = time.perf_counter() - start_time
+
+    return {"results": results, "per_text_us": elapsed / (iterations * len(samples)) * 1e6}
+
+
+def _run_engine(iterations: int) -> dict:
+    """Pattern and rule extraction only, without spaCy"""
+    from extraction_engine import ExtractionEngine
+
+    engine = ExtractionEngine()
+    results = [engine.farmer_fields(engine.extract(engine.preprocess(text))[0]) for text, _ in SAMPLES]
+
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        for text, _ in SAMPLES:
+            engine.extract(engine.preprocess(text))
+    elapsed = time.perf_counter() - start_time
+
+    return {"results": results, "per_text_us": elapsed / (iterations * len(SAMPLES)) * 1e6}
+
+
+def worker(name: str, iterations: int):
+    """Child process: print one JSON line with results and timing"""
+    sys.path.insert(0, str(ENGINE_PATH if name == "engine" else ENTRY_POINTS[name]))
+    if name == "engine":
+        report = _run_engine(iterations)
+    else:
+        report = asyncio.run(_run_entry_point(iterations))
+    print(json.dumps(report, ensure_ascii=False, default=str))
+
+
+def run(name: str, iterations: int) -> dict:
+    """Run one entry point in a fresh interpreter"""
+    cwd = ENGINE_PATH if name == "engine" else ENTRY_POINTS[name]
+    proc = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--worker", name, "--iterations", str(iterations)],
+        cwd=cwd, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} entry point failed:\n{proc.stderr.strip()}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check extraction parity and latency across entry points")
+    parser.add_argument("--iterations", type=int, default=200, help="Passes over the sample texts")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed latency gap between entry points")
+    parser.add_argument("--worker", choices=[*ENTRY_POINTS, "engine"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.iterations)
+        return
+
+    reports = {}
+    for name in ["engine", *ENTRY_POINTS]:
+        print(f"🔄 Running {name}...")
+        try:
+            reports[name] = run(name, args.iterations)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+    failed = False
+
+    print("\n🔍 FarmerInfo parity")
+    expected = reports["components"]["results"]
+    for index, (text, language) in enumerate(SAMPLES):
+        infos = {name: reports[name]["results"][index] for name in ENTRY_POINTS}
+        identical = all(info == expected[index] for info in infos.values())
+        failed |= not identical
+        print(f"   {'✅' if identical else '❌'} [{language}] {text[:50]}...")
+        if not identical:
+            for name, info in infos.items():
+                print(f"      {name}: {info}")
+
+    print(f"\n⏱️  {args.iterations} iterations x {len(SAMPLES)} texts")
+    best = min(reports[name]["per_text_us"] for name in ENTRY_POINTS)
+    for name, report in reports.items():
+        per_text_us = report["per_text_us"]
+        if name in ENTRY_POINTS:
+            within = per_text_us <= best * (1 + args.tolerance)
+            failed |= not within
+            status = "✅" if within else "❌"
+        else:
+            status = "  "
+        print(f"   {status} {name:<12}{per_text_us:>10.2f} µs/text   {per_text_us / best:>5.2f}x")
+
+    if failed:
+        print("\n❌ Entry points diverge")
+        sys.exit(1)
+    print("\n✅ Entry points produce identical FarmerInfo at comparable latency")
+
+
+if __name__ == "__main__":
+    main()
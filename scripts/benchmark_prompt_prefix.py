@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-token benchmark for the extraction prompt layout
+Compares the old single prompt, with the farmer text in the middle of the
+instructions and sent to /api/generate, against the current layout: a
+stable system message plus a user message with the text, sent to
+/api/chat with keep_alive so Ollama reuses the prefix KV cache
+
+By default it runs against a local Ollama stand-in that models load time,
+prefill over the part of the prompt that differs from the previous request,
+and keep_alive expiry. Pass --host to measure a real Ollama server instead.
+
+Usage:
+    python scripts/benchmark_prompt_prefix.py --requests 20
+    python scripts/benchmark_prompt_prefix.py --host http://localhost:11434 --model gemma3:4b
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "components" / "ai-agent" / "src"))
+
+from ollama import AsyncClient
+
+from config import get_settings
+from OllamaAgent import EXTRACTION_FIELDS, OllamaAgent
+
+settings = get_settings()
+
+SAMPLES = [
+    ("मेरा नाम राम कुमार है, मेरी उम्र 45 साल है और मेरे पास 5 एकड़ जमीन है। परिवार में 6 सदस्य हैं, सालाना आय 2 लाख रुपये है। गेहूं और धान उगाता हूं, बोरवेल से सिंचाई।", "hi"),
+    ("I am Suresh, 38 years old, farming 3.5 acres of wheat and rice near Meerut, Uttar Pradesh. Family of 4, income rs 150000 per year. Phone 9876543210, I own the land.", "en"),
+    ("मैं गुजरात से हूं, 12 बीघा में कपास उगाता हूं, 7 लोग घर में हैं, जमीन लीज पर है", "hi"),
+    ("My name is Lakshmi, I grow sugarcane on 2 hectares in Belagavi, Karnataka, with drip irrigation.", "en"),
+]
+
+
+def legacy_prompt(text: str, language: str) -> str:
+    """The extraction prompt as it was before the system/user split"""
+    language_instruction = {
+        'hi': "The text is in Hindi/Hinglish.",
+        'en': "The text is in English.",
+    }.get(language, "")
+
+    field_list = "\n".join(f"- {field}: {description}" for field, description in EXTRACTION_FIELDS.items())
+
+    return f"""Extract information about an Indian farmer from this text as JSON. {language_instruction}
+Use null for anything not mentioned; don't guess. Translate Hindi crop names to English.
+
+Text: "{text}"
+
+Fields:
+{field_list}
+"""
+
+
+class OllamaStandIn:
+    """
+    Minimal Ollama server for /api/chat and /api/generate with a modelled KV cache
+
+    Each model keeps the tokens of its last request while it stays loaded.
+    A request pays ``load_seconds`` if the model was unloaded, prefill time
+    for every prompt token after the prefix it shares with the cached
+    tokens, then one decode step per output token.
+    """
+
+    def __init__(self, load_seconds: float, prefill_ms: float, decode_ms: float, output_tokens: int):
+        self.load_seconds = load_seconds
+        self.prefill_ms = prefill_ms
+        self.decode_ms = decode_ms
+        self.output_tokens = output_tokens
+        self._models = {}  # model -> (tokens, expires_at)
+        self._lock = threading.Lock()  # One generation at a time, like a single Ollama slot
+        self._server = None
+
+    @staticmethod
+    def tokenize(text: str) -> list:
+        return re.findall(r"\w+|[^\w\s]|\s+", text)
+
+    @staticmethod
+    def keep_alive_seconds(keep_alive) -> float:
+        if keep_alive is None:
+            return 300.0  # Ollama's default
+        if isinstance(keep_alive, (int, float)):
+            return float("inf") if keep_alive < 0 else float(keep_alive)
+        match = re.fullmatch(r"(-?\d+(?:\.\d+)?)([smh]?)", str(keep_alive))
+        if not match:
+            return 300.0
+        value = float(match.group(1))
+        return float("inf") if value < 0 else value * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+    def render(self, endpoint: str, body: dict) -> str:
+        """Apply a chat template, as Ollama does for both endpoints"""
+        if endpoint == "chat":
+            messages = body.get("messages", [])
+        else:
+            messages = [{"role": "user", "content": body.get("prompt", "")}]
+        rendered = "".join(f"<|{message['role']}|>\n{message['content']}\n" for message in messages)
+        return rendered + "<|assistant|>\n"
+
+    def generate(self, endpoint: str, body: dict):
+        """Yield response chunks, sleeping to model the server's work"""
+        model = body.get("model", "")
+        prompt_tokens = self.tokenize(self.render(endpoint, body))
+
+        with self._lock:
+            now = time.time()
+            cached, expires_at = self._models.get(model, ([], 0.0))
+            if expires_at < now:
+                time.sleep(self.load_seconds)
+                cached = []
+
+            shared = 0
+            for cached_token, token in zip(cached, prompt_tokens):
+                if cached_token != token:
+                    break
+                shared += 1
+            evaluated = len(prompt_tokens) - shared
+            time.sleep(evaluated * self.prefill_ms / 1000)
+
+            output = [f'"{field}": null' for field in EXTRACTION_FIELDS][:self.output_tokens]
+            pieces = ["{"] + [f"{piece}, " for piece in output[:-1]] + [output[-1], "}"]
+            for piece in pieces:
+                time.sleep(self.decode_ms / 1000)
+                yield self._chunk(endpoint, model, piece, done=False)
+
+            keep_alive = self.keep_alive_seconds(body.get("keep_alive"))
+            self._models[model] = (prompt_tokens + self.tokenize("".join(pieces)), time.time() + keep_alive)
+
+        final = self._chunk(endpoint, model, "", done=True)
+        final.update({"prompt_eval_count": evaluated, "eval_count": len(pieces)})
+        yield final
+
+    @staticmethod
+    def _chunk(endpoint: str, model: str, content: str, done: bool) -> dict:
+        chunk = {"model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ"), "done": done}
+        if endpoint == "chat":
+            chunk["message"] = {"role": "assistant", "content": content}
+        else:
+            chunk["response"] = content
+        return chunk
+
+    def reset(self):
+        """Unload every model"""
+        self._models.clear()
+
+    def start(self) -> str:
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                endpoint = self.path.rsplit("/", 1)[-1]
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if endpoint not in ("chat", "generate"):
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in stand_in.generate(endpoint, body):
+                    line = (json.dumps(chunk) + "\n").encode("utf-8")
+                    self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+
+
+async def first_token(stream) -> tuple:
+    """Seconds to the first non-empty chunk, and prompt tokens the server evaluated"""
+    start_time = time.perf_counter()
+    ttft = None
+    prompt_eval_count = None
+    async for chunk in stream:
+        content = chunk.get("message", {}).get("content", "") if "message" in chunk else chunk.get("response", "")
+        if ttft is None and content:
+            ttft = time.perf_counter() - start_time
+        if chunk.get("done"):
+            prompt_eval_count = chunk.get("prompt_eval_count")
+    return ttft, prompt_eval_count
+
+
+async def run_layout(client: AsyncClient, layout: str, model: str, requests: int, warmup: int) -> dict:
+    """Send ``requests`` extractions, cycling through the samples, and time the first token of each"""
+    options = {"temperature": 0.1, "top_p": 0.9}
+    ttfts, evaluated = [], []
+    for index in range(warmup + requests):
+        text, language = SAMPLES[index % len(SAMPLES)]
+        if layout == "before":
+            stream = await client.generate(
+                model=model, prompt=legacy_prompt(text, language), format="json", options=options, stream=True
+            )
+        else:
+            stream = await client.chat(
+                model=model,
+                messages=OllamaAgent._create_extraction_messages(text, language),
+                format="json",
+                options=options,
+                keep_alive=settings.ollama_keep_alive,
+                stream=True
+            )
+        ttft, prompt_eval_count = await first_token(stream)
+        if index >= warmup:
+            ttfts.append(ttft)
+            if prompt_eval_count is not None:
+                evaluated.append(prompt_eval_count)
+
+    ttfts.sort()
+    return {
+        "mean_ms": statistics.mean(ttfts) * 1000,
+        "p50_ms": ttfts[len(ttfts) // 2] * 1000,
+        "p90_ms": ttfts[min(len(ttfts) - 1, int(0.9 * len(ttfts)))] * 1000,
+        "prompt_eval": statistics.mean(evaluated) if evaluated else None
+    }
+
+
+async def main_async(args):
+    stand_in = None
+    host = args.host
+    if not host:
+        stand_in = OllamaStandIn(args.load_seconds, args.prefill_ms, args.decode_ms, args.output_tokens)
+        host = stand_in.start()
+        print(f"🧪 Ollama stand-in on {host} (prefill {args.prefill_ms} ms/token, load {args.load_seconds}s)")
+    else:
+        print(f"🔗 Ollama at {host}, model {args.model}")
+
+    client = AsyncClient(host=host)
+    reports = {}
+    try:
+        for layout in ["before", "after"]:
+            if stand_in:
+                stand_in.reset()
+            print(f"🔄 Running {layout} layout...")
+            reports[layout] = await run_layout(client, layout, args.model, args.requests, args.warmup)
+    finally:
+        if stand_in:
+            stand_in.stop()
+
+    print(f"\n⏱️  Time to first token over {args.requests} extractions ({args.warmup} warm-up)")
+    for layout, report in reports.items():
+        evaluated = f"{report['prompt_eval']:>7.1f}" if report["prompt_eval"] is not None else "    n/a"
+        print(
+            f"   {layout:<8}mean {report['mean_ms']:>8.1f} ms   p50 {report['p50_ms']:>8.1f} ms   "
+            f"p90 {report['p90_ms']:>8.1f} ms   prompt tokens evaluated {evaluated}"
+        )
+
+    speedup = reports["before"]["mean_ms"] / reports["after"]["mean_ms"]
+    print(f"\n{'✅' if speedup > 1 else '⚠️ '} Shared prefix layout: {speedup:.2f}x faster to first token")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare time-to-first-token of the old and prefix-cached prompt layouts")
+    parser.add_argument("--host", help="Real Ollama server; defaults to the built-in stand-in")
+    parser.add_argument("--model", default=settings.ollama_model, help="Model to run")
+    parser.add_argument("--requests", type=int, default=20, help="Timed extractions per layout")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed extractions first, to load the model")
+    parser.add_argument("--load-seconds", type=float, default=1.0, help="Stand-in model load time")
+    parser.add_argument("--prefill-ms", type=float, default=2.0, help="Stand-in prompt evaluation per token")
+    parser.add_argument("--decode-ms", type=float, default=20.0, help="Stand-in generation per token")
+    parser.add_argument("--output-tokens", type=int, default=4, help="Stand-in fields per response")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the AI Agent regex bank
+Compares raw-string re.search per category (the old extraction path) with the
+precompiled per-category bank
+
+Needs the extraction engine installed:
+    pip install -e components/ai-agent/extraction-engine
+
+Usage:
+    python scripts/benchmark_regex_bank.py --iterations 20000
+"""
+
+import argparse
+import re
+import timeit
+
+from extraction_engine import load_patterns
+
+patterns = load_patterns()
+NUMERIC_PATTERNS = patterns.numeric
+numeric_bank = patterns.numeric_bank
+
+SAMPLES = [
+    "मेरा नाम राम कुमार है, मेरी उम्र 45 साल है और मेरे पास 5 एकड़ जमीन है। परिवार में 6 सदस्य हैं, सालाना आय 2 लाख रुपये है।",
+    "I am Suresh, 38 years old, farming 3.5 acres of wheat and rice near Meerut. Family of 4, income rs 150000 per year.",
+    "मैं गुजरात से हूं, 12 बीघा में कपास उगाता हूं, 7 लोग घर में हैं",
+    "Just calling to ask about the PM Kisan scheme status, nothing else to add.",
+]
+
+
+def raw_search(text: str) -> dict:
+    """The previous path: raw pattern strings, looked up in re's cache every call"""
+    found = {}
+    for category, patterns in NUMERIC_PATTERNS.items():
+        for pattern in patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                found[category] = match.group(1)
+                break
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark numeric regex extraction strategies")
+    parser.add_argument("--iterations", type=int, default=20000, help="Passes over the sample texts")
+    args = parser.parse_args()
+
+    print("🔍 Checking that both strategies agree on the samples...")
+    for text in SAMPLES:
+        expected = raw_search(text)
+        status = "✅" if expected == numeric_bank.search_all(text) else "⚠️"
+        print(f"   {status} {expected}")
+
+    strategies = {
+        "raw re.search": raw_search,
+        "precompiled bank": numeric_bank.search_all,
+    }
+
+    print(f"\n⏱️  {args.iterations} iterations x {len(SAMPLES)} texts")
+    baseline = None
+    for name, extract in strategies.items():
+        elapsed = timeit.timeit(lambda: [extract(text) for text in SAMPLES], number=args.iterations)
+        per_text_us = elapsed / (args.iterations * len(SAMPLES)) * 1e6
+        baseline = baseline or per_text_us
+        print(f"   {name:<18}{per_text_us:>8.2f} µs/text   {baseline / per_text_us:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
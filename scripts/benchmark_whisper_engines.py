@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark Whisper inference engines for the AI Agent
+Compares word error rate and real-time factor of the reference openai-whisper
+model against the int8 faster-whisper engine on a set of labelled recordings
+
+Manifest format (JSON lines):
+    {"audio": "samples/farmer_001.ogg", "text": "मेरे पास दो एकड़ जमीन है", "language": "hi"}
+
+Usage:
+    python scripts/benchmark_whisper_engines.py manifest.jsonl --model base
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Make the AI agent modules importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "components" / "ai-agent" / "src"))
+
+import whisper  # noqa: E402
+
+from whisper_engines import FASTER_WHISPER_ENGINE, OPENAI_ENGINE, load_whisper_model  # noqa: E402
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by reference length"""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,        # deletion
+                current[j - 1] + 1,     # insertion
+                previous[j - 1] + (ref_word != hyp_word)  # substitution
+            )
+        previous = current
+
+    return previous[-1] / len(ref)
+
+
+def load_manifest(path: str):
+    """Read manifest entries, resolving audio paths relative to the manifest"""
+    base = Path(path).resolve().parent
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entry["audio"] = str(base / entry["audio"])
+                yield entry
+
+
+def benchmark_engine(engine: str, model_name: str, samples: list, compute_type: str, threads: int) -> dict:
+    """Transcribe every sample with one engine and collect timing and accuracy"""
+    print(f"\n🧠 Loading {engine} engine ({model_name})...")
+    load_start = time.time()
+    model = load_whisper_model(
+        model_name,
+        "cpu",
+        engine=engine,
+        compute_type=compute_type,
+        cpu_threads=threads
+    )
+    load_time = time.time() - load_start
+    print(f"   Loaded in {load_time:.1f}s")
+
+    # Warm-up so one-off initialisation doesn't skew the first sample
+    model.transcribe(samples[0]["audio_array"][:whisper.audio.SAMPLE_RATE], language=samples[0].get("language"), fp16=False)
+
+    total_audio = 0.0
+    total_time = 0.0
+    total_errors = 0.0
+    total_words = 0
+
+    for sample in samples:
+        start = time.time()
+        result = model.transcribe(sample["audio_array"], language=sample.get("language"), fp16=False)
+        elapsed = time.time() - start
+
+        ref_words = len(sample["text"].split())
+        wer = word_error_rate(sample["text"], result["text"])
+
+        total_audio += sample["duration"]
+        total_time += elapsed
+        total_errors += wer * ref_words
+        total_words += ref_words
+
+        print(f"   {os.path.basename(sample['audio'])}: RTF {elapsed / sample['duration']:.3f}, WER {wer:.2%}")
+
+    return {
+        "engine": engine,
+        "load_time": load_time,
+        "rtf": total_time / total_audio if total_audio else 0.0,
+        "wer": total_errors / total_words if total_words else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Whisper engines on WER and real-time factor")
+    parser.add_argument("manifest", help="JSON lines file with audio paths and reference transcripts")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--compute-type", default="int8", help="faster-whisper compute type")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads (0 = library default)")
+    args = parser.parse_args()
+
+    samples = list(load_manifest(args.manifest))
+    if not samples:
+        print("❌ Manifest is empty")
+        sys.exit(1)
+
+    print(f"🎧 Decoding {len(samples)} samples...")
+    for sample in samples:
+        sample["audio_array"] = whisper.load_audio(sample["audio"])
+        sample["duration"] = len(sample["audio_array"]) / whisper.audio.SAMPLE_RATE
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    results = [
+        benchmark_engine(engine, args.model, samples, args.compute_type, args.threads)
+        for engine in (OPENAI_ENGINE, FASTER_WHISPER_ENGINE)
+    ]
+
+    print("\n📊 Results")
+    print(f"{'engine':<16}{'load (s)':>10}{'RTF':>10}{'WER':>10}")
+    for result in results:
+        print(f"{result['engine']:<16}{result['load_time']:>10.1f}{result['rtf']:>10.3f}{result['wer']:>10.2%}")
+
+    baseline, quantized = results
+    if quantized["rtf"]:
+        print(f"\n⚡ Speed-up: {baseline['rtf'] / quantized['rtf']:.2f}x")
+    print(f"🎯 WER change: {(quantized['wer'] - baseline['wer']) * 100:+.2f} points")
+
+
+if __name__ == "__main__":
+    main()